@@ -0,0 +1,134 @@
+"""
+Cold-start benchmark: import `src.server` in fresh interpreters and assert
+that startup stays within budget and that no heavy dependency is imported.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --runs 10 --top 15
+    python benchmarks/import_time.py --budget api=800 --budget all=1200
+
+Exit status is 1 when any scenario exceeds its budget or imports a forbidden module.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Kịch bản: tên -> giá trị APP_BLUEPRINTS
+SCENARIOS = {
+    "api": "user,folder,flashcard,course,review",
+    "all": "",
+}
+
+# Ngân sách cold start mặc định (ms, trung vị)
+DEFAULT_BUDGETS_MS = {
+    "api": 1500,
+    "all": 2000,
+}
+
+# Các module chỉ được import khi route sở hữu chúng được gọi lần đầu
+FORBIDDEN_MODULES = (
+    "torch",
+    "ultralytics",
+    "PIL",
+    "google.generativeai",
+    "cloudinary",
+    "sib_api_v3_sdk",
+)
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import src.server
+elapsed_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({
+    "elapsed_ms": elapsed_ms,
+    "loaded": [name for name in %r if name in sys.modules],
+    "module_count": len(sys.modules),
+}))
+""" % (FORBIDDEN_MODULES,)
+
+
+def run_probe(blueprints, importtime=False):
+    env = dict(os.environ, APP_BLUEPRINTS=blueprints, PYTHONDONTWRITEBYTECODE="1")
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", PROBE]
+
+    completed = subprocess.run(command, cwd=REPO_ROOT, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip() or "probe failed")
+
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["importtime"] = completed.stderr if importtime else ""
+    return result
+
+
+def slowest_imports(importtime_output, top):
+    """Parse `-X importtime` output into the `top` modules by cumulative time"""
+    rows = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time:   self [us] | cumulative | imported package"
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative_us), int(self_us), name.strip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def parse_budgets(values):
+    budgets = dict(DEFAULT_BUDGETS_MS)
+    for value in values or []:
+        name, _, limit = value.partition("=")
+        if name not in SCENARIOS or not limit:
+            raise SystemExit(f"Invalid budget '{value}', expected <{'|'.join(SCENARIOS)}>=<ms>")
+        budgets[name] = float(limit)
+    return budgets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure and assert cold-start import time")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per scenario")
+    parser.add_argument("--budget", action="append", help="override a budget, e.g. api=800")
+    parser.add_argument("--top", type=int, default=0, help="print the N slowest imports per scenario")
+    args = parser.parse_args()
+
+    budgets = parse_budgets(args.budget)
+    failures = []
+
+    for name, blueprints in SCENARIOS.items():
+        # Lần chạy đầu tiên làm nóng page cache của file system, không tính
+        run_probe(blueprints)
+        results = [run_probe(blueprints) for _ in range(args.runs)]
+
+        timings = [result["elapsed_ms"] for result in results]
+        median_ms = statistics.median(timings)
+        loaded = sorted({module for result in results for module in result["loaded"]})
+
+        print(
+            f"{name:<5} median={median_ms:7.1f}ms min={min(timings):7.1f}ms "
+            f"max={max(timings):7.1f}ms modules={results[-1]['module_count']} budget={budgets[name]:.0f}ms"
+        )
+
+        if median_ms > budgets[name]:
+            failures.append(f"{name}: {median_ms:.1f}ms exceeds budget {budgets[name]:.0f}ms")
+        if loaded:
+            failures.append(f"{name}: heavy modules imported at startup: {', '.join(loaded)}")
+
+        if args.top:
+            profile = run_probe(blueprints, importtime=True)
+            for cumulative_us, self_us, module in slowest_imports(profile["importtime"], args.top):
+                print(f"    {cumulative_us / 1000:8.1f}ms cumulative {self_us / 1000:8.1f}ms self  {module}")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Compare the response encoding paths for a page of MongoDB documents:
+
+  legacy   bson decode -> serialize_mongo_data -> Flask DefaultJSONProvider (stdlib json)
+  stdlib   bson decode -> FastJSONProvider without orjson (fallback)
+  orjson   bson decode -> FastJSONProvider with orjson
+
+    python benchmarks/json_encoding.py
+    python benchmarks/json_encoding.py --docs 500 --repeat 50
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bson
+from bson import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from src.utils import json_provider
+from src.utils.mongo_helper import serialize_mongo_data
+
+
+def make_flashcards(count):
+    """Documents shaped like the flashcards collection"""
+    now = datetime.utcnow()
+    folder_id = str(ObjectId())
+    user_id = str(ObjectId())
+    return [
+        {
+            "_id": ObjectId(),
+            "english": f"word {index}",
+            "vietnamese": f"từ vựng số {index}",
+            "object": "object",
+            "image_url": f"https://res.cloudinary.com/demo/image/upload/flashcards/{index}.jpg",
+            "folder_id": folder_id,
+            "user_id": user_id,
+            "is_public": index % 2 == 0,
+            "created_at": now - timedelta(seconds=index),
+            "updated_at": now,
+            "status": "active",
+        }
+        for index in range(count)
+    ]
+
+
+def legacy_path(raw, provider):
+    documents = bson.decode_all(raw)
+    return provider.dumps({"flashcards": [serialize_mongo_data(document) for document in documents]}).encode("utf-8")
+
+
+def fast_path(raw):
+    documents = bson.decode_all(raw)
+    return json_provider.dumps_bytes({"flashcards": documents})
+
+
+def measure(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark BSON -> JSON response encoding")
+    parser.add_argument("--docs", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    provider = DefaultJSONProvider(Flask(__name__))
+    orjson_module = json_provider.orjson
+
+    print(f"{'docs':>6} {'legacy ms':>10} {'stdlib ms':>10} {'orjson ms':>10} {'speedup':>8}")
+    for count in args.docs:
+        raw = b"".join(bson.encode(document) for document in make_flashcards(count))
+
+        legacy_ms = measure(lambda: legacy_path(raw, provider), args.repeat)
+
+        json_provider.orjson = None
+        stdlib_ms = measure(lambda: fast_path(raw), args.repeat)
+        json_provider.orjson = orjson_module
+
+        if orjson_module is not None:
+            orjson_ms = measure(lambda: fast_path(raw), args.repeat)
+            speedup = f"{legacy_ms / orjson_ms:7.1f}x"
+        else:
+            orjson_ms, speedup = float("nan"), "   n/a"
+
+        print(f"{count:>6} {legacy_ms:>10.2f} {stdlib_ms:>10.2f} {orjson_ms:>10.2f} {speedup:>8}")
+
+
+if __name__ == "__main__":
+    main()
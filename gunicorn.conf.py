@@ -0,0 +1,47 @@
+# Cấu hình gunicorn (tự động được đọc khi chạy gunicorn từ thư mục gốc repo)
+#
+# Mỗi vai trò triển khai có worker class và số worker riêng, chọn bằng APP_ROLE:
+#   APP_ROLE=api       gunicorn -c gunicorn.conf.py src.apps.api:app
+#   APP_ROLE=inference gunicorn -c gunicorn.conf.py src.apps.inference:app
+#   APP_ROLE=chat      gunicorn -c gunicorn.conf.py src.apps.chat:app
+#   APP_ROLE=all       gunicorn -c gunicorn.conf.py src.server:app
+# WEB_CONCURRENCY / GUNICORN_THREADS / GUNICORN_TIMEOUT ghi đè giá trị mặc định.
+import os
+import time
+
+ROLE_SETTINGS = {
+    # CRUD nhẹ và upload video lớn: nhiều thread để upload chậm không chặn request khác
+    "api": {"worker_class": "gthread", "workers": 2, "threads": 8, "timeout": 300},
+    # YOLO chiếm CPU và vài trăm MB RAM: một worker sync, một request mỗi lúc
+    "inference": {"worker_class": "sync", "workers": 1, "threads": 1, "timeout": 120},
+    # Chờ Gemini là I/O: một process, nhiều thread (gthread đồng bộ, không phải worker async)
+    "chat": {"worker_class": "gthread", "workers": 1, "threads": 32, "timeout": 120},
+    # Một process phục vụ tất cả: giữ nguyên mặc định của gunicorn như trước khi tách vai trò
+    "all": {"worker_class": "sync", "workers": 1, "threads": 1, "timeout": 30},
+}
+
+role = os.getenv("APP_ROLE", "all")
+if role not in ROLE_SETTINGS:
+    raise RuntimeError(f"Unknown APP_ROLE '{role}', expected one of: {', '.join(ROLE_SETTINGS)}")
+_settings = ROLE_SETTINGS[role]
+
+worker_class = _settings["worker_class"]
+workers = int(os.getenv("WEB_CONCURRENCY", _settings["workers"]))
+threads = int(os.getenv("GUNICORN_THREADS", _settings["threads"]))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", _settings["timeout"]))
+proc_name = f"engboost-{role}"
+
+
+def post_fork(server, worker):
+    """Open this worker's own MongoClient after fork instead of inheriting one"""
+    from src.config.mongodb import MongoDB
+
+    started = time.perf_counter()
+    MongoDB.connect()
+    server.log.info(
+        "Worker %s (%s) ready: mongodb %s, post_fork %.1fms",
+        worker.pid,
+        role,
+        {step: round(value, 1) for step, value in MongoDB.startup_timings.items()},
+        (time.perf_counter() - started) * 1000,
+    )
@@ -0,0 +1,147 @@
+from flask import Flask
+from src.routes import build_api_blueprint, ALL_BLUEPRINTS, BLUEPRINTS
+from src.config.environment import EnvConfig
+from src.config.mongodb import MongoDB
+from src.middleware.error_handling import error_handling_middleware
+from src.middleware.metrics import metrics_middleware
+from src.middleware.request_context import request_context_middleware
+from src.middleware.http_cache import apply_default_cache_headers
+from src.middleware.service_proxy import service_proxy_middleware
+from src.config.logging_config import configure_logging
+from src.utils.json_provider import FastJSONProvider
+import atexit
+from flask_cors import CORS
+import logging
+import os
+import time
+
+# Kiểm tra môi trường
+is_production = os.environ.get('FLASK_ENV') == 'production'
+
+# Nhóm blueprint của từng vai trò triển khai. Các vai trò dùng chung tầng
+# repositories/models, chỉ khác route được đăng ký và cấu hình gunicorn.
+ROLES = {
+    # CRUD nhẹ: user, folder, flashcard, course (kể cả upload video), ôn tập
+    "api": ("user", "folder", "flashcard", "course", "review"),
+    # YOLO (torch/ultralytics), CPU-bound, ít worker
+    "inference": ("snaplang",),
+    # Gemini, I/O-bound, nhiều thread
+    "chat": ("chatbot",),
+    # Tất cả trong một process (src.server:app)
+    "all": ALL_BLUEPRINTS,
+}
+
+# Route của vai trò khác mà API vẫn phải trả lời trên URL chính (client cũ chưa
+# chuyển sang URL riêng): blueprint -> (vai trò sở hữu, biến môi trường chứa URL).
+# Có URL thì API chuyển tiếp request sang service đó, không có thì tự mount blueprint.
+FORWARDED_BLUEPRINTS = {
+    "snaplang": ("inference", "INFERENCE_SERVICE_URL"),
+    "chatbot": ("chat", "CHAT_SERVICE_URL"),
+}
+
+
+def parse_blueprints(value):
+    """Parse a comma separated blueprint list; empty means every blueprint"""
+    if not value:
+        return ALL_BLUEPRINTS
+    return tuple(name.strip() for name in value.split(",") if name.strip())
+
+
+def create_app(blueprints=None, forwarded=None):
+    """
+    Application factory. `blueprints` chọn các nhóm route được đăng ký
+    (mặc định lấy từ APP_BLUEPRINTS, không có thì đăng ký tất cả).
+    `forwarded` map tên blueprint -> (vai trò, URL service): route của chúng
+    được chuyển tiếp sang service kia thay vì chạy trong process này.
+    Thư viện nặng (torch, ultralytics, Gemini, Cloudinary) chỉ được import
+    khi route sở hữu chúng được gọi lần đầu.
+    """
+    started = time.perf_counter()
+    if blueprints is None:
+        blueprints = parse_blueprints(EnvConfig.APP_BLUEPRINTS)
+
+    app = Flask(__name__)
+    # Encode ObjectId/datetime/document lồng nhau trực tiếp bằng orjson
+    app.json = FastJSONProvider(app)
+
+    # Cấu hình CORS dựa trên môi trường
+    if is_production:
+        # Môi trường production
+        CORS(app,
+             supports_credentials=True,
+             origins=["https://engboost-frontend.onrender.com"],
+             expose_headers=["X-Next-Cursor", "X-Request-ID"])
+        app.config["DEBUG"] = False
+    else:
+        # Môi trường development
+        CORS(app,
+             supports_credentials=True,
+             origins=["http://localhost:5173"],
+             expose_headers=["X-Next-Cursor", "X-Request-ID"])
+        app.config["DEBUG"] = True
+
+    # Cấu hình cho upload file lớn (500MB)
+    app.config['MAX_CONTENT_LENGTH'] = 500 * 1024 * 1024  # 500MB
+
+    # Cấu hình logging dựa trên môi trường (LOG_LEVEL, LOG_FORMAT, LOG_SAMPLE_RATE)
+    configure_logging()
+
+    # Request id cho log và header X-Request-ID
+    request_context_middleware(app)
+
+    # Đăng ký middleware xử lý lỗi
+    error_handling_middleware(app)
+
+    # Đo latency theo route, số query MongoDB, lời gọi dịch vụ ngoài; /metrics
+    metrics_middleware(app)
+
+    # Đăng ký Blueprint
+    app.register_blueprint(build_api_blueprint(blueprints))
+    app.config["BLUEPRINTS"] = tuple(blueprints)
+
+    for name, (role, target) in (forwarded or {}).items():
+        service_proxy_middleware(app, BLUEPRINTS[name][2], target, role)
+
+    # no-store cho mọi response, trừ route đã khai báo cache_policy riêng
+    app.after_request(apply_default_cache_headers)
+
+    @app.route("/")
+    def home():
+        return {
+            "message": "Welcome to Flask API with MongoDB",
+            "environment": "production" if is_production else "development",
+            "blueprints": list(app.config["BLUEPRINTS"]),
+        }
+
+    logging.getLogger(__name__).info(
+        "App created with blueprints %s in %.1fms",
+        ",".join(blueprints),
+        (time.perf_counter() - started) * 1000,
+    )
+    return app
+
+
+def create_role_app(role):
+    """Build the app of one deployment role (api, inference, chat or all)"""
+    if role not in ROLES:
+        raise ValueError(f"Unknown role '{role}', expected one of: {', '.join(ROLES)}")
+    blueprints = ROLES[role]
+    forwarded = {}
+    if role == "api":
+        for name, (owner, env_name) in FORWARDED_BLUEPRINTS.items():
+            target = os.getenv(env_name)
+            if target:
+                forwarded[name] = (owner, target)
+            else:
+                # Chưa tách service: API tự phục vụ (thư viện nặng chỉ import ở request đầu)
+                blueprints += (name,)
+    app = create_app(blueprints, forwarded)
+    app.config["ROLE"] = role
+    return app
+
+
+# Không kết nối DB lúc import: mỗi process (gunicorn worker sau fork) tự kết nối
+# ở lần truy cập collection đầu tiên, hoặc sớm hơn qua hook post_fork trong gunicorn.conf.py
+
+# Đóng DB khi server tắt
+atexit.register(MongoDB.close)
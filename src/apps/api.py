@@ -0,0 +1,5 @@
+# Lean API: user, folder, flashcard, course
+# gunicorn -c gunicorn.conf.py src.apps.api:app   (APP_ROLE=api)
+from src.apps import create_role_app
+
+app = create_role_app("api")
@@ -0,0 +1,5 @@
+# Chatbot (Gemini): I/O-bound, chạy gthread với nhiều thread
+# gunicorn -c gunicorn.conf.py src.apps.chat:app   (APP_ROLE=chat)
+from src.apps import create_role_app
+
+app = create_role_app("chat")
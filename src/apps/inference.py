@@ -0,0 +1,23 @@
+# Snaplang (YOLO): CPU-bound, một worker sync giữ một bản model trong RAM
+# gunicorn -c gunicorn.conf.py src.apps.inference:app   (APP_ROLE=inference)
+from src.apps import create_role_app
+import logging
+import os
+import threading
+
+app = create_role_app("inference")
+
+
+def warm_up():
+    """Load the YOLO model in the background so the first request doesn't pay for it"""
+    from src.resources.snaplang import get_model
+
+    try:
+        get_model()
+    except Exception as e:
+        logging.getLogger(__name__).error(f"Model warm-up failed: {e}")
+
+
+# Process inference chỉ phục vụ snaplang nên tải model ngay khi khởi động
+if os.getenv("SNAPLANG_PRELOAD_MODEL", "true").lower() == "true":
+    threading.Thread(target=warm_up, daemon=True).start()
@@ -1,15 +1,29 @@
-import sib_api_v3_sdk
+import threading
 from src.config.environment import BREVO_API_KEY, ADMIN_EMAIL_ADDRESS, ADMIN_EMAIL_NAME
 
-# Cấu hình API Client
-configuration = sib_api_v3_sdk.Configuration()
-configuration.api_key["api-key"] = BREVO_API_KEY
+api_instance = None
+_api_lock = threading.Lock()
 
-# Tạo instance của API
-api_instance = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
+def get_api_instance():
+    """Tạo API client Brevo ở lần gửi email đầu tiên."""
+    global api_instance
+    if api_instance is None:
+        with _api_lock:
+            if api_instance is None:
+                import sib_api_v3_sdk
+
+                # Cấu hình API Client
+                configuration = sib_api_v3_sdk.Configuration()
+                configuration.api_key["api-key"] = BREVO_API_KEY
+
+                # Tạo instance của API
+                api_instance = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
+    return api_instance
 
 def send_email(recipient_email: str, subject: str, html_content: str):
     """Gửi email thông qua Brevo."""
+    import sib_api_v3_sdk
+
     send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
         sender={"email": ADMIN_EMAIL_ADDRESS, "name": ADMIN_EMAIL_NAME},
         to=[{"email": recipient_email}],
@@ -18,7 +32,7 @@ def send_email(recipient_email: str, subject: str, html_content: str):
     )
 
     try:
-        api_instance.send_transac_email(send_smtp_email)
+        get_api_instance().send_transac_email(send_smtp_email)
         return {"success": True, "message": "Email sent successfully"}
     except Exception as e:
         return {"success": False, "message": str(e)}
@@ -1,30 +1,68 @@
-import cloudinary
-import cloudinary.uploader
-import cloudinary.api
 import os
+import re
+import threading
 from dotenv import load_dotenv
+from src.utils.metrics import track_outbound
+import logging
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
 
-# Configure Cloudinary
-cloudinary.config(
-    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
-    api_key=os.getenv("CLOUDINARY_API_KEY"),
-    api_secret=os.getenv("CLOUDINARY_API_SECRET")
+_uploader = None
+_uploader_lock = threading.Lock()
+
+
+def get_uploader():
+    """Import and configure the Cloudinary SDK on first use"""
+    global _uploader
+    if _uploader is None:
+        with _uploader_lock:
+            if _uploader is None:
+                import cloudinary
+                import cloudinary.uploader
+
+                # Configure Cloudinary
+                cloudinary.config(
+                    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
+                    api_key=os.getenv("CLOUDINARY_API_KEY"),
+                    api_secret=os.getenv("CLOUDINARY_API_SECRET")
+                )
+                _uploader = cloudinary.uploader
+    return _uploader
+
+
+# https://res.cloudinary.com/<cloud>/image/upload/[<transformations>/][v<version>/]<public_id>.<ext>
+_DELIVERY_URL = re.compile(
+    r"^https?://res\.cloudinary\.com/(?P<cloud>[^/]+)/image/upload/"
+    r"(?:(?:[^/]+/)*?v\d+/)?(?P<public_id>.+?)(?:\.[A-Za-z0-9]+)?$"
 )
 
+
+def public_id_from_url(url):
+    """
+    public_id of an image delivered from this app's Cloudinary account, for
+    cards stored before image_public_id existed. None for any other URL.
+    """
+    match = _DELIVERY_URL.match(url or "")
+    if not match or match.group("cloud") != os.getenv("CLOUDINARY_CLOUD_NAME"):
+        return None
+    return match.group("public_id")
+
+
 class CloudinaryService:
     @staticmethod
     def upload_image(base64_image, folder="flashcards"):
         """Upload ảnh lên Cloudinary từ base64 string"""
         try:
             # Upload ảnh
-            result = cloudinary.uploader.upload(
-                base64_image,
-                folder=folder,
-                resource_type="image"
-            )
+            with track_outbound("cloudinary", "upload_image"):
+                result = get_uploader().upload(
+                    base64_image,
+                    folder=folder,
+                    resource_type="image"
+                )
             
             # Trả về URL của ảnh
             return {
@@ -32,17 +70,18 @@ class CloudinaryService:
                 "public_id": result["public_id"]
             }
         except Exception as e:
-            print(f"Error uploading to Cloudinary: {str(e)}")
+            logger.error("Error uploading to Cloudinary: %s", e)
             raise
     
     @staticmethod
     def delete_image(public_id):
         """Xóa ảnh từ Cloudinary"""
         try:
-            result = cloudinary.uploader.destroy(public_id)
+            with track_outbound("cloudinary", "delete_image"):
+                result = get_uploader().destroy(public_id)
             return result
         except Exception as e:
-            print(f"Error deleting from Cloudinary: {str(e)}")
+            logger.error("Error deleting from Cloudinary: %s", e)
             # Không raise lỗi để tránh ảnh hưởng đến flow chính
             return {"result": "error", "error": str(e)}
     
@@ -51,17 +90,18 @@ class CloudinaryService:
         """Upload video lên Cloudinary"""
         try:
             # Upload video với các tùy chọn phù hợp cho streaming
-            result = cloudinary.uploader.upload(
-                video_file,
-                folder=folder,
-                resource_type="video",
-                eager=[
-                    # Tạo các biến thể video với chất lượng khác nhau
-                    {"streaming_profile": "hd", "format": "m3u8"},
-                ],
-                eager_async=True,  # Xử lý bất đồng bộ để tránh timeout
-                eager_notification_url=os.getenv("CLOUDINARY_NOTIFICATION_URL", ""),
-            )
+            with track_outbound("cloudinary", "upload_video"):
+                result = get_uploader().upload(
+                    video_file,
+                    folder=folder,
+                    resource_type="video",
+                    eager=[
+                        # Tạo các biến thể video với chất lượng khác nhau
+                        {"streaming_profile": "hd", "format": "m3u8"},
+                    ],
+                    eager_async=True,  # Xử lý bất đồng bộ để tránh timeout
+                    eager_notification_url=os.getenv("CLOUDINARY_NOTIFICATION_URL", ""),
+                )
             
             # Trả về thông tin video đã upload
             return {
@@ -72,16 +112,17 @@ class CloudinaryService:
                 "resource_type": result.get("resource_type", "video")
             }
         except Exception as e:
-            print(f"Error uploading video to Cloudinary: {str(e)}")
+            logger.error("Error uploading video to Cloudinary: %s", e)
             raise
             
     @staticmethod
     def delete_video(public_id):
         """Xóa video từ Cloudinary"""
         try:
-            result = cloudinary.uploader.destroy(public_id, resource_type="video")
+            with track_outbound("cloudinary", "delete_video"):
+                result = get_uploader().destroy(public_id, resource_type="video")
             return result
         except Exception as e:
-            print(f"Error deleting video from Cloudinary: {str(e)}")
+            logger.error("Error deleting video from Cloudinary: %s", e)
             # Không raise lỗi để tránh ảnh hưởng đến flow chính
             return {"result": "error", "error": str(e)} 
\ No newline at end of file
@@ -10,6 +10,10 @@ class EnvConfig:
     MONGO_DB_NAME = os.getenv("MONGO_DB_NAME")
     APP_HOST = os.getenv("APP_HOST", "127.0.0.1")
     APP_PORT = int(os.getenv("APP_PORT", 5000))
+    # Danh sách blueprint được bật, phân tách bằng dấu phẩy (mặc định: tất cả)
+    APP_BLUEPRINTS = os.getenv("APP_BLUEPRINTS")
+    # true: import job chạy trong thread của process API; false: để worker (python -m src.worker) xử lý
+    RUN_IMPORT_JOBS_INLINE = os.getenv("RUN_IMPORT_JOBS_INLINE", "true").lower() == "true"
 
 WEBSITE_DOMAIN = os.getenv("WEBSITE_DOMAIN")
 BREVO_API_KEY = os.getenv("BREVO_API_KEY")
@@ -12,10 +12,7 @@ class JwtProvider:
             current_time = datetime.utcnow()
             expire_at = current_time + token_life
             
-            # Log thời gian để debug
-            logger.info(f"Token generation time (UTC): {current_time}")
-            logger.info(f"Token expiration time (UTC): {expire_at}")
-            logger.info(f"Token lifetime: {token_life.total_seconds()} seconds")
+            logger.debug("Generating token at %s (UTC), expires at %s", current_time, expire_at)
             
             payload = {**user_info, "exp": expire_at}
             
@@ -26,34 +23,20 @@ class JwtProvider:
             if isinstance(token, bytes):
                 token = token.decode('utf-8')
                 
-            # Log token để debug
-            logger.info(f"Generated token: {token}")
             return token
             
         except Exception as e:
-            logger.error(f"Error generating token: {str(e)}")
-            try:
-                logger.error(f"PyJWT version: {jwt.__version__}")
-                logger.error(f"PyJWT available methods: {dir(jwt)}")
-            except Exception as e2:
-                logger.error(f"Error getting PyJWT info: {str(e2)}")
+            logger.exception("Error generating token (PyJWT %s): %s", getattr(jwt, "__version__", "unknown"), e)
             raise RuntimeError(f"Error generating token: {e}")
 
     @staticmethod
     def verify_token(token: str, secret_signature: str) -> dict:
         try:
-            # Log thời gian hiện tại khi verify
-            current_time = datetime.utcnow()
-            logger.info(f"Verifying token at (UTC): {current_time}")
-            
             decoded = jwt.decode(token, secret_signature, algorithms=["HS256"])
             
-            # Log thời gian hết hạn của token
-            if "exp" in decoded:
-                exp_time = datetime.fromtimestamp(decoded["exp"])
-                logger.info(f"Token expiration time (UTC): {exp_time}")
-                logger.info(f"Time until expiration: {(exp_time - current_time).total_seconds()} seconds")
-            
+            if "exp" in decoded and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Token expires at %s (UTC)", datetime.utcfromtimestamp(decoded["exp"]))
+
             return decoded
             
         except jwt.ExpiredSignatureError:  
@@ -63,5 +46,5 @@ class JwtProvider:
             logger.warning("Invalid token")
             raise ValueError("Invalid token")
         except Exception as e:
-            logger.error(f"Unexpected error verifying token: {str(e)}")
+            logger.exception("Unexpected error verifying token: %s", e)
             raise RuntimeError(f"Error verifying token: {e}")
@@ -0,0 +1,96 @@
+"""
+Logging setup shared by every entry point (web roles, worker, migrations).
+
+    LOG_LEVEL=INFO          # default WARNING in production, INFO otherwise
+    LOG_FORMAT=json         # "json" (default in production) or "text"
+    LOG_SAMPLE_RATE=0.1     # fraction of requests whose DEBUG/INFO records are kept
+
+Use lazy %-formatting (`logger.debug("Found %s folders", count)`) so disabled
+levels cost nothing; pass structured fields with `extra={...}`.
+"""
+import contextvars
+import json
+import logging
+import os
+import random
+import sys
+import zlib
+from datetime import datetime, timezone
+
+# Request id của request đang xử lý, gắn vào mọi log record
+request_id_var = contextvars.ContextVar("request_id", default=None)
+
+# Thuộc tính có sẵn của LogRecord; còn lại là field truyền qua `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+
+class RequestIdFilter(logging.Filter):
+    """Attach the current request id (or "-") to every record"""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get() or "-"
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep DEBUG/INFO records for a fraction of requests; WARNING and above are
+    always kept. The decision is made per request id so a sampled request
+    keeps all of its records.
+    """
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if self.rate >= 1 or record.levelno >= logging.WARNING:
+            return True
+        request_id = request_id_var.get()
+        if request_id is None:
+            return random.random() < self.rate
+        return (zlib.crc32(request_id.encode()) % 10000) < self.rate * 10000
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+            "pid": record.process,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"
+
+
+def configure_logging(level=None, log_format=None, sample_rate=None):
+    """Install a single root handler; safe to call more than once"""
+    is_production = os.environ.get("FLASK_ENV") == "production"
+    level = level or os.getenv("LOG_LEVEL") or ("WARNING" if is_production else "INFO")
+    log_format = log_format or os.getenv("LOG_FORMAT") or ("json" if is_production else "text")
+    if sample_rate is None:
+        sample_rate = float(os.getenv("LOG_SAMPLE_RATE", 1.0))
+
+    handler = logging.StreamHandler(sys.stderr)
+    handler.addFilter(RequestIdFilter())
+    handler.addFilter(SamplingFilter(sample_rate))
+    handler.setFormatter(JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT))
+
+    # Thay mọi handler cũ (basicConfig, lần gọi trước) để không in trùng
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper() if isinstance(level, str) else level)
@@ -1,81 +1,131 @@
 # src/config/mongodb.py
-from pymongo import MongoClient, ASCENDING, TEXT
+from pymongo import MongoClient
 from pymongo.server_api import ServerApi
 from src.config.environment import EnvConfig
+from src.utils.metrics import CommandMetricsListener
+from src.utils.slow_query import SlowQueryListener
 import logging
 import certifi
-from flask import g, current_app
+import os
+import threading
+import time
 
 class MongoDB:
     client = None
     db = None
-    
+    # Process sở hữu client hiện tại; MongoClient không an toàn khi dùng lại sau fork
+    pid = None
+    # Thời gian (ms) của từng bước kết nối gần nhất
+    startup_timings = {}
+    _lock = threading.Lock()
+
     @classmethod
     def connect(cls):
-        if cls.client is None:
-            print(f"🔄 Connecting to MongoDB with URI")
+        if cls.client is not None and cls.pid != os.getpid():
+            # Client kế thừa từ process cha (gunicorn fork): bỏ đi, tạo client mới cho process này
+            cls.client = None
+            cls.db = None
+
+        if cls.client is not None:
+            return
+
+        with cls._lock:
+            if cls.client is not None:
+                return
+
+            logger = logging.getLogger(__name__)
+            logger.info("Connecting to MongoDB")
+            timings = {}
+            started = time.perf_counter()
             # Cấu hình connection pooling
-            cls.client = MongoClient(
-                EnvConfig.MONGO_URI, 
-                server_api=ServerApi('1'), 
+            client = MongoClient(
+                EnvConfig.MONGO_URI,
+                server_api=ServerApi('1'),
                 tlsCAFile=certifi.where(),
                 maxPoolSize=50,  # Tăng kích thước pool
                 minPoolSize=10,  # Duy trì ít nhất 10 kết nối
                 maxIdleTimeMS=30000,  # Đóng kết nối không hoạt động sau 30 giây
                 connectTimeoutMS=5000,  # Timeout kết nối 5 giây
                 socketTimeoutMS=30000,  # Timeout socket 30 giây
-                waitQueueTimeoutMS=10000  # Timeout hàng đợi 10 giây
+                waitQueueTimeoutMS=10000,  # Timeout hàng đợi 10 giây
+                # Thời gian/số lượng query theo request; explain các query chậm
+                event_listeners=[CommandMetricsListener(), SlowQueryListener()]
             )
-            cls.db = cls.client.get_database(EnvConfig.MONGO_DB_NAME)
+            timings["client_ms"] = (time.perf_counter() - started) * 1000
+
+            cls.db = client.get_database(EnvConfig.MONGO_DB_NAME)
+            cls.client = client
+            cls.pid = os.getpid()
             try:
+                step = time.perf_counter()
                 cls.client.admin.command('ping')
-                print("✅ Connected to MongoDB Atlas successfully!")
-                # Tạo indexes khi kết nối thành công
-                cls.create_indexes()
+                timings["ping_ms"] = (time.perf_counter() - step) * 1000
+                logger.info("Connected to MongoDB Atlas")
+
+                # Chỉ kiểm tra index, việc tạo index do migration command đảm nhiệm
+                step = time.perf_counter()
+                cls.verify_indexes()
+                timings["verify_indexes_ms"] = (time.perf_counter() - step) * 1000
             except Exception as e:
-                print(f"❌ Connection failed: {e}")
-    
+                logger.error("MongoDB connection failed: %s", e)
+
+            timings["total_ms"] = (time.perf_counter() - started) * 1000
+            cls.startup_timings = timings
+            logger.info(
+                "MongoDB connected in pid %s: %s",
+                cls.pid,
+                ", ".join(f"{step}={value:.1f}" for step, value in timings.items()),
+            )
+
     @classmethod
     def get_db(cls):
-        if cls.db is None:
+        if cls.db is None or cls.pid != os.getpid():
             cls.connect()
         return cls.db
-    
+
+    @classmethod
+    def get_client(cls):
+        cls.get_db()
+        return cls.client
+
     @classmethod
     def close(cls):
-        if cls.client:
+        # Chỉ đóng client do chính process này tạo ra
+        if cls.client and cls.pid == os.getpid():
             cls.client.close()
-            print("🛑 MongoDB connection closed.")
-    
+            logging.getLogger(__name__).info("MongoDB connection closed")
+        cls.client = None
+        cls.db = None
+
     @classmethod
-    def create_indexes(cls):
+    def verify_indexes(cls):
         """
-        Tạo các index cần thiết cho các collection trong database.
+        Kiểm tra index khi khởi động: chỉ cảnh báo, không tạo index.
+        Tạo/cập nhật index bằng `python -m src.migrations apply`.
         """
         try:
-            users_collection = cls.db.users
-            
-            # Lấy danh sách index hiện có
-            existing_indexes = users_collection.index_information()
-            
-            # Tạo index nếu chưa tồn tại
-            if "username_1" not in existing_indexes:
-                users_collection.create_index([("username", ASCENDING)], background=True)
-            
-            if "email_1" not in existing_indexes:
-                users_collection.create_index([("email", ASCENDING)], background=True)
-            
-            if "role_1" not in existing_indexes:
-                users_collection.create_index([("role", ASCENDING)], background=True)
-            
-            if "user_text_search" not in existing_indexes:
-                users_collection.create_index([
-                    ("username", TEXT),
-                    ("email", TEXT),
-                    ("fullName", TEXT)
-                ], name="user_text_search", background=True)
-            
-            print("✅ MongoDB indexes created successfully!")
+            from src.migrations.indexes import verify_indexes
+            problems = verify_indexes(cls.db)
+            if not problems:
+                logging.getLogger(__name__).info("MongoDB indexes verified")
         except Exception as e:
-            logging.error(f"❌ Failed to create indexes: {e}")
-            print(f"❌ Failed to create indexes: {e}")
+            logging.getLogger(__name__).error("Failed to verify indexes: %s", e)
+
+
+class LazyCollection:
+    """
+    Class attribute that resolves to a collection of the current process's
+    database on first access, so importing a model never touches MongoDB.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._db = None
+        self._collection = None
+
+    def __get__(self, instance, owner):
+        db = MongoDB.get_db()
+        if self._db is not db:
+            self._collection = db[self.name]
+            self._db = db
+        return self._collection
@@ -0,0 +1,121 @@
+"""
+Development launcher: run every deployment role locally.
+
+    python -m src.launcher                      # api + inference + chat on one port, plus the worker
+    python -m src.launcher --separate           # one process and port per web role
+    python -m src.launcher --roles api,worker
+
+With the default (combined) mode each role is still its own Flask app; a small
+dispatcher sends /api/snaplang and /api/chatbot to theirs so the frontend keeps
+a single base URL. The import worker always runs in its own process.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+
+WEB_ROLES = ("api", "inference", "chat")
+ALL_ROLES = WEB_ROLES + ("worker",)
+
+
+class RoleDispatcher:
+    """WSGI app routing requests to the role app owning the URL prefix"""
+
+    def __init__(self, default_app, apps_by_prefix):
+        self.default_app = default_app
+        # Prefix dài hơn được so trước
+        self.apps_by_prefix = sorted(apps_by_prefix.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def __call__(self, environ, start_response):
+        path = environ.get("PATH_INFO", "")
+        for prefix, app in self.apps_by_prefix:
+            if path == prefix or path.startswith(prefix + "/"):
+                return app(environ, start_response)
+        return self.default_app(environ, start_response)
+
+
+def build_combined_app(roles):
+    from src.apps import ROLES, create_role_app
+    from src.routes import BLUEPRINTS
+
+    apps = {role: create_role_app(role) for role in roles}
+    default_role = "api" if "api" in apps else roles[0]
+
+    apps_by_prefix = {}
+    for role, app in apps.items():
+        if role == default_role:
+            continue
+        for blueprint in ROLES[role]:
+            apps_by_prefix[BLUEPRINTS[blueprint][2]] = app
+    return RoleDispatcher(apps[default_role], apps_by_prefix)
+
+
+def serve(roles, host, port):
+    from werkzeug.serving import run_simple
+
+    application = build_combined_app(list(roles))
+    # Reloader tạo thêm process con, không dùng chung được với các process role khác
+    run_simple(host, port, application, use_debugger=True, use_reloader=False, threaded=True)
+
+
+def run_worker():
+    from src.config.logging_config import configure_logging
+    from src.worker import run_worker as run
+
+    configure_logging()
+    run()
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m src.launcher", description="Run all deployment roles locally")
+    parser.add_argument("--roles", default=",".join(ALL_ROLES), help=f"comma separated subset of {','.join(ALL_ROLES)}")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=None, help="base port (default APP_PORT)")
+    parser.add_argument("--separate", action="store_true", help="serve each web role on its own port")
+    args = parser.parse_args()
+
+    roles = [role.strip() for role in args.roles.split(",") if role.strip()]
+    unknown = [role for role in roles if role not in ALL_ROLES]
+    if unknown:
+        parser.error(f"unknown roles: {', '.join(unknown)}")
+
+    if "worker" in roles:
+        # Có worker riêng thì API chỉ đưa import job vào hàng đợi
+        os.environ["RUN_IMPORT_JOBS_INLINE"] = "false"
+
+    from src.config.environment import EnvConfig
+    base_port = args.port or EnvConfig.APP_PORT
+    web_roles = [role for role in WEB_ROLES if role in roles]
+
+    processes = []
+    if "worker" in roles:
+        processes.append(multiprocessing.Process(target=run_worker, name="worker"))
+
+    if args.separate:
+        for offset, role in enumerate(web_roles):
+            port = base_port + offset
+            print(f"{role:<10} http://{args.host}:{port}")
+            processes.append(multiprocessing.Process(target=serve, args=((role,), args.host, port), name=role))
+    elif web_roles:
+        print(f"{'+'.join(web_roles)} http://{args.host}:{base_port}")
+
+    for process in processes:
+        process.start()
+
+    try:
+        if web_roles and not args.separate:
+            serve(web_roles, args.host, base_port)
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+                process.join()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
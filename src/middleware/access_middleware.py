@@ -9,8 +9,6 @@ logger = logging.getLogger(__name__)
 def has_course_access(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        logger.info("=== Course Access Check Started ===")
-        
         try:
             # Lấy user_id từ g.user (đã được set bởi is_authorized)
             user_id = g.user.get("_id")
@@ -27,7 +25,7 @@ def has_course_access(f):
             user = UserModel.find_by_id(user_id)
             
             if user and user.get("role") == "admin":
-                logger.info(f"Admin access granted for user {user_id}")
+                logger.debug("Admin access granted for user %s", user_id)
                 return f(*args, **kwargs)
             
             # Kiểm tra khóa học có công khai không
@@ -35,11 +33,11 @@ def has_course_access(f):
             course = CourseModel.find_by_id(course_id)
             
             if not course:
-                logger.warning(f"Course {course_id} not found")
+                logger.debug("Course %s not found", course_id)
                 return jsonify({"success": False, "message": "Khóa học không tồn tại"}), 404
             
             if course.get("is_public"):
-                logger.info(f"Public course access granted for user {user_id}")
+                logger.debug("Public course access granted for user %s", user_id)
                 return f(*args, **kwargs)
             
             # Kiểm tra người dùng đã đăng ký khóa học này chưa
@@ -47,17 +45,17 @@ def has_course_access(f):
             user_course = UserCourseModel.find_by_user_and_course(user_id, course_id)
             
             if not user_course:
-                logger.warning(f"Access denied: User {user_id} has not registered for course {course_id}")
+                logger.info("Access denied: User %s has not registered for course %s", user_id, course_id)
                 return jsonify({
                     "success": False, 
                     "message": "Bạn cần đăng ký khóa học này để xem nội dung"
                 }), 403
             
-            logger.info(f"Registered user access granted for user {user_id}")
+            logger.debug("Registered user access granted for user %s", user_id)
             return f(*args, **kwargs)
             
         except Exception as e:
-            logger.error(f"Error in course access middleware: {str(e)}")
+            logger.error("Error in course access middleware: %s", e)
             return jsonify({
                 "success": False,
                 "message": "Có lỗi xảy ra khi kiểm tra quyền truy cập khóa học"
@@ -1,5 +1,6 @@
 from flask import jsonify
 from src.utils.api_error import ApiError
+import logging
 
 def error_handling_middleware(app):
     @app.errorhandler(ApiError)
@@ -12,7 +13,7 @@ def error_handling_middleware(app):
 
     @app.errorhandler(Exception)
     def handle_general_error(error):
-        print(f"Unexpected Error: {error}")  
+        logging.getLogger(__name__).exception("Unexpected Error: %s", error)
         response = {
             "statusCode": 500,
             "message": str(error) if app.config["DEBUG"] else "Something went wrong!"
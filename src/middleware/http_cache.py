@@ -0,0 +1,75 @@
+from functools import wraps
+from datetime import timezone
+from flask import current_app, make_response, request
+import hashlib
+
+# Mặc định (không khai báo policy): dữ liệu theo user, không được lưu ở đâu cả
+NO_STORE = "no-store, no-cache, must-revalidate, post-check=0, pre-check=0, max-age=0"
+# Danh mục công khai, giống nhau với mọi người dùng: CDN/trình duyệt giữ ngắn rồi revalidate bằng ETag
+PUBLIC_CATALOG = "public, max-age=60, stale-while-revalidate=300"
+# Cần đăng nhập nhưng nội dung không phụ thuộc user: chỉ trình duyệt giữ, luôn revalidate
+PRIVATE_REVALIDATE = "private, no-cache"
+
+
+def cache_policy(value):
+    """Set Cache-Control on successful responses of a view"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            response = make_response(f(*args, **kwargs))
+            if response.status_code in (200, 304):
+                response.headers["Cache-Control"] = value
+            return response
+        return decorated_function
+    return decorator
+
+
+def apply_default_cache_headers(response):
+    """after_request: no-store unless the route declared its own policy"""
+    if "Cache-Control" not in response.headers:
+        response.headers["Cache-Control"] = NO_STORE
+        response.headers["Pragma"] = "no-cache"
+        response.headers["Expires"] = "0"
+    return response
+
+
+def make_etag(*parts):
+    """Strong ETag from the values that determine a response body"""
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
+def _http_date(value):
+    # Last-Modified chỉ chính xác tới giây; datetime trong DB là UTC không có tzinfo
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.replace(microsecond=0)
+
+
+def set_validators(response, etag, last_modified=None):
+    if etag is None:
+        return response
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = _http_date(last_modified)
+    return response
+
+
+def not_modified(etag, last_modified=None):
+    """
+    304 response when the client's If-None-Match (or, without it,
+    If-Modified-Since) still matches; None when the body must be sent.
+    Called before the body is queried and serialized.
+    """
+    if etag is None or request.method not in ("GET", "HEAD"):
+        return None
+
+    if request.if_none_match:
+        matched = request.if_none_match.contains(etag)
+    elif last_modified is not None and request.if_modified_since is not None:
+        matched = _http_date(last_modified) <= request.if_modified_since
+    else:
+        matched = False
+
+    if not matched:
+        return None
+    return set_validators(current_app.response_class(status=304), etag, last_modified)
@@ -2,8 +2,6 @@ from typing import Callable, Dict, List, Optional, Union
 from flask import request, jsonify
 from src.utils.constants import ALLOW_COMMON_FILE_TYPE, LIMIT_COMMON_FILE_SIZE
 from src.utils.api_error import ApiError
-from asgiref.sync import async_to_sync
-import asyncio
 
 class ImageUploadConfig:
     def __init__(
@@ -56,8 +54,6 @@ class ImageUploader:
                     kwargs['user_avatar_file'] = file
 
                 # Call the handler
-                if asyncio.iscoroutinefunction(handler):
-                    return async_to_sync(handler)(*args, **kwargs)
                 return handler(*args, **kwargs)
 
             except ApiError as e:
@@ -0,0 +1,56 @@
+from flask import Response, g, request
+from src.utils.metrics import start_request, end_request, record_request, render_metrics
+import hmac
+import os
+
+
+def metrics_middleware(app):
+    """
+    Record latency, status code, MongoDB commands and outbound calls per route,
+    expose them on /metrics and, in debug mode, as a Server-Timing header.
+    """
+    # Token bảo vệ /metrics (Authorization: Bearer <token>). Không có token thì
+    # /metrics chỉ mở ở development, production trả 404
+    metrics_token = os.getenv("METRICS_TOKEN")
+    metrics_open = not metrics_token and app.config["DEBUG"]
+    server_timing = app.config["DEBUG"] or os.getenv("METRICS_SERVER_TIMING", "false").lower() == "true"
+
+    @app.before_request
+    def start_request_metrics():
+        # Dùng route template (/api/folders/<folder_id>) để số series không tăng theo id
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        g.request_stats, g.request_stats_token = start_request(route)
+
+    @app.after_request
+    def record_request_metrics(response):
+        stats = g.get("request_stats")
+        if stats is None:
+            return response
+
+        duration = record_request(stats, request.method, response.status_code)
+        if server_timing:
+            entries = [
+                f"app;dur={duration * 1000:.1f}",
+                f'db;dur={stats.mongodb_seconds * 1000:.1f};desc="{stats.mongodb_commands} commands"',
+            ]
+            for service, (calls, seconds) in stats.outbound.items():
+                entries.append(f'{service};dur={seconds * 1000:.1f};desc="{calls} calls"')
+            response.headers["Server-Timing"] = ", ".join(entries)
+            response.headers["Timing-Allow-Origin"] = "*"
+        return response
+
+    @app.teardown_request
+    def end_request_metrics(error=None):
+        token = g.pop("request_stats_token", None)
+        if token is not None:
+            end_request(token)
+
+    @app.route("/metrics")
+    def metrics():
+        if not metrics_token and not metrics_open:
+            return Response("Not Found\n", status=404, mimetype="text/plain")
+        if metrics_token:
+            supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+            if not hmac.compare_digest(supplied, metrics_token):
+                return Response("Unauthorized\n", status=401, mimetype="text/plain")
+        return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
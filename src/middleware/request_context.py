@@ -0,0 +1,32 @@
+from flask import g, request
+from src.config.logging_config import request_id_var
+import re
+import uuid
+
+# Chấp nhận X-Request-ID do proxy/frontend gửi nếu hợp lệ, ngược lại tự sinh
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+def request_context_middleware(app):
+    """Assign a request id, expose it in logs and echo it as X-Request-ID"""
+
+    @app.before_request
+    def assign_request_id():
+        request_id = request.headers.get("X-Request-ID", "")
+        if not REQUEST_ID_PATTERN.match(request_id):
+            request_id = uuid.uuid4().hex
+        g.request_id = request_id
+        g.request_id_token = request_id_var.set(request_id)
+
+    @app.after_request
+    def add_request_id_header(response):
+        request_id = g.get("request_id")
+        if request_id:
+            response.headers["X-Request-ID"] = request_id
+        return response
+
+    @app.teardown_request
+    def clear_request_id(error=None):
+        token = g.pop("request_id_token", None)
+        if token is not None:
+            request_id_var.reset(token)
@@ -29,17 +29,17 @@ def has_role(roles):
                 user_role = user.get("role", "CLIENT") 
                 
                 if user_role not in roles:
-                    logger.warning(f"User {user.get('email')} with role {user_role} attempted to access endpoint requiring roles {roles}")
+                    logger.warning("User %s with role %s attempted to access endpoint requiring roles %s", user.get('email'), user_role, roles)
                     raise ApiError(403, f"Access denied. Required roles: {', '.join(roles)}")
                 
-                logger.info(f"User {user.get('email')} with role {user_role} accessed endpoint")
+                logger.debug("User %s with role %s accessed endpoint", user.get('email'), user_role)
                 return f(*args, **kwargs)
                 
             except ApiError as e:
-                logger.error(f"Role check failed: {e.message}")
+                logger.debug("Role check failed: %s", e.message)
                 raise e
             except Exception as e:
-                logger.error(f"Unexpected error in role middleware: {str(e)}")
+                logger.exception("Unexpected error in role middleware: %s", e)
                 raise ApiError(500, "Something went wrong!")
 
         return decorated_function
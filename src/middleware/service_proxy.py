@@ -0,0 +1,81 @@
+from flask import Response, g, request, stream_with_context
+from src.utils.api_error import ApiError
+from src.utils.metrics import track_outbound
+import logging
+
+# Header chỉ có nghĩa trên một kết nối, không chuyển tiếp (RFC 9110 7.6.1)
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailer", "transfer-encoding", "upgrade",
+}
+
+# Header do chính app này đặt (CORS, request id, metrics): bỏ bản của service phía sau
+OWN_RESPONSE_HEADERS = {"x-request-id", "server-timing", "timing-allow-origin"}
+
+# Kết nối tới service nội bộ phải nhanh; thời gian đọc bám theo timeout gunicorn của inference/chat
+PROXY_TIMEOUT = (5, 120)
+
+PROXY_METHODS = ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
+
+
+def _service_url(value):
+    # Render "fromService ... property: hostport" chỉ cho host:port
+    value = value.rstrip("/")
+    return value if "://" in value else f"http://{value}"
+
+
+def service_proxy_middleware(app, url_prefix, target, service):
+    """
+    Forward every request under url_prefix to another deployment role
+    (e.g. /api/snaplang -> the inference service), so clients keep calling
+    the main service while the route is served elsewhere. Bodies are streamed
+    back without decoding.
+    """
+    import requests
+
+    base_url = _service_url(target)
+    endpoint = f"proxy_{service}"
+
+    def forward(path=""):
+        headers = {
+            name: value for name, value in request.headers.items()
+            if name.lower() not in HOP_BY_HOP_HEADERS and name.lower() != "host"
+        }
+        headers["X-Request-ID"] = g.get("request_id", "")
+        headers["X-Forwarded-For"] = ", ".join(filter(None, [request.headers.get("X-Forwarded-For"), request.remote_addr]))
+        headers["X-Forwarded-Host"] = request.host
+        headers["X-Forwarded-Proto"] = request.scheme
+
+        try:
+            with track_outbound(service, request.method.lower()):
+                upstream = requests.request(
+                    request.method,
+                    base_url + request.path,
+                    params=request.query_string,
+                    data=request.get_data(),
+                    headers=headers,
+                    stream=True,
+                    allow_redirects=False,
+                    timeout=PROXY_TIMEOUT,
+                )
+        except requests.RequestException as e:
+            logging.getLogger(__name__).error("Proxy to %s failed: %s", service, e)
+            raise ApiError(502, f"The {service} service is unavailable")
+
+        response_headers = [
+            (name, value) for name, value in upstream.raw.headers.items()
+            if name.lower() not in HOP_BY_HOP_HEADERS
+            and name.lower() not in OWN_RESPONSE_HEADERS
+            and not name.lower().startswith("access-control-")
+        ]
+
+        def body():
+            try:
+                yield from upstream.raw.stream(64 * 1024, decode_content=False)
+            finally:
+                upstream.close()
+
+        return Response(stream_with_context(body()), status=upstream.status_code, headers=response_headers)
+
+    app.add_url_rule(url_prefix, endpoint, forward, methods=PROXY_METHODS)
+    app.add_url_rule(f"{url_prefix}/<path:path>", f"{endpoint}_path", forward, methods=PROXY_METHODS)
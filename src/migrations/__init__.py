@@ -0,0 +1,3 @@
+### Quản lý index và data migration, chạy ngoài lúc khởi động app
+from .indexes import INDEXES, diff_indexes, apply_indexes, verify_indexes
+from .data import MIGRATIONS, pending_migrations, apply_migrations
@@ -0,0 +1,51 @@
+"""
+Chạy migration ngoài lúc khởi động app:
+
+    python -m src.migrations diff                # index thiếu/khác/thừa + data migration chưa chạy
+    python -m src.migrations apply [--drop-extra]  # tạo index và chạy data migration
+"""
+import argparse
+import sys
+
+from src.config.mongodb import MongoDB
+from src.config.logging_config import configure_logging
+from src.migrations.indexes import diff_indexes, apply_indexes
+from src.migrations.data import pending_migrations, apply_migrations
+
+
+def print_changes(changes):
+    if not changes:
+        print("Indexes are up to date")
+    for change in changes:
+        print(f"{change['action']:>8}  {change['collection']}.{change['name']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.migrations")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("diff", help="Show index changes and pending data migrations")
+    apply_parser = subparsers.add_parser("apply", help="Apply index changes and pending data migrations")
+    apply_parser.add_argument(
+        "--drop-extra", action="store_true",
+        help="Also drop indexes that are not declared in the registry"
+    )
+    args = parser.parse_args(argv)
+
+    configure_logging(level="INFO", log_format="text")
+    db = MongoDB.get_db()
+
+    if args.command == "diff":
+        changes = diff_indexes(db)
+        print_changes(changes)
+        for migration_id, _ in pending_migrations(db):
+            print(f" pending  {migration_id}")
+        return 1 if any(change["action"] != "extra" for change in changes) else 0
+
+    print_changes(apply_indexes(db, drop_extra=args.drop_extra))
+    for migration_id, result in apply_migrations(db):
+        print(f" applied  {migration_id} ({result})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
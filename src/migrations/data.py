@@ -0,0 +1,160 @@
+from datetime import datetime
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from src.utils.search import build_user_search_keys, build_flashcard_search_fields, build_content_key
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Collection lưu các data migration đã chạy
+MIGRATIONS_COLLECTION_NAME = "schema_migrations"
+
+
+def backfill_user_search_keys(db, batch_size=1000):
+    """Tính search_keys cho các user tạo trước khi có trường này"""
+    users_collection = db.users
+    cursor = users_collection.find(
+        {"search_keys": {"$exists": False}},
+        {"username": 1, "email": 1, "fullName": 1}
+    ).batch_size(batch_size)
+
+    operations = []
+    updated = 0
+    for user in cursor:
+        operations.append(UpdateOne(
+            {"_id": user["_id"]},
+            {"$set": {"search_keys": build_user_search_keys(user)}}
+        ))
+        if len(operations) >= batch_size:
+            updated += users_collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        updated += users_collection.bulk_write(operations, ordered=False).modified_count
+    return updated
+
+
+def backfill_flashcard_search_fields(db, batch_size=1000):
+    """Tính search_text/search_terms cho các flashcard tạo trước khi có tìm kiếm"""
+    flashcards_collection = db.flashcards
+    cursor = flashcards_collection.find(
+        {"search_terms": {"$exists": False}},
+        {"english": 1, "vietnamese": 1, "object": 1}
+    ).batch_size(batch_size)
+
+    operations = []
+    updated = 0
+    for flashcard in cursor:
+        operations.append(UpdateOne(
+            {"_id": flashcard["_id"]},
+            {"$set": build_flashcard_search_fields(flashcard)}
+        ))
+        if len(operations) >= batch_size:
+            updated += flashcards_collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        updated += flashcards_collection.bulk_write(operations, ordered=False).modified_count
+    return updated
+
+
+def backfill_flashcard_content_keys(db, batch_size=1000):
+    """
+    Set content_key on existing flashcards. Cards already duplicated in a folder
+    keep the key only on the oldest one; the others stay without a key (the
+    partial unique index ignores them) so the migration never hits E11000.
+    """
+    flashcards_collection = db.flashcards
+    # Duyệt ngược index folder_id_1_created_at_-1__id_-1: theo folder, card cũ nhất trước
+    cursor = flashcards_collection.find(
+        {"content_key": {"$exists": False}},
+        {"folder_id": 1, "english": 1, "vietnamese": 1}
+    ).sort([("folder_id", -1), ("created_at", 1), ("_id", 1)]).batch_size(batch_size)
+
+    # Key đã có sẵn trong folder (từ các lần insert sau khi deploy)
+    current_folder_id = None
+    seen_keys = set()
+
+    operations = []
+    updated = 0
+    for flashcard in cursor:
+        if flashcard.get("folder_id") != current_folder_id:
+            current_folder_id = flashcard.get("folder_id")
+            seen_keys = set(flashcards_collection.distinct(
+                "content_key", {"folder_id": current_folder_id, "content_key": {"$exists": True}}
+            ))
+
+        content_key = build_content_key(flashcard)
+        if content_key in seen_keys:
+            continue
+        seen_keys.add(content_key)
+
+        operations.append(UpdateOne(
+            {"_id": flashcard["_id"]},
+            {"$set": {"content_key": content_key}}
+        ))
+        if len(operations) >= batch_size:
+            updated += _write_content_keys(flashcards_collection, operations)
+            operations = []
+    if operations:
+        updated += _write_content_keys(flashcards_collection, operations)
+    return updated
+
+
+def sync_flashcard_visibility(db, batch_size=1000):
+    """
+    Copy each folder's is_public onto its flashcards. Cards added to a public
+    folder used to be stored with is_public false and stayed hidden from search
+    and from other users' review queues.
+    """
+    folders_collection = db.folders
+    flashcards_collection = db.flashcards
+    public_folder_ids = [
+        str(folder["_id"]) for folder in folders_collection.find({"is_public": True}, {"_id": 1})
+    ]
+    updated = 0
+    for start in range(0, len(public_folder_ids), batch_size):
+        updated += flashcards_collection.update_many(
+            {"folder_id": {"$in": public_folder_ids[start:start + batch_size]}, "is_public": {"$ne": True}},
+            {"$set": {"is_public": True}},
+        ).modified_count
+    return updated
+
+
+def _write_content_keys(collection, operations):
+    try:
+        return collection.bulk_write(operations, ordered=False).modified_count
+    except BulkWriteError as e:
+        # Card được thêm trong lúc migration chạy đã giữ key: bỏ qua card cũ trùng với nó
+        if e.details.get("writeConcernErrors") or any(
+            error.get("code") != 11000 for error in e.details.get("writeErrors", [])
+        ):
+            raise
+        return e.details.get("nModified", 0)
+
+
+# Thứ tự chạy cố định; không đổi id của migration đã phát hành
+MIGRATIONS = [
+    ("0001_user_search_keys", backfill_user_search_keys),
+    ("0002_flashcard_search_fields", backfill_flashcard_search_fields),
+    ("0003_flashcard_content_keys", backfill_flashcard_content_keys),
+    ("0004_flashcard_visibility", sync_flashcard_visibility),
+]
+
+
+def pending_migrations(db):
+    applied = {doc["_id"] for doc in db[MIGRATIONS_COLLECTION_NAME].find({}, {"_id": 1})}
+    return [(migration_id, func) for migration_id, func in MIGRATIONS if migration_id not in applied]
+
+
+def apply_migrations(db):
+    """Run pending data migrations in order and record each one"""
+    applied = []
+    for migration_id, func in pending_migrations(db):
+        logger.info("Applying data migration %s", migration_id)
+        result = func(db)
+        db[MIGRATIONS_COLLECTION_NAME].insert_one({
+            "_id": migration_id,
+            "result": result,
+            "applied_at": datetime.utcnow(),
+        })
+        applied.append((migration_id, result))
+    return applied
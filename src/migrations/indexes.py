@@ -0,0 +1,182 @@
+from pymongo import IndexModel, ASCENDING, DESCENDING, TEXT
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Danh sách index cho toàn bộ database, khai báo theo đúng các query đang dùng.
+# Chỉ sửa ở đây rồi chạy `python -m src.migrations apply`, không tạo index lúc import.
+INDEXES = {
+    "users": [
+        # find_one_by_email (login, register, verify)
+        IndexModel([("email", ASCENDING)], name="email_1"),
+        # Danh sách user phân trang keyset
+        IndexModel([("createdAt", DESCENDING), ("_id", DESCENDING)], name="createdAt_-1__id_-1"),
+        # search_users mode "prefix"
+        IndexModel([("search_keys", ASCENDING)], name="search_keys_1"),
+        # search_users mode "text"
+        IndexModel(
+            [("username", TEXT), ("email", TEXT), ("fullName", TEXT)],
+            name="user_text_search",
+        ),
+    ],
+    "folders": [
+        # find_by_user: lọc user_id, sắp xếp created_at desc
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_id_1_created_at_-1"),
+        # Tên folder không trùng trong cùng một user
+        IndexModel([("title", ASCENDING), ("user_id", ASCENDING)], name="title_1_user_id_1", unique=True),
+        # find_public_folders phân trang keyset
+        IndexModel(
+            [("is_public", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="is_public_1_created_at_-1__id_-1",
+        ),
+    ],
+    "flashcards": [
+        # find_by_folder (keyset), count/delete/update theo folder_id dùng chung prefix
+        IndexModel(
+            [("folder_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="folder_id_1_created_at_-1__id_-1",
+        ),
+        IndexModel([("user_id", ASCENDING)], name="user_id_1"),
+        # Chống trùng khi import: insert unordered, card trùng bị index từ chối (E11000).
+        # Partial: card cũ trùng nhau chưa có content_key không chặn việc tạo index
+        IndexModel(
+            [("folder_id", ASCENDING), ("content_key", ASCENDING)],
+            name="folder_id_1_content_key_1",
+            unique=True,
+            partialFilterExpression={"content_key": {"$exists": True}},
+        ),
+        # is_image_in_use: folder clone dùng chung image_url với folder gốc
+        IndexModel([("image_url", ASCENDING)], name="image_url_1"),
+        # search mode "prefix": card của user và card public, mỗi nhánh $or một index
+        IndexModel([("user_id", ASCENDING), ("search_terms", ASCENDING)], name="user_id_1_search_terms_1"),
+        IndexModel([("is_public", ASCENDING), ("search_terms", ASCENDING)], name="is_public_1_search_terms_1"),
+        # search mode "text"; language none: không stem, search_text đã bỏ dấu
+        IndexModel(
+            [("search_text", TEXT)],
+            name="flashcard_text_search",
+            default_language="none",
+        ),
+    ],
+    "courses": [
+        # find_all
+        IndexModel([("created_at", DESCENDING)], name="created_at_-1"),
+        # find_public_courses
+        IndexModel([("is_public", ASCENDING), ("created_at", DESCENDING)], name="is_public_1_created_at_-1"),
+    ],
+    "user_courses": [
+        # find_by_user_and_course (kiểm tra đã đăng ký, course access middleware)
+        IndexModel([("user_id", ASCENDING), ("course_id", ASCENDING)], name="user_id_1_course_id_1"),
+        # find_public_courses_by_user phân trang keyset
+        IndexModel(
+            [("user_id", ASCENDING), ("registered_at", DESCENDING), ("_id", DESCENDING)],
+            name="user_id_1_registered_at_-1__id_-1",
+        ),
+        # delete_all_by_course_id
+        IndexModel([("course_id", ASCENDING)], name="course_id_1"),
+    ],
+    "review_states": [
+        # find_due: card đến hạn sớm nhất của user trên mọi folder
+        IndexModel([("user_id", ASCENDING), ("due_at", ASCENDING)], name="user_id_1_due_at_1"),
+        # find_due theo folder, enroll_folder đếm lại
+        IndexModel(
+            [("user_id", ASCENDING), ("folder_id", ASCENDING), ("due_at", ASCENDING)],
+            name="user_id_1_folder_id_1_due_at_1",
+        ),
+        # Một state cho mỗi (user, flashcard); $merge của enroll_folder bắt buộc phải có
+        IndexModel([("user_id", ASCENDING), ("flashcard_id", ASCENDING)], name="user_id_1_flashcard_id_1", unique=True),
+        # Dọn state khi flashcard/folder bị xóa
+        IndexModel([("flashcard_id", ASCENDING)], name="flashcard_id_1"),
+        IndexModel([("folder_id", ASCENDING)], name="folder_id_1"),
+    ],
+    "import_jobs": [
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_id_1_created_at_-1"),
+        # find_claimable_ids (worker poll)
+        IndexModel([("status", ASCENDING), ("created_at", ASCENDING)], name="status_1_created_at_1"),
+    ],
+}
+
+# Các option được so sánh khi diff (những option khác do server tự thêm)
+COMPARED_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+
+def _is_text_index(key):
+    return any(direction == TEXT for _, direction in key)
+
+
+def _index_matches(expected, existing):
+    """Compare a declared IndexModel document with an index_information() entry"""
+    expected_key = list(expected["key"].items())
+    existing_key = list(existing["key"])
+
+    if _is_text_index(expected_key):
+        # Text index được lưu dưới dạng _fts/_ftsx, so sánh theo weights
+        expected_fields = {field for field, direction in expected_key if direction == TEXT}
+        if set(existing.get("weights", {})) != expected_fields:
+            return False
+    elif [(field, int(direction)) for field, direction in existing_key] != expected_key:
+        return False
+
+    return all(expected.get(option) == existing.get(option) for option in COMPARED_OPTIONS)
+
+
+def diff_indexes(db):
+    """
+    Compare the registry with the database.
+    Returns a list of {"collection", "name", "action"} where action is
+    "create" (missing), "rebuild" (same name, different definition) or
+    "extra" (exists in the database but not in the registry).
+    """
+    changes = []
+    for collection_name, index_models in INDEXES.items():
+        existing_indexes = db[collection_name].index_information()
+        declared_names = set()
+
+        for index_model in index_models:
+            expected = index_model.document
+            name = expected["name"]
+            declared_names.add(name)
+
+            if name not in existing_indexes:
+                changes.append({"collection": collection_name, "name": name, "action": "create"})
+            elif not _index_matches(expected, existing_indexes[name]):
+                changes.append({"collection": collection_name, "name": name, "action": "rebuild"})
+
+        for name in existing_indexes:
+            if name != "_id_" and name not in declared_names:
+                changes.append({"collection": collection_name, "name": name, "action": "extra"})
+
+    return changes
+
+
+def apply_indexes(db, drop_extra=False):
+    """Create missing indexes, rebuild changed ones and optionally drop extras"""
+    changes = diff_indexes(db)
+    for change in changes:
+        collection = db[change["collection"]]
+        action = change["action"]
+
+        if action == "extra" and not drop_extra:
+            continue
+        if action in ("rebuild", "extra"):
+            collection.drop_index(change["name"])
+            logger.info("Dropped index %s.%s", change["collection"], change["name"])
+        if action in ("create", "rebuild"):
+            index_model = next(
+                model for model in INDEXES[change["collection"]]
+                if model.document["name"] == change["name"]
+            )
+            collection.create_indexes([index_model])
+            logger.info("Created index %s.%s", change["collection"], change["name"])
+
+    return changes
+
+
+def verify_indexes(db):
+    """Startup check: only report indexes that are missing or out of date, never build them"""
+    problems = [change for change in diff_indexes(db) if change["action"] != "extra"]
+    for change in problems:
+        logger.warning(
+            "Index %s.%s needs %s; run `python -m src.migrations apply`",
+            change["collection"], change["name"], change["action"],
+        )
+    return problems
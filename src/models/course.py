@@ -2,7 +2,7 @@ from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
 from bson import ObjectId
 
-from src.config.mongodb import MongoDB
+from src.config.mongodb import LazyCollection
 
 class CourseSchemaDB(BaseModel):
     title: str = Field(..., min_length=1, max_length=100)
@@ -39,8 +39,40 @@ class CourseSchemaDB(BaseModel):
             raise ValueError('Video URL is required')
         return v
 
+# Các trường cần cho danh sách khóa học (không gồm thông tin video nội bộ)
+COURSE_LIST_PROJECTION = {
+    "title": 1,
+    "description": 1,
+    "thumbnail_url": 1,
+    "video_duration": 1,
+    "is_public": 1,
+    "user_id": 1,
+    "created_at": 1,
+    "updated_at": 1,
+}
+
+# Danh sách chỉ hiển thị đoạn đầu của mô tả (tối đa 5000 ký tự), bản đầy đủ lấy ở trang chi tiết
+COURSE_DESCRIPTION_EXCERPT_CHARS = 300
+
+COURSE_LIST_STAGE = {
+    "$project": {
+        **COURSE_LIST_PROJECTION,
+        # $substrCP cắt theo code point nên không làm vỡ ký tự tiếng Việt
+        "description": {"$substrCP": [{"$ifNull": ["$description", ""]}, 0, COURSE_DESCRIPTION_EXCERPT_CHARS]},
+    }
+}
+
+# Trang quản trị cần thêm thông tin video để xem trước
+COURSE_ADMIN_LIST_STAGE = {
+    "$project": {
+        **COURSE_LIST_STAGE["$project"],
+        "video_url": 1,
+        "video_format": 1,
+    }
+}
+
 class CourseModel:
-    COURSE_COLLECTION_NAME = MongoDB.get_db()["courses"]
+    COURSE_COLLECTION_NAME = LazyCollection("courses")
 
     @classmethod
     def create_new(cls, course_data):
@@ -83,10 +115,18 @@ class CourseModel:
 
     @classmethod
     def find_all(cls):
-        courses = cls.COURSE_COLLECTION_NAME.find().sort("created_at", -1)
-        return list(courses)
+        pipeline = [
+            {"$sort": {"created_at": -1}},
+            COURSE_ADMIN_LIST_STAGE,
+        ]
+        return list(cls.COURSE_COLLECTION_NAME.aggregate(pipeline))
 
     @classmethod
     def find_public_courses(cls):
-        courses = cls.COURSE_COLLECTION_NAME.find({"is_public": True}).sort("created_at", -1)
-        return list(courses)
+        pipeline = [
+            {"$match": {"is_public": True}},
+            {"$sort": {"created_at": -1}},
+            COURSE_LIST_STAGE,
+        ]
+        return list(cls.COURSE_COLLECTION_NAME.aggregate(pipeline))
+
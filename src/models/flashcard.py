@@ -1,14 +1,50 @@
 from pydantic import BaseModel, Field, validator, field_validator
 from datetime import datetime
 from bson import ObjectId
-from src.config.mongodb import MongoDB
+from src.config.mongodb import LazyCollection
 from src.utils.api_error import ApiError
 from src.utils.error_handlers import model_error_handler
-import logging
-from pymongo import ReturnDocument
-import asyncio
+from src.utils.pagination import find_page, DEFAULT_PAGE_SIZE
+from src.utils.search import (
+    build_content_key, build_flashcard_search_fields, fold_accents, prefix_query, SEARCH_COUNT_CAP
+)
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from bson.raw_bson import RawBSONDocument
+import bson
 from concurrent.futures import ThreadPoolExecutor
 
+# Giới hạn ghi của MongoDB: 16MB/document, 48MB/message, 100000 write/batch.
+# Batch nhỏ hơn nhiều để mỗi request insert_many nằm gọn trong một message.
+MAX_BSON_DOCUMENT_BYTES = 16 * 1024 * 1024
+MAX_BULK_BATCH_BYTES = 8 * 1024 * 1024
+MAX_BULK_BATCH_COUNT = 1000
+
+# Các trường hiển thị trong danh sách flashcard của folder (created_at cần cho cursor)
+FLASHCARD_LIST_PROJECTION = {
+    "english": 1,
+    "vietnamese": 1,
+    "object": 1,
+    "image_url": 1,
+    "folder_id": 1,
+    "is_public": 1,
+    "created_at": 1,
+}
+
+# Trường chỉ dùng nội bộ (tìm kiếm, chống trùng), không trả về client
+INTERNAL_FIELDS = ("search_text", "search_terms", "content_key")
+WITHOUT_INTERNAL_FIELDS = {field: 0 for field in INTERNAL_FIELDS}
+
+# Mã lỗi duplicate key của MongoDB (unique index folder_id + content_key)
+DUPLICATE_KEY_ERROR = 11000
+
+# Export đọc cursor theo từng batch, không bao giờ giữ cả folder trong bộ nhớ
+EXPORT_BATCH_SIZE = 500
+EXPORT_PROJECTION = {"_id": 0, "english": 1, "vietnamese": 1, "object": 1, "image_url": 1, "folder_id": 1}
+
+# Search mode "prefix" chỉ xếp hạng trong bấy nhiêu kết quả khớp đầu tiên
+SEARCH_CANDIDATE_CAP = 500
+
 class FlashcardSchemaDB(BaseModel):
     english: str = Field(..., min_length=1, max_length=200)
     vietnamese: str = Field(..., min_length=1, max_length=200)
@@ -32,20 +68,114 @@ class FlashcardSchemaDB(BaseModel):
         from_attributes = True
 
 class FlashcardModel:
-    FLASHCARD_COLLECTION_NAME = MongoDB.get_db()["flashcards"]
-    
-    FLASHCARD_COLLECTION_NAME.create_index("folder_id")
-    FLASHCARD_COLLECTION_NAME.create_index("user_id")
+    FLASHCARD_COLLECTION_NAME = LazyCollection("flashcards")
 
     @classmethod
     @model_error_handler
-    def find_by_folder(cls, folder_id, skip=0, limit=100):
+    def find_by_folder(cls, folder_id, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """Find one page of flashcards in a folder; returns (flashcards, next_cursor)"""
         if not ObjectId.is_valid(folder_id):
             raise ApiError(400, "Invalid folder ID format")
         
         query = {"folder_id": folder_id}
-        cursor = cls.FLASHCARD_COLLECTION_NAME.find(query).sort("created_at", -1).skip(skip).limit(limit)
-        return list(cursor)
+        return find_page(
+            cls.FLASHCARD_COLLECTION_NAME, query, cursor=cursor, limit=limit, projection=FLASHCARD_LIST_PROJECTION
+        )
+
+    @classmethod
+    @model_error_handler
+    def clone_folder(cls, source_folder_id, target_folder_id, user_id):
+        """
+        Copy every flashcard of a folder into another folder owned by user_id,
+        server-side with one $merge: documents never go through Python.
+        Image URLs, search fields and content keys are kept as they are.
+        Returns the number of flashcards in the target folder.
+        """
+        pipeline = [
+            {"$match": {"folder_id": source_folder_id}},
+            # _id mới được sinh khi $merge insert
+            {"$unset": "_id"},
+            {"$set": {
+                "folder_id": target_folder_id,
+                "user_id": user_id,
+                "is_public": False,
+                "updated_at": datetime.utcnow(),
+            }},
+            {"$merge": {"into": "flashcards", "whenMatched": "fail", "whenNotMatched": "insert"}},
+        ]
+        cls.FLASHCARD_COLLECTION_NAME.aggregate(pipeline)
+        return cls.FLASHCARD_COLLECTION_NAME.count_documents({"folder_id": target_folder_id})
+
+    @classmethod
+    @model_error_handler
+    def is_image_in_use(cls, image_url):
+        """Whether any flashcard still points to the image (cloned folders share image URLs)"""
+        return cls.FLASHCARD_COLLECTION_NAME.count_documents({"image_url": image_url}, limit=1) > 0
+
+    @classmethod
+    @model_error_handler
+    def iter_by_folders(cls, folder_ids, batch_size=EXPORT_BATCH_SIZE):
+        """
+        Lazy cursor over every flashcard of the folders, oldest first per folder.
+        Walks folder_id_1_created_at_-1__id_-1 backwards, so there is no in-memory sort.
+        """
+        return (
+            cls.FLASHCARD_COLLECTION_NAME.find({"folder_id": {"$in": list(folder_ids)}}, EXPORT_PROJECTION)
+            .sort([("folder_id", -1), ("created_at", 1), ("_id", 1)])
+            .batch_size(batch_size)
+        )
+
+    @classmethod
+    @model_error_handler
+    def search(cls, user_id, search_query, mode="prefix", limit=20, offset=0):
+        """
+        Search english/vietnamese/object of the user's own cards and public cards,
+        ignoring case and Vietnamese diacritics ("dong ho" matches "đồng hồ").
+        - mode "prefix": every word is the prefix of a term (type-ahead), ranked
+          exact term first then shorter words, among the first SEARCH_CANDIDATE_CAP matches
+        - mode "text": text index on search_text, ranked by relevance
+        Returns (flashcards, total_count, total_is_exact).
+        """
+        folded = fold_accents(search_query).strip()
+        if not folded:
+            return [], 0, True
+
+        if mode == "text":
+            query = {
+                "$text": {"$search": folded},
+                "$or": [{"user_id": user_id}, {"is_public": True}],
+            }
+            total_count = cls.FLASHCARD_COLLECTION_NAME.count_documents(query, limit=SEARCH_COUNT_CAP)
+            flashcards = list(
+                cls.FLASHCARD_COLLECTION_NAME.find(query, {**FLASHCARD_LIST_PROJECTION, "score": {"$meta": "textScore"}})
+                .sort([("score", {"$meta": "textScore"})])
+                .skip(offset)
+                .limit(limit)
+            )
+            return flashcards, total_count, total_count < SEARCH_COUNT_CAP
+
+        terms = prefix_query("search_terms", folded)
+        if not terms:
+            return [], 0, True
+        # Mỗi nhánh dùng index riêng: user_id_1_search_terms_1 và is_public_1_search_terms_1
+        query = {"$or": [{"user_id": user_id, **terms}, {"is_public": True, **terms}]}
+
+        pipeline = [
+            {"$match": query},
+            {"$limit": SEARCH_CANDIDATE_CAP},
+            {"$addFields": {
+                "exact": {"$in": [folded, "$search_terms"]},
+                "length": {"$strLenCP": {"$ifNull": ["$english", ""]}},
+            }},
+            {"$sort": {"exact": -1, "length": 1, "_id": -1}},
+            {"$facet": {
+                "flashcards": [{"$skip": offset}, {"$limit": limit}, {"$project": FLASHCARD_LIST_PROJECTION}],
+                "total": [{"$count": "count"}],
+            }},
+        ]
+        result = next(cls.FLASHCARD_COLLECTION_NAME.aggregate(pipeline), {"flashcards": [], "total": []})
+        total_count = result["total"][0]["count"] if result["total"] else 0
+        return result["flashcards"], total_count, total_count < SEARCH_CANDIDATE_CAP
 
     @classmethod
     @model_error_handler
@@ -54,7 +184,7 @@ class FlashcardModel:
             raise ApiError(400, "Invalid flashcard ID format")
 
         query = {"_id": ObjectId(flashcard_id)}
-        flashcard = cls.FLASHCARD_COLLECTION_NAME.find_one(query)
+        flashcard = cls.FLASHCARD_COLLECTION_NAME.find_one(query, WITHOUT_INTERNAL_FIELDS)
         
         if not flashcard:
             raise ApiError(404, "Flashcard not found")
@@ -67,72 +197,163 @@ class FlashcardModel:
         if not ObjectId.is_valid(flashcard_id):
             raise ApiError(400, "Invalid flashcard ID format")
 
-        flashcard = cls.FLASHCARD_COLLECTION_NAME.find_one({"_id": ObjectId(flashcard_id)})
-        if not flashcard:
-            raise ApiError(404, "Flashcard not found")
-            
+        # Chỉ request thực sự xóa được document mới giảm counter (an toàn khi xóa đồng thời)
         result = cls.FLASHCARD_COLLECTION_NAME.find_one_and_delete(
-            {"_id": ObjectId(flashcard_id)}
+            {"_id": ObjectId(flashcard_id)},
+            projection=WITHOUT_INTERNAL_FIELDS,
         )
-        
-        if result:
-            from src.models.folder import FolderModel
-            FolderModel.increment_flashcard_count(result["folder_id"], increment=-1)
-            
+        if not result:
+            raise ApiError(404, "Flashcard not found")
+
+        from src.models.folder import FolderModel
+        FolderModel.increment_flashcard_count(result["folder_id"], increment=-1)
+
         return result
 
     @classmethod
     @model_error_handler
-    async def delete_by_folder(cls, folder_id):
-        """Delete all flashcards in a folder asynchronously"""
+    def delete_by_folder(cls, folder_id):
+        """Delete all flashcards in a folder and the Cloudinary images no other card uses"""
         if not ObjectId.is_valid(folder_id):
             raise ApiError(400, "Invalid folder ID format")
-            
-        # First, delete all flashcards in a single operation
-        result = cls.FLASHCARD_COLLECTION_NAME.delete_many({"folder_id": folder_id})
-        deleted_count = result.deleted_count
-        
-        if deleted_count > 0:
-            # Get deleted flashcards for image cleanup
-            deleted_flashcards = list(cls.FLASHCARD_COLLECTION_NAME.find({
-                "folder_id": folder_id,
-                "image_url": {"$exists": True}
-            }))
-            
-            # Create a thread pool for handling Cloudinary operations
-            with ThreadPoolExecutor() as executor:
-                # Delete images from Cloudinary concurrently
-                from src.config.cloudinary import CloudinaryService
-                delete_tasks = []
-                for flashcard in deleted_flashcards:
-                    if flashcard.get("image_url"):
-                        delete_tasks.append(
-                            asyncio.get_event_loop().run_in_executor(
-                                executor,
-                                CloudinaryService.delete_image,
-                                flashcard["image_url"]
-                            )
-                        )
-                
-                # Wait for all image deletions to complete
-                if delete_tasks:
-                    await asyncio.gather(*delete_tasks)
-        
+
+        from src.config.cloudinary import CloudinaryService, public_id_from_url
+
+        # Lấy danh sách ảnh trước khi xóa, sau khi xóa không còn document để đọc.
+        # Card tạo trước khi có image_public_id: suy ra public_id từ URL Cloudinary
+        images = {}
+        for flashcard in cls.FLASHCARD_COLLECTION_NAME.find(
+            {"folder_id": folder_id, "image_url": {"$type": "string"}},
+            {"_id": 0, "image_url": 1, "image_public_id": 1},
+        ):
+            public_id = flashcard.get("image_public_id") or public_id_from_url(flashcard["image_url"])
+            if public_id:
+                images[flashcard["image_url"]] = public_id
+
+        deleted_count = cls.FLASHCARD_COLLECTION_NAME.delete_many({"folder_id": folder_id}).deleted_count
+
+        # Folder clone dùng chung ảnh với folder gốc: chỉ xóa ảnh không còn card nào trỏ tới
+        public_ids = [public_id for url, public_id in images.items() if not cls.is_image_in_use(url)]
+        if public_ids:
+            # delete_image tự log lỗi và không raise
+            with ThreadPoolExecutor(max_workers=min(8, len(public_ids))) as executor:
+                list(executor.map(CloudinaryService.delete_image, public_ids))
+
         return deleted_count
 
+    @classmethod
+    def _iter_bulk_batches(cls, flashcards, errors):
+        """
+        Encode each flashcard once and group them into batches that stay under
+        the server's write batch limits. Yields (start_index, batch).
+        """
+        batch = []
+        batch_start = 0
+        batch_bytes = 0
+
+        for index, flashcard in enumerate(flashcards):
+            # Gán _id phía client để trả về id mà không cần query lại
+            flashcard.setdefault("_id", ObjectId())
+            if "search_terms" not in flashcard:
+                flashcard.update(build_flashcard_search_fields(flashcard))
+            flashcard.setdefault("content_key", build_content_key(flashcard))
+            raw = RawBSONDocument(bson.encode(flashcard))
+
+            if len(raw.raw) > MAX_BSON_DOCUMENT_BYTES:
+                errors.append({"index": index, "code": "DocumentTooLarge", "error": "Flashcard document is too large"})
+                raw = None
+
+            if batch and (
+                len(batch) >= MAX_BULK_BATCH_COUNT
+                or batch_bytes + (len(raw.raw) if raw else 0) > MAX_BULK_BATCH_BYTES
+            ):
+                yield batch_start, batch
+                batch = []
+                batch_bytes = 0
+
+            if not batch:
+                batch_start = index
+
+            # Giữ chỗ để index trong batch khớp với index trong input
+            batch.append(raw)
+            batch_bytes += len(raw.raw) if raw else 0
+
+        if batch:
+            yield batch_start, batch
+
     @classmethod
     @model_error_handler
     def bulk_insert(cls, flashcards):
-        """Bulk insert flashcards"""
+        """
+        Unordered bulk insert. One bad document no longer aborts the rest:
+        failures are reported per input index and `inserted_ids` is aligned
+        with the input list (None for cards that were not inserted).
+        Cards whose content_key already exists in the folder (or earlier in the
+        same list) are rejected by the unique index in the same round trip and
+        listed in `duplicate_indexes` instead of `errors`.
+        """
         if not flashcards:
-            return {"inserted_count": 0}
-                
-        result = cls.FLASHCARD_COLLECTION_NAME.insert_many(flashcards)
-        return {"inserted_count": len(result.inserted_ids)}
+            return {"inserted_count": 0, "inserted_ids": [], "errors": [], "duplicate_indexes": []}
+
+        inserted_ids = [None] * len(flashcards)
+        errors = []
+        duplicate_indexes = []
+
+        for start, batch in cls._iter_bulk_batches(flashcards, errors):
+            documents = [raw for raw in batch if raw is not None]
+            # Vị trí trong `documents` -> vị trí trong input
+            positions = [start + offset for offset, raw in enumerate(batch) if raw is not None]
+            failed = set()
+
+            if documents:
+                try:
+                    cls.FLASHCARD_COLLECTION_NAME.insert_many(documents, ordered=False)
+                except BulkWriteError as e:
+                    if e.details.get("writeConcernErrors"):
+                        raise
+                    for write_error in e.details.get("writeErrors", []):
+                        index = positions[write_error["index"]]
+                        failed.add(index)
+                        if write_error.get("code") == DUPLICATE_KEY_ERROR:
+                            duplicate_indexes.append(index)
+                            continue
+                        errors.append({
+                            "index": index,
+                            "code": write_error.get("code"),
+                            "error": write_error.get("errmsg"),
+                        })
+
+            for index in positions:
+                if index not in failed:
+                    inserted_ids[index] = flashcards[index]["_id"]
+
+        errors.sort(key=lambda error: error["index"])
+        return {
+            "inserted_count": sum(1 for inserted_id in inserted_ids if inserted_id is not None),
+            "inserted_ids": inserted_ids,
+            "errors": errors,
+            "duplicate_indexes": sorted(duplicate_indexes),
+        }
 
     @classmethod
     @model_error_handler
-    async def make_all_public_by_folder(cls, folder_id, is_public):
+    def set_images(cls, images):
+        """Store uploaded images on inserted flashcards: images is a list of (flashcard_id, url, public_id)"""
+        if not images:
+            return 0
+        now = datetime.utcnow()
+        result = cls.FLASHCARD_COLLECTION_NAME.bulk_write([
+            UpdateOne(
+                {"_id": flashcard_id},
+                {"$set": {"image_url": image_url, "image_public_id": public_id, "updated_at": now}},
+            )
+            for flashcard_id, image_url, public_id in images
+        ], ordered=False)
+        return result.modified_count
+
+    @classmethod
+    @model_error_handler
+    def make_all_public_by_folder(cls, folder_id, is_public):
         """Update all flashcards in a folder public state"""
         if not ObjectId.is_valid(folder_id):
             raise ApiError(400, "Invalid folder ID format")
@@ -149,20 +370,3 @@ class FlashcardModel:
         )
         
         return result.modified_count
-
-    @classmethod
-    @model_error_handler
-    def count_by_folder(cls, folder_id):
-        """Count flashcards in a folder"""
-        logger = logging.getLogger(__name__)
-        logger.info(f"=== Model: Counting flashcards in folder {folder_id} ===")
-        
-        if not ObjectId.is_valid(folder_id):
-            raise ApiError(400, "Invalid folder ID format")
-        
-        query = {"folder_id": folder_id}
-        count = cls.FLASHCARD_COLLECTION_NAME.count_documents(query)
-        logger.info(f"Found {count} flashcards in folder {folder_id}")
-        
-        return count
-
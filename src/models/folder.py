@@ -1,16 +1,25 @@
 from pydantic import BaseModel, Field, validator
-from datetime import datetime
+from datetime import datetime, timedelta
 from bson import ObjectId
-from src.config.mongodb import MongoDB
+from src.config.mongodb import LazyCollection
 from src.utils.api_error import ApiError
 from src.utils.error_handlers import model_error_handler
+from src.utils.pagination import find_page, DEFAULT_PAGE_SIZE
 import re
 import logging
-from pymongo import ReturnDocument
+from pymongo import ReturnDocument, UpdateOne
+from src.utils.cache import PUBLIC_FOLDERS_CACHE
+
+
+# Độ dài tối đa của title folder
+MAX_TITLE_LENGTH = 30
+
+# Số hậu tố " (copy N)" thử khi tìm title mặc định cho folder clone
+MAX_COPY_SUFFIX = 100
 
 
 class FolderSchemaDB(BaseModel):
-    title: str = Field(..., min_length=1, max_length=30)
+    title: str = Field(..., min_length=1, max_length=MAX_TITLE_LENGTH)
     user_id: str  # ID của người tạo folder
     flashcard_count: int = Field(default=0)  
     is_public: bool = Field(default=False) 
@@ -29,26 +38,31 @@ class FolderSchemaDB(BaseModel):
     class Config:
         from_attributes = True
 
+# Đối soát bỏ qua folder có ghi gần đây: $inc của card vừa insert/xóa có thể chưa tới
+RECONCILE_GRACE_PERIOD = timedelta(minutes=5)
+
+# Các trường hiển thị trong danh sách folder
+FOLDER_LIST_PROJECTION = {
+    "title": 1,
+    "user_id": 1,
+    "flashcard_count": 1,
+    "is_public": 1,
+    "created_at": 1,
+    "updated_at": 1,
+}
+
 class FolderModel:
     ### Define Collection
-    FOLDER_COLLECTION_NAME = MongoDB.get_db()["folders"]
-    
-    # Tạo index cho user_id để tối ưu tìm kiếm
-    FOLDER_COLLECTION_NAME.create_index("user_id")
-    # Tạo index cho title và user_id để đảm bảo tên folder không trùng lặp cho mỗi user
-    FOLDER_COLLECTION_NAME.create_index([("title", 1), ("user_id", 1)], unique=True)
+    FOLDER_COLLECTION_NAME = LazyCollection("folders")
 
     @classmethod
     @model_error_handler
     def create_new(cls, folder_data):
         """Create a new folder"""
         logger = logging.getLogger(__name__)
-        logger.info(f"=== Model: Creating new folder ===")
-        logger.info(f"Input data: {folder_data}")
         
         try:
             validated_folder = FolderSchemaDB(**folder_data)
-            logger.info(f"Validated folder data: {validated_folder.model_dump()}")
             
             # Kiểm tra xem folder với title này đã tồn tại chưa
             existing_folder = cls.FOLDER_COLLECTION_NAME.find_one({
@@ -57,11 +71,11 @@ class FolderModel:
             })
             
             if existing_folder:
-                logger.error(f"Folder with title '{validated_folder.title}' already exists for user {validated_folder.user_id}")
+                logger.info("Folder with title '%s' already exists for user %s", validated_folder.title, validated_folder.user_id)
                 raise ApiError(400, f"Folder with title '{validated_folder.title}' already exists")
             
             result = cls.FOLDER_COLLECTION_NAME.insert_one(validated_folder.model_dump())
-            logger.info(f"Insert result: {result.inserted_id}")
+            logger.debug("Created folder %s", result.inserted_id)
             
             return str(result.inserted_id)
         except ApiError as e:
@@ -70,33 +84,51 @@ class FolderModel:
         except Exception as e:
             # Kiểm tra lỗi trùng lặp từ MongoDB (duplicate key error)
             if "duplicate key error" in str(e) and "title" in str(e):
-                logger.error(f"Duplicate folder title error: {str(e)}")
+                logger.info("Duplicate folder title error: %s", e)
                 raise ApiError(400, f"Folder with this title already exists")
-            logger.error(f"Error creating folder: {str(e)}")
+            logger.error("Error creating folder: %s", e)
             raise
 
+    @classmethod
+    @model_error_handler
+    def available_title(cls, user_id, title):
+        """
+        First of "<title>", "<title> (copy)", "<title> (copy 2)", ... that the
+        user does not already use, shortening <title> so it fits MAX_TITLE_LENGTH.
+        All candidates are checked with one query.
+        """
+        title = title.strip()
+        candidates = [title[:MAX_TITLE_LENGTH]]
+        for number in range(1, MAX_COPY_SUFFIX + 1):
+            suffix = " (copy)" if number == 1 else f" (copy {number})"
+            candidates.append(title[:MAX_TITLE_LENGTH - len(suffix)].rstrip() + suffix)
+
+        taken = {
+            folder["title"]
+            for folder in cls.FOLDER_COLLECTION_NAME.find(
+                {"user_id": user_id, "title": {"$in": candidates}}, {"title": 1, "_id": 0}
+            )
+        }
+        for candidate in candidates:
+            if candidate not in taken:
+                return candidate
+        raise ApiError(400, f"Too many copies of folder '{title}'")
+
     @classmethod
     @model_error_handler
     def find_by_user(cls, user_id):
         """Find all folders by user ID"""
         logger = logging.getLogger(__name__)
-        logger.info(f"=== Model: Finding folders for user {user_id} ===")
-        logger.info(f"User ID type: {type(user_id)}")
         
         # Đảm bảo user_id là string khi query
         if isinstance(user_id, ObjectId):
             user_id = str(user_id)
         
         query = {"user_id": user_id}
-        logger.info(f"MongoDB query: {query}")
         
-        cursor = cls.FOLDER_COLLECTION_NAME.find(query).sort("created_at", -1)
+        cursor = cls.FOLDER_COLLECTION_NAME.find(query, FOLDER_LIST_PROJECTION).sort("created_at", -1)
         result = list(cursor)
-        logger.info(f"Query returned {len(result)} folders")
-        
-        # Log first folder for debugging if available
-        if result and len(result) > 0:
-            logger.info(f"First folder sample: {result[0]}")
+        logger.debug("Found %s folders for user %s", len(result), user_id)
         
         return result
 
@@ -105,24 +137,20 @@ class FolderModel:
     def find_by_id(cls, folder_id):
         """Find folder by ID"""
         logger = logging.getLogger(__name__)
-        logger.info(f"=== Model: Finding folder by ID: {folder_id} ===")
         
         if not ObjectId.is_valid(folder_id):
-            logger.error(f"Invalid folder ID format: {folder_id}")
+            logger.debug("Invalid folder ID format: %s", folder_id)
             raise ApiError(400, "Invalid folder ID")
 
         # Bỏ điều kiện _destroy để kiểm tra
         query = {"_id": ObjectId(folder_id)}
-        logger.info(f"MongoDB query: {query}")
         
         folder = cls.FOLDER_COLLECTION_NAME.find_one(query)
-        logger.info(f"Query result: {folder}")
         
         if folder:
             folder["_id"] = str(folder["_id"])
-            logger.info(f"Converted _id to string: {folder['_id']}")
         else:
-            logger.warning(f"No folder found with ID: {folder_id}")
+            logger.debug("No folder found with ID: %s", folder_id)
             
         return folder
 
@@ -131,8 +159,7 @@ class FolderModel:
     def update(cls, folder_id, update_data):
         """Update folder data"""
         logger = logging.getLogger(__name__)
-        logger.info(f"=== Model: Updating folder {folder_id} ===")
-        logger.info(f"Update data: {update_data}")
+        logger.debug("Updating folder %s fields %s", folder_id, list(update_data))
         
         if not ObjectId.is_valid(folder_id):
             raise ApiError(400, "Invalid folder ID")
@@ -161,7 +188,7 @@ class FolderModel:
                 })
                 
                 if existing_folder:
-                    logger.error(f"Folder with title '{update_data['title']}' already exists for user {current_folder['user_id']}")
+                    logger.info("Folder with title '%s' already exists for user %s", update_data['title'], current_folder['user_id'])
                     raise ApiError(400, f"Folder with title '{update_data['title']}' already exists")
 
         try:
@@ -173,17 +200,16 @@ class FolderModel:
             
             if result:
                 result["_id"] = str(result["_id"])
-                logger.info(f"Updated folder: {result}")
             else:
-                logger.warning(f"No folder found with ID: {folder_id}")
+                logger.debug("No folder found with ID: %s", folder_id)
                 
             return result
         except Exception as e:
             # Kiểm tra lỗi trùng lặp từ MongoDB (duplicate key error)
             if "duplicate key error" in str(e) and "title" in str(e):
-                logger.error(f"Duplicate folder title error: {str(e)}")
+                logger.info("Duplicate folder title error: %s", e)
                 raise ApiError(400, f"Folder with this title already exists")
-            logger.error(f"Error updating folder: {str(e)}")
+            logger.error("Error updating folder: %s", e)
             raise
     
     @classmethod
@@ -205,59 +231,104 @@ class FolderModel:
     @classmethod
     @model_error_handler
     def increment_flashcard_count(cls, folder_id, increment=1):
-        """Increment or decrement flashcard count"""
+        """
+        Apply a flashcard_count delta with one atomic $inc. This is the only
+        way the counter changes on the hot path; callers pass the number of
+        documents their write actually inserted/deleted and never recount.
+        Drift (crash between the two writes) is fixed by reconcile_flashcard_counts.
+        """
         if not ObjectId.is_valid(folder_id):
             raise ApiError(400, "Invalid folder ID")
 
-        logging.info(f"Incrementing flashcard count for folder {folder_id} by {increment}")
-        query = {"_id": ObjectId(folder_id)}
-        logging.info(f"Query for updating folder: {query}")
+        # Cùng một round trip: chỉ lấy is_public để biết có cần invalidate cache danh sách public
         result = cls.FOLDER_COLLECTION_NAME.find_one_and_update(
-            query,
+            {"_id": ObjectId(folder_id)},
             {
                 "$inc": {"flashcard_count": increment},
                 "$set": {"updated_at": datetime.utcnow()}
             },
-            return_document=ReturnDocument.AFTER
+            projection={"is_public": 1},
         )
-        
-        if result:
-            logging.info(f"Updated flashcard count for folder {folder_id}: {result['flashcard_count']}")
-        else:
-            logging.error(f"Failed to update flashcard count for folder {folder_id}")
+
+        if result is None:
+            logging.getLogger(__name__).warning("Folder %s not found while updating flashcard_count", folder_id)
+        elif result.get("is_public"):
+            # Số flashcard hiển thị trong danh sách folder public
+            PUBLIC_FOLDERS_CACHE.invalidate()
 
     @classmethod
     @model_error_handler
-    def find_public_folders(cls, skip=0, limit=100):
-        """Find all public folders"""
-        logger = logging.getLogger(__name__)
-        logger.info("=== Model: Finding public folders ===")
-        
+    def find_public_folders(cls, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """Find one page of public folders; returns (folders, next_cursor)"""
         query = {
             "is_public": True,
         }
         
-        cursor = cls.FOLDER_COLLECTION_NAME.find(query).sort("created_at", -1).skip(skip).limit(limit)
-        return list(cursor)
+        return find_page(
+            cls.FOLDER_COLLECTION_NAME, query, cursor=cursor, limit=limit, projection=FOLDER_LIST_PROJECTION
+        )
 
     @classmethod
     @model_error_handler
-    def update_flashcard_count(cls, folder_id, count):
-        """Update folder's flashcard count to an exact value"""
+    def reconcile_flashcard_counts(cls, batch_size=1000):
+        """
+        Fix flashcard_count drift for every folder with one $group over flashcards.
+        A card can already be counted by $group while its caller's $inc has not
+        landed yet; correcting that folder would make the $inc count it twice.
+        So only folders whose own updated_at and newest card write are older
+        than RECONCILE_GRACE_PERIOD are corrected; recently written folders are
+        left for the next run. Each fix is also guarded by the values read.
+        Returns the number of folders corrected.
+        """
+        from src.models.flashcard import FlashcardModel
         logger = logging.getLogger(__name__)
-        logger.info(f"=== Model: Updating folder {folder_id} flashcard_count to {count} ===")
-        
-        if not ObjectId.is_valid(folder_id):
-            raise ApiError(400, "Invalid folder ID format")
-        
-        result = cls.FOLDER_COLLECTION_NAME.update_one(
-            {"_id": ObjectId(folder_id)},
-            {"$set": {"flashcard_count": count}}
-        )
-        
-        if result.modified_count > 0:
-            logger.info(f"Updated folder {folder_id} flashcard_count to {count}")
-        else:
-            logger.error(f"Failed to update flashcard count for folder {folder_id}")
-        
-        return result.modified_count
+
+        cutoff = datetime.utcnow() - RECONCILE_GRACE_PERIOD
+        folders = list(cls.FOLDER_COLLECTION_NAME.find(
+            {"$or": [
+                {"updated_at": {"$lt": cutoff}},
+                # Folder chưa từng được $inc
+                {"updated_at": None, "created_at": {"$lt": cutoff}},
+            ]},
+            {"flashcard_count": 1, "updated_at": 1},
+        ))
+
+        counts = {}
+        recently_written = set()
+        for row in FlashcardModel.FLASHCARD_COLLECTION_NAME.aggregate(
+            [{"$group": {
+                "_id": "$folder_id",
+                "count": {"$sum": 1},
+                # Card clone giữ created_at của card gốc nhưng có updated_at mới
+                "last_write": {"$max": {"$ifNull": ["$updated_at", "$created_at"]}},
+            }}],
+            allowDiskUse=True,
+        ):
+            counts[row["_id"]] = row["count"]
+            if row["last_write"] is not None and row["last_write"] >= cutoff:
+                recently_written.add(row["_id"])
+
+        operations = []
+        for folder in folders:
+            folder_id = str(folder["_id"])
+            if folder_id in recently_written:
+                continue
+            expected = counts.get(folder_id, 0)
+            current = folder.get("flashcard_count")
+            if current == expected:
+                continue
+            operations.append(UpdateOne(
+                {"_id": folder["_id"], "flashcard_count": current, "updated_at": folder.get("updated_at")},
+                {"$set": {"flashcard_count": expected}},
+            ))
+
+        corrected = 0
+        for start in range(0, len(operations), batch_size):
+            result = cls.FOLDER_COLLECTION_NAME.bulk_write(operations[start:start + batch_size], ordered=False)
+            corrected += result.modified_count
+
+        if corrected:
+            logger.warning("Corrected flashcard_count of %s folders", corrected)
+            PUBLIC_FOLDERS_CACHE.invalidate()
+        logger.info("Reconciled flashcard_count: %s folders checked, %s corrected", len(folders), corrected)
+        return corrected
@@ -0,0 +1,241 @@
+from pydantic import BaseModel, Field
+from datetime import datetime, timedelta
+import uuid
+from bson import ObjectId
+from gridfs import GridFSBucket
+from gridfs.errors import NoFile
+from pymongo import ReturnDocument
+from src.config.mongodb import MongoDB, LazyCollection
+from src.utils.api_error import ApiError
+from src.utils.error_handlers import model_error_handler
+
+# Số lỗi tối đa lưu lại trong job để document không phình to
+MAX_STORED_ERRORS = 100
+
+# Job "running" không cập nhật quá thời gian này được coi là đã chết (worker crash)
+STALE_JOB_TIMEOUT = timedelta(minutes=10)
+
+# File của job lỗi tạm thời được giữ lại để resume trong khoảng này, sau đó worker xóa
+FAILED_JOB_FILE_RETENTION = timedelta(hours=24)
+
+
+class ImportJobSchemaDB(BaseModel):
+    user_id: str
+    folder_id: str
+    # None khi file upload đã bị xóa (job xong, lỗi không resume được, hoặc quá hạn giữ)
+    file_id: str | None
+    filename: str
+    format: str
+    status: str = Field(default="queued", pattern="^(queued|running|completed|failed)$")
+
+    # Vị trí card đầu tiên chưa được ghi, dùng để resume
+    next_index: int = Field(default=0)
+    processed_count: int = Field(default=0)
+    imported_count: int = Field(default=0)
+    # Card trùng (english + vietnamese) với card đã có trong folder
+    skipped_count: int = Field(default=0)
+    failed_count: int = Field(default=0)
+    errors: list = Field(default_factory=list)
+    error: str | None = None
+    # Token của lần claim hiện tại; mọi lần ghi tiến độ phải khớp token này
+    claim_token: str | None = None
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class ImportJobModel:
+    IMPORT_JOB_COLLECTION_NAME = LazyCollection("import_jobs")
+    IMPORT_FILE_BUCKET_NAME = "import_files"
+
+    @classmethod
+    def _bucket(cls):
+        return GridFSBucket(MongoDB.get_db(), bucket_name=cls.IMPORT_FILE_BUCKET_NAME)
+
+    @classmethod
+    @model_error_handler
+    def save_file(cls, filename, stream):
+        """Stream an uploaded file into GridFS and return its id"""
+        file_id = cls._bucket().upload_from_stream(filename, stream)
+        return str(file_id)
+
+    @classmethod
+    @model_error_handler
+    def open_file(cls, file_id):
+        """Open a stored import file for incremental reading"""
+        return cls._bucket().open_download_stream(ObjectId(file_id))
+
+    @classmethod
+    @model_error_handler
+    def create_new(cls, job_data):
+        validated_job = ImportJobSchemaDB(**job_data)
+        result = cls.IMPORT_JOB_COLLECTION_NAME.insert_one(validated_job.model_dump())
+        return str(result.inserted_id)
+
+    @classmethod
+    @model_error_handler
+    def find_by_id(cls, job_id):
+        if not ObjectId.is_valid(job_id):
+            raise ApiError(400, "Invalid import job ID format")
+
+        job = cls.IMPORT_JOB_COLLECTION_NAME.find_one({"_id": ObjectId(job_id)}, {"claim_token": 0})
+        if job:
+            job["_id"] = str(job["_id"])
+        return job
+
+    @classmethod
+    @model_error_handler
+    def claim(cls, job_id):
+        """
+        Atomically move a queued, failed or stale job to "running" under a new
+        claim_token. Returns None if another worker already owns the job.
+        A worker that gets reclaimed (stale) loses its token: its next
+        record_chunk/mark_finished matches nothing and it must stop.
+        """
+        now = datetime.utcnow()
+        result = cls.IMPORT_JOB_COLLECTION_NAME.find_one_and_update(
+            {
+                "_id": ObjectId(job_id),
+                # Job không còn file upload thì không chạy lại được
+                "file_id": {"$ne": None},
+                "$or": [
+                    {"status": {"$in": ["queued", "failed"]}},
+                    {"status": "running", "updated_at": {"$lt": now - STALE_JOB_TIMEOUT}},
+                ],
+            },
+            {
+                "$set": {
+                    "status": "running",
+                    "claim_token": uuid.uuid4().hex,
+                    "error": None,
+                    "started_at": now,
+                    "updated_at": now,
+                }
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+        if result:
+            result["_id"] = str(result["_id"])
+        return result
+
+    @classmethod
+    @model_error_handler
+    def find_claimable_ids(cls, limit=10):
+        """Oldest queued jobs and stale running jobs, for the background worker"""
+        now = datetime.utcnow()
+        jobs = (
+            cls.IMPORT_JOB_COLLECTION_NAME.find(
+                {
+                    "$or": [
+                        {"status": "queued"},
+                        {"status": "running", "updated_at": {"$lt": now - STALE_JOB_TIMEOUT}},
+                    ]
+                },
+                {"_id": 1},
+            )
+            .sort("created_at", 1)
+            .limit(limit)
+        )
+        return [str(job["_id"]) for job in jobs]
+
+    @classmethod
+    @model_error_handler
+    def requeue(cls, job_id):
+        """
+        Put a failed or stale job back in the queue so the worker resumes it.
+        Returns False when the job is running (and not stale) or completed.
+        """
+        now = datetime.utcnow()
+        result = cls.IMPORT_JOB_COLLECTION_NAME.update_one(
+            {
+                "_id": ObjectId(job_id),
+                "file_id": {"$ne": None},
+                "$or": [
+                    {"status": {"$in": ["queued", "failed"]}},
+                    {"status": "running", "updated_at": {"$lt": now - STALE_JOB_TIMEOUT}},
+                ],
+            },
+            {"$set": {"status": "queued", "claim_token": None, "error": None, "updated_at": now}},
+        )
+        return result.matched_count > 0
+
+    @classmethod
+    @model_error_handler
+    def record_chunk(cls, job_id, claim_token, next_index, processed, imported, skipped, failed, errors):
+        """
+        Persist progress after a chunk has been written.
+        Returns False when the job was reclaimed by another worker.
+        """
+        update = {
+            "$set": {"next_index": next_index, "updated_at": datetime.utcnow()},
+            "$inc": {
+                "processed_count": processed,
+                "imported_count": imported,
+                "skipped_count": skipped,
+                "failed_count": failed,
+            },
+        }
+        if errors:
+            update["$push"] = {"errors": {"$each": errors, "$slice": MAX_STORED_ERRORS}}
+
+        result = cls.IMPORT_JOB_COLLECTION_NAME.update_one(
+            {"_id": ObjectId(job_id), "status": "running", "claim_token": claim_token}, update
+        )
+        return result.matched_count > 0
+
+    @classmethod
+    @model_error_handler
+    def mark_finished(cls, job_id, claim_token, status, error=None):
+        """Returns False when the job was reclaimed by another worker"""
+        now = datetime.utcnow()
+        result = cls.IMPORT_JOB_COLLECTION_NAME.update_one(
+            {"_id": ObjectId(job_id), "status": "running", "claim_token": claim_token},
+            {
+                "$set": {
+                    "status": status,
+                    "error": error,
+                    "finished_at": now,
+                    "updated_at": now,
+                }
+            },
+        )
+        return result.matched_count > 0
+
+    @classmethod
+    @model_error_handler
+    def discard_file(cls, job_id, file_id, status):
+        """
+        Forget and delete the uploaded file of a job that is still in `status`.
+        file_id is cleared first, so claim/requeue can no longer pick the job
+        up; a job claimed again in the meantime keeps its file.
+        """
+        result = cls.IMPORT_JOB_COLLECTION_NAME.update_one(
+            {"_id": ObjectId(job_id), "file_id": file_id, "status": status},
+            {"$set": {"file_id": None, "updated_at": datetime.utcnow()}},
+        )
+        if not result.matched_count:
+            return False
+        try:
+            cls._bucket().delete(ObjectId(file_id))
+        except NoFile:
+            pass
+        return True
+
+    @classmethod
+    @model_error_handler
+    def find_expired_failed_files(cls, limit=100):
+        """(job_id, file_id) of failed jobs whose file has outlived FAILED_JOB_FILE_RETENTION"""
+        jobs = cls.IMPORT_JOB_COLLECTION_NAME.find(
+            {
+                "status": "failed",
+                "file_id": {"$ne": None},
+                "finished_at": {"$lt": datetime.utcnow() - FAILED_JOB_FILE_RETENTION},
+            },
+            {"file_id": 1},
+        ).limit(limit)
+        return [(str(job["_id"]), job["file_id"]) for job in jobs]
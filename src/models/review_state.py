@@ -0,0 +1,322 @@
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from src.config.mongodb import LazyCollection
+from src.models.flashcard import FlashcardModel, FLASHCARD_LIST_PROJECTION
+from src.utils.api_error import ApiError
+from src.utils.error_handlers import model_error_handler
+from src.utils.srs import initial_state
+
+# Số liệu due theo folder được tính lại muộn nhất sau khoảng này
+DUE_COUNTS_MAX_AGE = timedelta(hours=1)
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+class ReviewStateModel:
+    """
+    Lịch ôn tập SM-2 của từng user cho từng flashcard (collection review_states).
+    Mỗi document: user_id, flashcard_id (ObjectId), folder_id, ease, interval_days,
+    repetitions, lapses, due_at và last_reviewed_at.
+    Mỗi lượt ôn được ghi một lần vào review_logs với
+    _id = {user_id, review_id}: insert trùng _id là cách chống áp dụng lại review đã nhận.
+    """
+    REVIEW_STATE_COLLECTION_NAME = LazyCollection("review_states")
+    REVIEW_LOG_COLLECTION_NAME = LazyCollection("review_logs")
+    # Một document mỗi user: số card đến hạn theo folder, để badge không phải quét
+    DUE_COUNTS_COLLECTION_NAME = LazyCollection("review_due_counts")
+
+    @classmethod
+    @model_error_handler
+    def enroll_folder(cls, user_id, folder_id):
+        """
+        Create a review state for every card of the folder the user does not
+        study yet, server-side with one $merge. Existing states are kept.
+        """
+        if not ObjectId.is_valid(folder_id):
+            raise ApiError(400, "Invalid folder ID format")
+
+        now = datetime.utcnow()
+        pipeline = [
+            {"$match": {"folder_id": folder_id}},
+            {"$project": {
+                "_id": 0,
+                "user_id": {"$literal": user_id},
+                "flashcard_id": "$_id",
+                "folder_id": 1,
+                **{field: {"$literal": value} for field, value in initial_state().items()},
+                "due_at": {"$literal": now},
+                "last_reviewed_at": {"$literal": None},
+                "created_at": {"$literal": now},
+            }},
+            {"$merge": {
+                "into": "review_states",
+                # Cần unique index user_id_1_flashcard_id_1
+                "on": ["user_id", "flashcard_id"],
+                "whenMatched": "keepExisting",
+                "whenNotMatched": "insert",
+            }},
+        ]
+        FlashcardModel.FLASHCARD_COLLECTION_NAME.aggregate(pipeline)
+        cls.invalidate_due_counts(user_id)
+        return cls.REVIEW_STATE_COLLECTION_NAME.count_documents({"user_id": user_id, "folder_id": folder_id})
+
+    @classmethod
+    @model_error_handler
+    def find_due(cls, user_id, limit, folder_id=None, now=None):
+        """
+        Next `limit` due cards (earliest first) with their flashcard content.
+        One range scan on (user_id, due_at), or (user_id, folder_id, due_at).
+        Content is only joined for cards the user may still read (own or public).
+        """
+        query = {"user_id": user_id, "due_at": {"$lte": now or datetime.utcnow()}}
+        if folder_id:
+            query["folder_id"] = folder_id
+
+        pipeline = [
+            {"$match": query},
+            {"$sort": {"due_at": 1}},
+            {"$limit": limit},
+            {"$lookup": {
+                "from": "flashcards",
+                "localField": "flashcard_id",
+                "foreignField": "_id",
+                "pipeline": [
+                    # Folder đã chuyển private: không trả nội dung card cho người khác.
+                    # Card luôn mang is_public của folder (gán khi insert và khi đổi trạng thái folder)
+                    {"$match": {"$or": [{"is_public": True}, {"user_id": user_id}]}},
+                    {"$project": FLASHCARD_LIST_PROJECTION},
+                ],
+                "as": "flashcard",
+            }},
+            # Bỏ state của flashcard đã bị xóa
+            {"$unwind": "$flashcard"},
+            {"$project": {"user_id": 0, "created_at": 0}},
+        ]
+        return list(cls.REVIEW_STATE_COLLECTION_NAME.aggregate(pipeline))
+
+    @classmethod
+    @model_error_handler
+    def find_state(cls, user_id, flashcard_id):
+        if not ObjectId.is_valid(flashcard_id):
+            raise ApiError(400, "Invalid flashcard ID format")
+        return cls.REVIEW_STATE_COLLECTION_NAME.find_one(
+            {"user_id": user_id, "flashcard_id": ObjectId(flashcard_id)}
+        )
+
+    @classmethod
+    @model_error_handler
+    def find_states(cls, user_id, flashcard_ids):
+        """States of several cards in one query, keyed by flashcard id string"""
+        states = cls.REVIEW_STATE_COLLECTION_NAME.find(
+            {"user_id": user_id, "flashcard_id": {"$in": list(flashcard_ids)}},
+            {"user_id": 0},
+        )
+        return {str(state["flashcard_id"]): state for state in states}
+
+    @classmethod
+    @model_error_handler
+    def insert_logs(cls, user_id, entries):
+        """
+        Record review results in review_logs with one unordered insert_many.
+        `entries` are dicts with review_id, flashcard_id, folder_id, grade and
+        reviewed_at. Review ids the user already sent hit the unique _id and are
+        skipped. Returns the set of review ids that were newly inserted.
+        """
+        if not entries:
+            return set()
+
+        now = datetime.utcnow()
+        documents = [
+            {
+                "_id": {"user_id": user_id, "review_id": entry["review_id"]},
+                "user_id": user_id,
+                "flashcard_id": entry["flashcard_id"],
+                "folder_id": entry["folder_id"],
+                "grade": entry["grade"],
+                "reviewed_at": entry["reviewed_at"],
+                "created_at": now,
+            }
+            for entry in entries
+        ]
+        review_ids = [entry["review_id"] for entry in entries]
+        try:
+            cls.REVIEW_LOG_COLLECTION_NAME.insert_many(documents, ordered=False)
+            return set(review_ids)
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+            if e.details.get("writeConcernErrors") or any(
+                error.get("code") != DUPLICATE_KEY_ERROR for error in write_errors
+            ):
+                raise
+            duplicates = {error["index"] for error in write_errors}
+            return {review_id for index, review_id in enumerate(review_ids) if index not in duplicates}
+
+    @classmethod
+    @model_error_handler
+    def delete_logs(cls, user_id, review_ids):
+        """Drop logs of reviews that were recorded but not applied, so the client can retry them"""
+        if review_ids:
+            cls.REVIEW_LOG_COLLECTION_NAME.delete_many(
+                {"_id": {"$in": [{"user_id": user_id, "review_id": review_id} for review_id in review_ids]}}
+            )
+
+    @classmethod
+    @model_error_handler
+    def update_schedule(cls, user_id, state, fields):
+        """Save the fields computed by srs.schedule for one card"""
+        now = datetime.utcnow()
+        fields["updated_at"] = now
+        result = cls.REVIEW_STATE_COLLECTION_NAME.find_one_and_update(
+            {"_id": state["_id"]},
+            # history: log cũ nhúng trong state, nay nằm ở review_logs
+            {"$set": fields, "$unset": {"history": ""}},
+            projection={"user_id": 0},
+            return_document=ReturnDocument.AFTER,
+        )
+        if result:
+            cls._apply_due_changes(user_id, [(state, fields["due_at"])], now)
+        return result
+
+    @classmethod
+    @model_error_handler
+    def apply_reviews(cls, user_id, updates):
+        """
+        Write the new schedule of many cards with one unordered bulk_write.
+        `updates` is a list of (state as read, fields). Each update only applies
+        if the card's last_reviewed_at is still the one read, so a concurrent
+        submission cannot be overwritten. Returns the flashcard ids (strings)
+        whose update did not apply.
+        """
+        if not updates:
+            return []
+
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"_id": state["_id"], "last_reviewed_at": state.get("last_reviewed_at")},
+                {"$set": {**fields, "updated_at": now}, "$unset": {"history": ""}},
+            )
+            for state, fields in updates
+        ]
+
+        result = cls.REVIEW_STATE_COLLECTION_NAME.bulk_write(operations, ordered=False)
+        if result.matched_count == len(updates):
+            cls._apply_due_changes(user_id, [(state, fields["due_at"]) for state, fields in updates], now)
+            return []
+
+        # Hiếm: có request khác ghi cùng card. Đọc lại để biết card nào chưa được ghi
+        # và tính lại due counts ở lần đọc sau
+        cls.invalidate_due_counts(user_id)
+        written = {
+            state["_id"]
+            for state in cls.REVIEW_STATE_COLLECTION_NAME.find(
+                {"$or": [
+                    {"_id": state["_id"], "last_reviewed_at": fields["last_reviewed_at"], "updated_at": now}
+                    for state, fields in updates
+                ]},
+                {"_id": 1},
+            )
+        }
+        return [str(state["flashcard_id"]) for state, _ in updates if state["_id"] not in written]
+
+    @classmethod
+    @model_error_handler
+    def get_due_counts(cls, user_id):
+        """
+        Due cards per folder for the dashboard badge. Served from the user's
+        review_due_counts document, which reviews adjust in place; recomputed
+        (one aggregation) only when it was invalidated by an enrollment/deletion
+        or a not-yet-due card has become due.
+        """
+        now = datetime.utcnow()
+        cached = cls.DUE_COUNTS_COLLECTION_NAME.find_one({"_id": user_id})
+        if cached and cached["valid_until"] > now:
+            # Folder đã ôn hết còn lại với số 0 sau các lần $inc
+            return {folder_id: due for folder_id, due in cached["folders"].items() if due > 0}, cached["total"]
+
+        rows = cls.REVIEW_STATE_COLLECTION_NAME.aggregate([
+            {"$match": {"user_id": user_id}},
+            {"$group": {
+                "_id": "$folder_id",
+                "due": {"$sum": {"$cond": [{"$lte": ["$due_at", now]}, 1, 0]}},
+                # $min bỏ qua null: thời điểm card kế tiếp đến hạn
+                "next_due_at": {"$min": {"$cond": [{"$gt": ["$due_at", now]}, "$due_at", None]}},
+            }},
+        ])
+
+        folders = {}
+        valid_until = now + DUE_COUNTS_MAX_AGE
+        for row in rows:
+            if row["due"]:
+                folders[row["_id"]] = row["due"]
+            if row["next_due_at"] is not None:
+                valid_until = min(valid_until, row["next_due_at"])
+        total = sum(folders.values())
+
+        cls.DUE_COUNTS_COLLECTION_NAME.replace_one(
+            {"_id": user_id},
+            {"folders": folders, "total": total, "computed_at": now, "valid_until": valid_until},
+            upsert=True,
+        )
+        return folders, total
+
+    @classmethod
+    def _apply_due_changes(cls, user_id, changes, now):
+        """
+        Adjust the cached due counts for reviewed cards instead of dropping
+        them: $inc the folder and total by the change in "is due" of each
+        (state as read, new due_at), and pull valid_until back with $min to
+        the earliest new due date still ahead. Only a cache that is still
+        valid is touched; an expired one is recomputed on the next read anyway.
+        """
+        increments = {}
+        next_due_at = None
+        for state, due_at in changes:
+            delta = (due_at <= now) - (state["due_at"] <= now)
+            if delta:
+                key = f"folders.{state['folder_id']}"
+                increments[key] = increments.get(key, 0) + delta
+                increments["total"] = increments.get("total", 0) + delta
+            if due_at > now and (next_due_at is None or due_at < next_due_at):
+                next_due_at = due_at
+
+        update = {}
+        if increments:
+            update["$inc"] = increments
+        if next_due_at is not None:
+            update["$min"] = {"valid_until": next_due_at}
+        if update:
+            cls.DUE_COUNTS_COLLECTION_NAME.update_one({"_id": user_id, "valid_until": {"$gt": now}}, update)
+
+    @classmethod
+    def invalidate_due_counts(cls, user_id):
+        cls.DUE_COUNTS_COLLECTION_NAME.delete_one({"_id": user_id})
+
+    @classmethod
+    @model_error_handler
+    def delete_by_flashcard(cls, flashcard_id):
+        """Drop every user's state of a deleted flashcard and their cached due counts"""
+        return cls._delete_states({"flashcard_id": ObjectId(flashcard_id)})
+
+    @classmethod
+    @model_error_handler
+    def delete_by_folder(cls, folder_id):
+        """Drop every user's states of a deleted folder and their cached due counts"""
+        return cls._delete_states({"folder_id": folder_id})
+
+    @classmethod
+    @model_error_handler
+    def delete_non_owner_states(cls, folder_id, owner_id):
+        """Drop the states other users have on a folder that became private"""
+        return cls._delete_states({"folder_id": folder_id, "user_id": {"$ne": owner_id}})
+
+    @classmethod
+    def _delete_states(cls, query):
+        user_ids = cls.REVIEW_STATE_COLLECTION_NAME.distinct("user_id", query)
+        if not user_ids:
+            return 0
+        result = cls.REVIEW_STATE_COLLECTION_NAME.delete_many(query)
+        cls.DUE_COUNTS_COLLECTION_NAME.delete_many({"_id": {"$in": user_ids}})
+        return result.deleted_count
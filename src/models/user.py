@@ -2,7 +2,7 @@ from pydantic import BaseModel, EmailStr, constr, Field
 from datetime import datetime
 import uuid
 from bson import ObjectId
-from src.config.mongodb import MongoDB
+from src.config.mongodb import LazyCollection
 from src.utils.constants import (
     EMAIL_RULE,
     EMAIL_RULE_MESSAGE,
@@ -10,6 +10,10 @@ from src.utils.constants import (
     PASSWORD_RULE_MESSAGE,
 )
 from src.utils.api_error import ApiError
+from src.utils.search import build_user_search_keys
+
+# Thay đổi các trường này thì phải tính lại search_keys
+SEARCH_KEY_FIELDS = ("username", "fullName")
 
 class UserSchemaDB(BaseModel):
     email: EmailStr = Field(..., pattern=EMAIL_RULE.pattern, description=EMAIL_RULE_MESSAGE)
@@ -30,14 +34,16 @@ class UserSchemaDB(BaseModel):
 
 class UserModel:
     ### Define Collection
-    USER_COLLECTION_NAME = MongoDB.get_db()["users"]
+    USER_COLLECTION_NAME = LazyCollection("users")
 
     @classmethod
     def create_new(cls, user_data):
         """Validate before saving to DB"""
         try:
             validated_user = UserSchemaDB(**user_data) 
-            result = cls.USER_COLLECTION_NAME.insert_one(validated_user.model_dump())
+            user_doc = validated_user.model_dump()
+            user_doc["search_keys"] = build_user_search_keys(user_doc)
+            result = cls.USER_COLLECTION_NAME.insert_one(user_doc)
             return str(result.inserted_id)
         except Exception as e:
             raise ApiError(500, "An error occurred while creating a new user.") 
@@ -72,7 +78,7 @@ class UserModel:
                 raise ApiError(400, "Invalid user ID")
             
             # Remove invalid update fields if necessary
-            INVALID_UPDATE_FIELDS = ["_id", "email", "createdAt"]  # Không cho phép cập nhật các trường này
+            INVALID_UPDATE_FIELDS = ["_id", "email", "createdAt", "search_keys"]  # Không cho phép cập nhật các trường này
             update_data = {k: v for k, v in update_data.items() if k not in INVALID_UPDATE_FIELDS}
 
             # Update field `updatedAt` khi có thay đổi
@@ -83,6 +89,14 @@ class UserModel:
                 {"$set": update_data},
                 return_document=True  # Trả về dữ liệu sau update
             )
+            if result and any(field in update_data for field in SEARCH_KEY_FIELDS):
+                result["search_keys"] = build_user_search_keys(result)
+                # Chỉ ghi khi username/email/fullName vẫn là giá trị đã dùng để tính key;
+                # update đồng thời đổi các trường này sẽ tự ghi key của nó
+                cls.USER_COLLECTION_NAME.update_one(
+                    {"_id": result["_id"], **{field: result.get(field) for field in SEARCH_KEY_FIELDS}},
+                    {"$set": {"search_keys": result["search_keys"]}}
+                )
             if result:
                 result["_id"] = str(result["_id"])  # Convert ObjectId to string
             return result
@@ -1,7 +1,9 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
 from bson import ObjectId
-from src.config.mongodb import MongoDB
+from src.config.mongodb import LazyCollection
+from src.models.course import COURSE_LIST_STAGE
+from src.utils.pagination import keyset_filter, encode_cursor, DEFAULT_PAGE_SIZE
 
 class UserCourseSchemaDB(BaseModel):
     user_id: str
@@ -9,7 +11,7 @@ class UserCourseSchemaDB(BaseModel):
     registered_at: datetime = Field(default_factory=datetime.utcnow)
 
 class UserCourseModel:
-    USER_COURSE_COLLECTION_NAME = MongoDB.get_db()["user_courses"]
+    USER_COURSE_COLLECTION_NAME = LazyCollection("user_courses")
 
     @classmethod
     def create_new(cls, user_id, course_id):
@@ -38,6 +40,52 @@ class UserCourseModel:
         """Tìm tất cả đăng ký khóa học của một người dùng"""
         return list(cls.USER_COURSE_COLLECTION_NAME.find({"user_id": user_id}))
 
+    @classmethod
+    def find_public_courses_by_user(cls, user_id, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """
+        Lấy một trang khóa học public mà user đã đăng ký bằng một aggregation:
+        $lookup sang courses theo _id, lọc is_public và chỉ lấy các trường cần hiển thị.
+        Trả về (courses, next_cursor)
+        """
+        match = {"user_id": user_id}
+        if cursor:
+            match = {"$and": [match, keyset_filter(cursor, "registered_at")]}
+
+        pipeline = [
+            {"$match": match},
+            {"$sort": {"registered_at": -1, "_id": -1}},
+            {"$lookup": {
+                "from": "courses",
+                "let": {
+                    "course_id": {
+                        "$convert": {"input": "$course_id", "to": "objectId", "onError": None, "onNull": None}
+                    }
+                },
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$_id", "$$course_id"]}, "is_public": True}},
+                    COURSE_LIST_STAGE,
+                ],
+                "as": "course",
+            }},
+            # Bỏ các đăng ký có khóa học đã bị xóa hoặc không còn public
+            {"$unwind": "$course"},
+            {"$limit": limit + 1},
+            {"$project": {"registered_at": 1, "course": 1}},
+        ]
+        rows = list(cls.USER_COURSE_COLLECTION_NAME.aggregate(pipeline))
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1], "registered_at")
+
+        courses = []
+        for row in rows:
+            course = row["course"]
+            course["registered_at"] = row["registered_at"]
+            courses.append(course)
+        return courses, next_cursor
+
     @classmethod
     def delete_all_by_course_id(cls, course_id):
         """Xóa tất cả đăng ký liên quan đến một khóa học"""
@@ -2,16 +2,17 @@ from src.models.course import CourseModel
 from src.utils.api_error import ApiError
 from src.utils.error_handlers import repo_error_handler
 from src.utils.mongo_helper import serialize_mongo_data
-from src.config.cloudinary import CloudinaryService
+from src.config.cloudinary import CloudinaryService, get_uploader
+from src.utils.metrics import track_outbound
+from src.utils.cache import PUBLIC_COURSES_CACHE
 import logging
-import cloudinary
 
 class CourseRepository:
     @staticmethod
     @repo_error_handler
     def get_all_courses():
-        courses = CourseModel.find_all()
-        return [serialize_mongo_data(course) for course in courses]
+        # ObjectId/datetime được encode bởi FastJSONProvider
+        return CourseModel.find_all()
 
     @staticmethod
     @repo_error_handler
@@ -24,10 +25,10 @@ class CourseRepository:
             # Upload video lên Cloudinary
             video_data = CloudinaryService.upload_video(video_file, folder="courses")
             
-            logger.info(f"Video uploaded successfully: {video_data['public_id']}")
+            logger.info("Video uploaded successfully: %s", video_data['public_id'])
             return video_data
         except Exception as e:
-            logger.error(f"Error uploading course video: {str(e)}")
+            logger.error("Error uploading course video: %s", e)
             raise ApiError(500, f"Failed to upload video: {str(e)}")
 
     @staticmethod
@@ -39,25 +40,27 @@ class CourseRepository:
         
         try:
             # Upload thumbnail lên Cloudinary
-            result = cloudinary.uploader.upload(
-                thumbnail_file,
-                folder="course_thumbnails",
-                resource_type="image"
-            )
+            with track_outbound("cloudinary", "upload_thumbnail"):
+                result = get_uploader().upload(
+                    thumbnail_file,
+                    folder="course_thumbnails",
+                    resource_type="image"
+                )
             
-            logger.info(f"Thumbnail uploaded successfully: {result['public_id']}")
+            logger.info("Thumbnail uploaded successfully: %s", result['public_id'])
             return {
                 "url": result["secure_url"],
                 "public_id": result["public_id"]
             }
         except Exception as e:
-            logger.error(f"Error uploading course thumbnail: {str(e)}")
+            logger.error("Error uploading course thumbnail: %s", e)
             raise ApiError(500, f"Failed to upload thumbnail: {str(e)}")
 
     @staticmethod
     @repo_error_handler
     def create_course(course_data):
         course_id = CourseModel.create_new(course_data)
+        PUBLIC_COURSES_CACHE.invalidate()
         return CourseModel.find_by_id(course_id)
 
     @staticmethod
@@ -74,6 +77,7 @@ class CourseRepository:
         updated_course = CourseModel.update(course_id, update_data)
         if not updated_course:
             raise ApiError(404, "Course not found")
+        PUBLIC_COURSES_CACHE.invalidate()
         return serialize_mongo_data(updated_course)
 
     @staticmethod
@@ -87,30 +91,37 @@ class CourseRepository:
         
         # Xóa video từ Cloudinary nếu có public_id
         if course.get("video_public_id"):
-            logger.info(f"Deleting video from Cloudinary: {course['video_public_id']}")
+            logger.info("Deleting video from Cloudinary: %s", course['video_public_id'])
             try:
                 CloudinaryService.delete_video(course["video_public_id"])
             except Exception as e:
-                logger.error(f"Error deleting video from Cloudinary: {str(e)}")
+                logger.error("Error deleting video from Cloudinary: %s", e)
                 # Tiếp tục xóa course ngay cả khi không xóa được video
         
         # Xóa thumbnail từ Cloudinary nếu có public_id
         if course.get("thumbnail_public_id"):
-            logger.info(f"Deleting thumbnail from Cloudinary: {course['thumbnail_public_id']}")
+            logger.info("Deleting thumbnail from Cloudinary: %s", course['thumbnail_public_id'])
             try:
                 CloudinaryService.delete_image(course["thumbnail_public_id"])
             except Exception as e:
-                logger.error(f"Error deleting thumbnail from Cloudinary: {str(e)}")
+                logger.error("Error deleting thumbnail from Cloudinary: %s", e)
                 # Tiếp tục xóa course ngay cả khi không xóa được thumbnail
         
         # Xóa course từ database
         deleted_course = CourseModel.delete(course_id)
         if not deleted_course:
             raise ApiError(404, "Course not found")
+        PUBLIC_COURSES_CACHE.invalidate()
         return serialize_mongo_data(deleted_course)
 
     @staticmethod
     @repo_error_handler
     def get_public_courses():
-        courses = CourseModel.find_public_courses()
-        return [serialize_mongo_data(course) for course in courses]
+        # Đọc qua cache; create/update/delete_course invalidate
+        return PUBLIC_COURSES_CACHE.get("all", CourseModel.find_public_courses)
+
+    @staticmethod
+    @repo_error_handler
+    def get_public_catalog_state():
+        """(version, updated_at) of the public course catalog"""
+        return PUBLIC_COURSES_CACHE.state()
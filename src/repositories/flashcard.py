@@ -1,15 +1,19 @@
-from src.models.flashcard import FlashcardModel
+from src.models.flashcard import FlashcardModel, INTERNAL_FIELDS
 from src.models.folder import FolderModel
+from src.models.review_state import ReviewStateModel
 from src.utils.api_error import ApiError
 from src.utils.error_handlers import repo_error_handler
 from src.utils.mongo_helper import serialize_mongo_data
-from src.config.cloudinary import CloudinaryService
+from src.validation.flashcard import fast_validate_flashcard
+from src.utils.pagination import DEFAULT_PAGE_SIZE
+from src.config.cloudinary import CloudinaryService, public_id_from_url
 import logging
 
 class FlashcardRepository:
     @staticmethod
     @repo_error_handler
-    def get_flashcards_by_folder(folder_id, user_id):
+    def get_flashcards_by_folder(folder_id, user_id, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """Get one page of flashcards; returns (flashcards, next_cursor)"""
         folder = FolderModel.find_by_id(folder_id)
         if not folder:
             raise ApiError(404, "Folder not found")
@@ -17,10 +21,36 @@ class FlashcardRepository:
         if folder["user_id"] != user_id and not folder.get("is_public", False):
             raise ApiError(403, "You don't have permission to access this folder")
             
-        flashcards = FlashcardModel.find_by_folder(folder_id)
-        serialized_flashcards = [serialize_mongo_data(flashcard) for flashcard in flashcards]
-        
-        return serialized_flashcards
+        # Document trả thẳng cho FastJSONProvider (ObjectId/datetime được encode khi tạo response)
+        return FlashcardModel.find_by_folder(folder_id, cursor=cursor, limit=limit)
+
+    @staticmethod
+    @repo_error_handler
+    def get_export_source(user_id, folder_id=None):
+        """
+        Folders to export (one readable folder, or all of the user's folders)
+        as {folder_id: title}, and a lazy cursor over their flashcards.
+        """
+        if folder_id:
+            folder = FolderModel.find_by_id(folder_id)
+            if not folder:
+                raise ApiError(404, "Folder not found")
+            if folder["user_id"] != user_id and not folder.get("is_public", False):
+                raise ApiError(403, "You don't have permission to access this folder")
+            folders = [folder]
+        else:
+            folders = FolderModel.find_by_user(user_id)
+
+        folder_titles = {str(folder["_id"]): folder.get("title") for folder in folders}
+        return folder_titles, FlashcardModel.iter_by_folders(folder_titles.keys())
+
+    @staticmethod
+    @repo_error_handler
+    def search_flashcards(user_id, search_query, mode="prefix", limit=20, offset=0):
+        """Search the user's own and public flashcards; returns (flashcards, total, total_is_exact)"""
+        if mode not in ("prefix", "text"):
+            raise ApiError(400, "mode must be 'prefix' or 'text'")
+        return FlashcardModel.search(user_id, search_query, mode=mode, limit=limit, offset=offset)
 
     @staticmethod
     @repo_error_handler
@@ -43,178 +73,200 @@ class FlashcardRepository:
         if folder["user_id"] != user_id:
             raise ApiError(403, "You don't have permission to delete this flashcard")
         
-        if flashcard.get("image_url"):
-            CloudinaryService.delete_image(flashcard["image_url"])
-        
-        # Xóa flashcard
+        # Xóa flashcard; flashcard_count được giảm bằng $inc trong cùng thao tác
         deleted_flashcard = FlashcardModel.delete(flashcard_id)
-        
-        # Đếm số lượng flashcard còn lại trong folder
-        remaining_flashcards = FlashcardModel.count_by_folder(flashcard["folder_id"])
-        
-        # Cập nhật flashcard_count của folder dựa trên số lượng thực tế
-        FolderModel.update_flashcard_count(flashcard["folder_id"], remaining_flashcards)
-        
-        logger = logging.getLogger(__name__)
-        logger.info(f"Updated folder {flashcard['folder_id']} flashcard_count to {remaining_flashcards}")
+        ReviewStateModel.delete_by_flashcard(flashcard_id)
+
+        # Ảnh có thể vẫn được dùng bởi bản sao của folder (clone giữ nguyên image_url)
+        image_url = deleted_flashcard.get("image_url")
+        public_id = deleted_flashcard.get("image_public_id") or public_id_from_url(image_url)
+        if public_id and not FlashcardModel.is_image_in_use(image_url):
+            CloudinaryService.delete_image(public_id)
         
         return serialize_mongo_data(deleted_flashcard)
 
+    @staticmethod
+    @repo_error_handler
+    def resolve_target_folder(create_new_folder, folder_id, folder_title, user_id):
+        """
+        Create the destination folder or check the user owns the existing one.
+        Returns (folder_id, is_public): new cards take the folder's visibility.
+        """
+        from datetime import datetime
+        logger = logging.getLogger(__name__)
+
+        if create_new_folder:
+            from src.repositories.folder import FolderRepository
+            folder_data = {
+                "title": folder_title.strip() if folder_title else "Untitled Folder",
+                "user_id": user_id,
+                "is_public": False,
+                "flashcard_count": 0,
+                "created_at": datetime.utcnow()
+            }
+
+            folder_result = FolderRepository.create_new(folder_data)
+            logger.debug("Created import folder %s", folder_result['_id'])
+            return folder_result["_id"], False
+
+        folder = FolderModel.find_by_id(folder_id)
+        if not folder:
+            raise ApiError(404, "Folder not found")
+
+        if folder["user_id"] != user_id:
+            raise ApiError(403, "You don't have permission to add flashcards to this folder")
+
+        return folder_id, folder.get("is_public", False)
+
+    @staticmethod
+    def prepare_flashcard(card, folder_id, user_id, is_public=False):
+        """
+        Build the flashcard document to insert from raw client/import data.
+        is_public follows the target folder. Returns (document, image_upload):
+        a data: image is not uploaded here but returned as image_upload, for
+        upload_inserted_images once the card is known to be inserted.
+        Raises ValueError when the card is not usable.
+        """
+        from datetime import datetime
+
+        fields = fast_validate_flashcard(card)
+
+        image_url = None
+        image_upload = None
+        image_source = fields["image_source"]
+        if image_source:
+            if image_source.startswith("data:"):
+                image_upload = image_source
+            elif image_source.startswith("http://") or image_source.startswith("https://"):
+                image_url = image_source
+
+        now = datetime.utcnow()
+        return {
+            "english": fields["english"],
+            "vietnamese": fields["vietnamese"],
+            "object": fields["object"],
+            "image_url": image_url,
+            "image_public_id": None,
+            "folder_id": folder_id,
+            "user_id": user_id,
+            "is_public": is_public,
+            "created_at": now,
+            "updated_at": now,
+            "status": "active"
+        }, image_upload
+
+    @staticmethod
+    def upload_inserted_images(flashcards, image_uploads, inserted_ids, user_id):
+        """
+        Upload the data: images of the cards bulk_insert actually inserted and
+        store their URLs with one bulk write. Duplicates and rejected cards
+        never reach Cloudinary, so a re-run import chunk leaves no orphaned
+        upload. The flashcard dicts are updated in place.
+        """
+        logger = logging.getLogger(__name__)
+        images = []
+        for flashcard, image_upload, inserted_id in zip(flashcards, image_uploads, inserted_ids):
+            if image_upload is None or inserted_id is None:
+                continue
+            try:
+                upload_result = CloudinaryService.upload_image(image_upload, folder=f"flashcards/{user_id}")
+            except Exception as e:
+                # Card vẫn được giữ, chỉ không có ảnh
+                logger.warning("Error uploading image, continuing without it: %s", e)
+                continue
+            # destroy() cần public_id, không nhận URL
+            flashcard["image_url"] = upload_result["url"]
+            flashcard["image_public_id"] = upload_result["public_id"]
+            images.append((inserted_id, upload_result["url"], upload_result["public_id"]))
+        FlashcardModel.set_images(images)
+
     @staticmethod
     @repo_error_handler
     def save_flashcards_to_folder(create_new_folder, folder_id, folder_title, flashcards_data, user_id):
             """Save flashcards to a folder (new or existing)"""
-            from datetime import datetime
             import logging
             logger = logging.getLogger(__name__)
             
-            # Debug request data
-            logger.info("====== FLASHCARD IMPORT REQUEST ======")
-            logger.info(f"Create new folder: {create_new_folder}")
-            logger.info(f"Folder ID: {folder_id}")
-            logger.info(f"Folder title: {folder_title}")
-            logger.info(f"Flashcards count: {len(flashcards_data)}")
-            logger.info(f"Sample flashcard: {flashcards_data[0] if flashcards_data else 'None'}")
+            logger.debug(
+                "Saving %s flashcards (create_new_folder=%s, folder_id=%s)",
+                len(flashcards_data), create_new_folder, folder_id,
+            )
             
             # Step 1: Handle folder creation or validation
-            if create_new_folder:
-                # Create a new folder
-                from src.repositories.folder import FolderRepository
-                folder_data = {
-                    "title": folder_title.strip() if folder_title else "Untitled Folder",
-                    "user_id": user_id,
-                    "is_public": False,
-                    "flashcard_count": 0,
-                    "created_at": datetime.utcnow()
-                }
-                
-                logger.info(f"Creating new folder with title: {folder_data['title']}")
-                folder_result = FolderRepository.create_new(folder_data)
-                folder_id = folder_result["_id"]
-                logger.info(f"Created new folder with ID: {folder_id}")
-            else:
-                # Validate existing folder
-                folder = FolderModel.find_by_id(folder_id)
-                if not folder:
-                    raise ApiError(404, "Folder not found")
-                    
-                if folder["user_id"] != user_id:
-                    raise ApiError(403, "You don't have permission to add flashcards to this folder")
+            folder_id, is_public = FlashcardRepository.resolve_target_folder(
+                create_new_folder, folder_id, folder_title, user_id
+            )
             
             # Step 2: Process flashcards
             valid_flashcards = []
+            image_uploads = []
+            # Input index of each valid flashcard, to map database errors back
+            valid_indexes = []
             invalid_flashcards = []
             
-            # Process flashcards in batches for better performance
-            batch_size = 100
-            for i in range(0, len(flashcards_data), batch_size):
-                batch = flashcards_data[i:i + batch_size]
-                for idx, card in enumerate(batch):
-                    try:
-                        # Debug the card data
-                        logger.info(f"Processing card {i+idx}: {card}")
-                        
-                        # Validate required fields
-                        if not card.get("english") or not card.get("vietnamese"):
-                            logger.warning(f"Missing required fields for card {i+idx}")
-                            invalid_flashcards.append({
-                                "index": i + idx,
-                                "card": card,
-                                "error": "English and Vietnamese fields are required"
-                            })
-                            continue
-                        
-                        # Handle image upload if present
-                        image_url = None
-                        # Check multiple possible image field names
-                        image_source = None
-                        for field in ["image_url", "imageUrl", "image_data", "imageData", "image"]:
-                            if field in card and card[field]:
-                                image_source = card[field]
-                                logger.info(f"Found image in field '{field}': {image_source[:30] if isinstance(image_source, str) else 'Non-string data'}...")
-                                break
-                        
-                        # Process image if exists
-                        if image_source and isinstance(image_source, str):
-                            if image_source.startswith("data:"):
-                                try:
-                                    logger.info("Uploading image to Cloudinary...")
-                                    # Use the folder parameter that your service accepts
-                                    folder_path = f"flashcards/{user_id}"
-                                    upload_result = CloudinaryService.upload_image(image_source, folder=folder_path)
-                                    image_url = upload_result["url"]
-                                    logger.info(f"Successfully uploaded image: {image_url}")
-                                except Exception as e:
-                                    logger.error(f"Error uploading image: {str(e)}")
-                                    # Continue with the flashcard but without image
-                                    logger.warning("Continuing without image due to upload error")
-                            elif image_source.startswith("http://") or image_source.startswith("https://"):
-                                image_url = image_source
-                                logger.info(f"Using existing image URL: {image_url}")
-                        
-                        # Create flashcard data
-                        flashcard_data = {
-                            "english": card.get("english").strip() if card.get("english") else "",
-                            "vietnamese": card.get("vietnamese").strip() if card.get("vietnamese") else "",
-                            "object": card.get("object", "").strip() if card.get("object") else None,
-                            "image_url": image_url,
-                            "folder_id": folder_id,
-                            "user_id": user_id,
-                            "is_public": False,
-                            "created_at": datetime.utcnow(),
-                            "updated_at": datetime.utcnow(),
-                            "status": "active"
-                        }
-                        
-                        logger.info(f"Created flashcard data: {flashcard_data}")
-                        valid_flashcards.append(flashcard_data)
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing flashcard: {str(e)}")
-                        invalid_flashcards.append({
-                            "index": i + idx,
-                            "card": card,
-                            "error": str(e)
-                        })
+            for index, card in enumerate(flashcards_data):
+                try:
+                    flashcard_data, image_upload = FlashcardRepository.prepare_flashcard(card, folder_id, user_id, is_public)
+                    valid_flashcards.append(flashcard_data)
+                    image_uploads.append(image_upload)
+                    valid_indexes.append(index)
+                except Exception as e:
+                    logger.debug("Invalid flashcard %s: %s", index, e)
+                    invalid_flashcards.append({
+                        "index": index,
+                        "card": card,
+                        "error": str(e)
+                    })
             
             # Step 3: Insert valid flashcards
             imported_count = 0
             inserted_flashcards = []
+            skipped_duplicates = []
             if valid_flashcards:
                 try:
                     # Use bulk insert for better performance
-                    logger.info(f"Inserting {len(valid_flashcards)} flashcards into database...")
                     result = FlashcardModel.bulk_insert(valid_flashcards)
-                    imported_count = len(valid_flashcards)
-                    logger.info(f"Successfully inserted {imported_count} flashcards into folder {folder_id}")
+                    imported_count = result["inserted_count"]
+                    logger.info("Successfully inserted %s flashcards into folder %s", imported_count, folder_id)
                     
                     # Update folder flashcard count
-                    FolderModel.increment_flashcard_count(folder_id, increment=imported_count)
+                    if imported_count:
+                        FolderModel.increment_flashcard_count(folder_id, increment=imported_count)
+
+                    # Ảnh chỉ upload cho card đã insert, card trùng không tạo ảnh mồ côi
+                    FlashcardRepository.upload_inserted_images(
+                        valid_flashcards, image_uploads, result["inserted_ids"], user_id
+                    )
                     
-                    # Get the inserted flashcards for response
-                    inserted_flashcards = valid_flashcards
-                    for flashcard in inserted_flashcards:
-                        # Convert ObjectId to string for JSON serialization
-                        if "_id" in flashcard and flashcard["_id"]:
-                            flashcard["_id"] = str(flashcard["_id"])
-                        flashcard["folder_id"] = str(flashcard["folder_id"])
-                        flashcard["user_id"] = str(flashcard["user_id"])
-                        
-                        # Format dates for JSON serialization
-                        if "created_at" in flashcard and flashcard["created_at"]:
-                            flashcard["created_at"] = flashcard["created_at"].isoformat()
-                        if "updated_at" in flashcard and flashcard["updated_at"]:
-                            flashcard["updated_at"] = flashcard["updated_at"].isoformat()
+                    # Cards already in the folder (same english + vietnamese) are skipped, not failed
+                    skipped_duplicates = [valid_indexes[index] for index in result["duplicate_indexes"]]
+
+                    # Report cards rejected by the database
+                    for error in result["errors"]:
+                        invalid_flashcards.append({
+                            "index": valid_indexes[error["index"]],
+                            "card": flashcards_data[valid_indexes[error["index"]]],
+                            "error": error["error"]
+                        })
+                    
+                    # bulk_insert assigns real _ids, so the response needs no re-query
+                    inserted_flashcards = [
+                        {key: value for key, value in flashcard.items() if key not in INTERNAL_FIELDS}
+                        for flashcard, inserted_id in zip(valid_flashcards, result["inserted_ids"])
+                        if inserted_id is not None
+                    ]
                         
                 except Exception as e:
-                    logger.error(f"Error during bulk import: {str(e)}")
+                    logger.error("Error during bulk import: %s", e)
                     raise ApiError(500, f"Error during bulk import: {str(e)}")
             
             # Step 4: Return result
             return {
                 "folder_id": str(folder_id),
                 "imported_count": imported_count,
+                "skipped_count": len(skipped_duplicates),
+                "skipped_duplicates": skipped_duplicates,
                 "invalid_count": len(invalid_flashcards),
-                "invalid_flashcards": invalid_flashcards,
+                "invalid_flashcards": sorted(invalid_flashcards, key=lambda item: item["index"]),
                 "flashcards": inserted_flashcards
             }
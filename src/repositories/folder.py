@@ -1,10 +1,12 @@
 from src.models.folder import FolderModel
 from src.models.flashcard import FlashcardModel
+from src.models.review_state import ReviewStateModel
 from src.utils.api_error import ApiError
 from src.utils.error_handlers import repo_error_handler
 from src.utils.mongo_helper import serialize_mongo_data
+from src.utils.pagination import DEFAULT_PAGE_SIZE
+from src.utils.cache import PUBLIC_FOLDERS_CACHE
 import logging
-import asyncio
 
 class FolderRepository:
     @staticmethod
@@ -12,54 +14,36 @@ class FolderRepository:
     def create_new(folder_data):
         """Create a new folder"""
         logger = logging.getLogger(__name__)
-        logger.info("=== Repository: Creating new folder ===")
-        logger.info(f"Input folder data: {folder_data}")
         
         # Kiểm tra dữ liệu đầu vào
         if not folder_data.get("title"):
-            logger.error("Folder title is missing")
             raise ValueError("Folder title is required")
             
         # Đảm bảo is_public luôn là false khi tạo mới
         folder_data["is_public"] = False
         
         # Tạo folder mới
-        logger.info("Calling FolderModel.create_new")
         folder_id = FolderModel.create_new(folder_data)
-        logger.info(f"Folder created with ID: {folder_id}")
+        logger.info("Folder created with ID: %s", folder_id)
         
         # Lấy thông tin folder vừa tạo
-        logger.info(f"Fetching new folder with ID: {folder_id}")
         new_folder = FolderModel.find_by_id(folder_id)
-        logger.info(f"Fetched folder: {new_folder}")
         
         if new_folder is None:
-            logger.error(f"Could not find newly created folder with ID: {folder_id}")
+            logger.error("Could not find newly created folder with ID: %s", folder_id)
         
-        serialized_folder = serialize_mongo_data(new_folder)
-        logger.info(f"Serialized folder: {serialized_folder}")
-        
-        return serialized_folder
+        return serialize_mongo_data(new_folder)
 
 
     @staticmethod
     @repo_error_handler
     def get_folders_by_user(user_id):
         """Get all folders by user ID"""
-        logger = logging.getLogger(__name__)
-        logger.info(f"=== Repository: Getting folders for user {user_id} ===")
-        
         # Lấy danh sách folder
-        logger.info(f"Calling FolderModel.find_by_user with user_id: {user_id}")
         folders = FolderModel.find_by_user(user_id)
-        logger.info(f"Raw folders from database: {folders}")
-        
-        # Chuyển đổi ObjectId thành string
-        logger.info("Serializing folder data")
-        serialized_folders = [serialize_mongo_data(folder) for folder in folders]
-        logger.info(f"Serialized folders: {serialized_folders}")
         
-        return serialized_folders
+        # ObjectId/datetime được encode bởi FastJSONProvider
+        return folders
 
 
 
@@ -94,6 +78,11 @@ class FolderRepository:
             
         # Cập nhật folder
         updated_folder = FolderModel.update(folder_id, update_data)
+        if folder.get("is_public"):
+            PUBLIC_FOLDERS_CACHE.invalidate()
+            if updated_folder and not updated_folder.get("is_public", False):
+                # Chuyển private: người khác không được ôn tiếp các card này
+                ReviewStateModel.delete_non_owner_states(folder_id, folder["user_id"])
         
         return serialize_mongo_data(updated_folder)
 
@@ -113,26 +102,65 @@ class FolderRepository:
             
         # Xóa tất cả flashcard thuộc folder trước
         try:
-            # Create event loop for async operation
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(FlashcardModel.delete_by_folder(folder_id))
-            loop.close()
+            FlashcardModel.delete_by_folder(folder_id)
         except Exception as e:
-            logging.error(f"Error deleting flashcards for folder {folder_id}: {str(e)}")
+            logging.getLogger(__name__).error("Error deleting flashcards for folder %s: %s", folder_id, e)
             raise ApiError(500, "Error deleting flashcards")
 
+        # Xóa lịch ôn tập của mọi user trên folder này
+        ReviewStateModel.delete_by_folder(folder_id)
+
         # Xóa folder
         deleted_folder = FolderModel.delete(folder_id)
+        if folder.get("is_public"):
+            PUBLIC_FOLDERS_CACHE.invalidate()
         
         return serialize_mongo_data(deleted_folder)
 
+    @staticmethod
+    @repo_error_handler
+    def clone_folder(folder_id, user_id, title=None):
+        """Copy a public (or own) folder and all its flashcards into the user's library"""
+        logger = logging.getLogger(__name__)
+
+        source = FolderModel.find_by_id(folder_id)
+        if not source:
+            raise ApiError(404, "Folder not found")
+
+        if source["user_id"] != user_id and not source.get("is_public", False):
+            raise ApiError(403, "You don't have permission to clone this folder")
+
+        # Đếm trước để folder được tạo với flashcard_count đúng ngay từ đầu
+        source_count = FlashcardModel.FLASHCARD_COLLECTION_NAME.count_documents({"folder_id": folder_id})
+        new_folder_id = FolderModel.create_new({
+            "title": title.strip() if title else FolderModel.available_title(user_id, source["title"]),
+            "user_id": user_id,
+            "is_public": False,
+            "flashcard_count": source_count,
+        })
+
+        try:
+            copied_count = FlashcardModel.clone_folder(folder_id, new_folder_id, user_id)
+        except Exception as e:
+            # Không để lại folder copy dở
+            logger.error("Error cloning folder %s: %s", folder_id, e)
+            FlashcardModel.FLASHCARD_COLLECTION_NAME.delete_many({"folder_id": new_folder_id})
+            FolderModel.delete(new_folder_id)
+            raise ApiError(500, "Error cloning folder")
+
+        # Folder nguồn có thể đổi giữa lúc đếm và lúc $merge. Nếu process chết giữa
+        # chừng, reconcile_flashcard_counts sửa lại flashcard_count sau grace period
+        if copied_count != source_count:
+            FolderModel.increment_flashcard_count(new_folder_id, increment=copied_count - source_count)
+        logger.info("Cloned folder %s into %s (%s flashcards)", folder_id, new_folder_id, copied_count)
+
+        return serialize_mongo_data(FolderModel.find_by_id(new_folder_id))
+
     @staticmethod
     @repo_error_handler
     def make_folder_public(folder_id):
         """Make a folder public (admin only)"""
         logger = logging.getLogger(__name__)
-        logger.info(f"=== Making folder {folder_id} public ===")
         
         # Kiểm tra folder tồn tại
         folder = FolderModel.find_by_id(folder_id)
@@ -141,20 +169,15 @@ class FolderRepository:
             raise ApiError(404, "Folder not found")
             
         # Cập nhật folder thành public
-        logger.info("Updating folder to public")
         updated_folder = FolderModel.update(folder_id, {"is_public": True})
+        PUBLIC_FOLDERS_CACHE.invalidate()
         
         # Cập nhật tất cả flashcard trong folder thành public
         try:
-            logger.info("Updating all flashcards in folder to public")
-            # Create event loop for async operation
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(FlashcardModel.make_all_public_by_folder(folder_id))
-            loop.close()
-            logger.info("Successfully updated all flashcards to public")
+            FlashcardModel.make_all_public_by_folder(folder_id, True)
+            logger.info("Folder %s and its flashcards are now public", folder_id)
         except Exception as e:
-            logger.error(f"Error updating flashcards to public: {str(e)}")
+            logger.error("Error updating flashcards to public: %s", e)
             raise ApiError(500, "Error updating flashcards to public")
         
         return serialize_mongo_data(updated_folder)
@@ -164,7 +187,6 @@ class FolderRepository:
     def toggle_folder_public(folder_id, user_id):
         """Toggle folder public state and update all its flashcards"""
         logger = logging.getLogger(__name__)
-        logger.info(f"=== Toggling folder {folder_id} public state ===")
         
         # Kiểm tra folder tồn tại và quyền truy cập
         folder = FolderModel.find_by_id(folder_id)
@@ -176,44 +198,39 @@ class FolderRepository:
         
         # Toggle public state
         new_public_state = not folder.get("is_public", False)
-        logger.info(f"Current public state: {folder.get('is_public', False)}, new state: {new_public_state}")
         
         # Cập nhật folder public state
-        logger.info(f"Updating folder public state to {new_public_state}")
         updated_folder = FolderModel.update(folder_id, {"is_public": new_public_state})
         
         if not updated_folder:
             raise ApiError(500, "Failed to update folder public state")
-            
-        logger.info(f"Updated folder: {updated_folder}")
+        PUBLIC_FOLDERS_CACHE.invalidate()
+
+        if not new_public_state:
+            # Chuyển private: người khác không được ôn tiếp các card này
+            ReviewStateModel.delete_non_owner_states(folder_id, folder["user_id"])
             
         # Cập nhật tất cả flashcard trong folder
         try:
-            logger.info(f"Updating all flashcards in folder public state to {new_public_state}")
-            # Create event loop for async operation
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(FlashcardModel.make_all_public_by_folder(folder_id, new_public_state))
-            loop.close()
-            logger.info("Successfully updated all flashcards public state")
+            FlashcardModel.make_all_public_by_folder(folder_id, new_public_state)
+            logger.info("Folder %s public state set to %s", folder_id, new_public_state)
         except Exception as e:
-            logger.error(f"Error updating flashcards public state: {str(e)}")
+            logger.error("Error updating flashcards public state: %s", e)
             raise ApiError(500, "Error updating flashcards public state")
         
         return serialize_mongo_data(updated_folder)
 
     @staticmethod
     @repo_error_handler
-    def get_public_folders(skip=0, limit=100):
-        """Get all public folders"""
-        logger = logging.getLogger(__name__)
-        logger.info("=== Repository: Getting public folders ===")
-        
-        # Lấy danh sách folder public
-        folders = FolderModel.find_public_folders(skip, limit)
-        logger.info(f"Found {len(folders)} public folders")
-        
-        # Serialize dữ liệu
-        serialized_folders = [serialize_mongo_data(folder) for folder in folders]
-        
-        return serialized_folders
+    def get_public_folders(cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """Get a page of public folders; returns (folders, next_cursor)"""
+        # Đọc qua cache; các thao tác đổi trạng thái public/sửa/xóa folder public sẽ invalidate
+        return PUBLIC_FOLDERS_CACHE.get(
+            (cursor, limit), lambda: FolderModel.find_public_folders(cursor=cursor, limit=limit)
+        )
+
+    @staticmethod
+    @repo_error_handler
+    def get_public_catalog_state():
+        """(version, updated_at) of the public folder catalog"""
+        return PUBLIC_FOLDERS_CACHE.state()
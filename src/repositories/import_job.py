@@ -0,0 +1,199 @@
+from src.models.import_job import ImportJobModel
+from src.models.flashcard import FlashcardModel
+from src.models.folder import FolderModel
+from src.repositories.flashcard import FlashcardRepository
+from src.config.environment import EnvConfig
+from src.utils.api_error import ApiError
+from src.utils.error_handlers import repo_error_handler
+from src.utils.flashcard_parser import iter_flashcards, iter_chunks
+from src.utils.mongo_helper import serialize_mongo_data
+from itertools import islice
+import logging
+import threading
+
+# Số card ghi xuống DB mỗi lần; bộ nhớ chỉ giữ tối đa một chunk
+IMPORT_CHUNK_SIZE = 500
+
+
+class ImportJobRepository:
+    @staticmethod
+    @repo_error_handler
+    def create_import_job(file, import_format, create_new_folder, folder_id, folder_title, user_id):
+        """Store the uploaded file, register a job and start processing it in the background"""
+        logger = logging.getLogger(__name__)
+
+        folder_id, _ = FlashcardRepository.resolve_target_folder(
+            create_new_folder, folder_id, folder_title, user_id
+        )
+
+        file_id = ImportJobModel.save_file(file.filename, file.stream)
+        job_id = ImportJobModel.create_new({
+            "user_id": user_id,
+            "folder_id": folder_id,
+            "file_id": file_id,
+            "filename": file.filename,
+            "format": import_format,
+        })
+        logger.info("Created import job %s for folder %s", job_id, folder_id)
+
+        ImportJobRepository.start_import_job(job_id)
+        return serialize_mongo_data(ImportJobModel.find_by_id(job_id))
+
+    @staticmethod
+    @repo_error_handler
+    def get_import_job(job_id, user_id):
+        job = ImportJobModel.find_by_id(job_id)
+        if not job:
+            raise ApiError(404, "Import job not found")
+
+        if job["user_id"] != user_id:
+            raise ApiError(403, "You don't have permission to access this import job")
+
+        return serialize_mongo_data(job)
+
+    @staticmethod
+    @repo_error_handler
+    def resume_import_job(job_id, user_id):
+        """Restart a failed (or stalled) job from the last committed chunk"""
+        job = ImportJobRepository.get_import_job(job_id, user_id)
+        if job["status"] == "completed":
+            raise ApiError(400, "Import job is already completed")
+        if job["file_id"] is None:
+            raise ApiError(410, "The uploaded file of this import job is no longer available, upload it again")
+
+        if not ImportJobRepository.start_import_job(job_id):
+            raise ApiError(409, "Import job is already running")
+        return serialize_mongo_data(ImportJobModel.find_by_id(job_id))
+
+    @staticmethod
+    def start_import_job(job_id):
+        """
+        Queue the job for the worker, or claim it and run it in a background thread.
+        Returns False when another run still owns the job.
+        """
+        if not EnvConfig.RUN_IMPORT_JOBS_INLINE:
+            # Worker riêng sẽ claim job ở lần poll tiếp theo
+            return ImportJobModel.requeue(job_id)
+
+        # Claim ngay trong request để biết job có đang chạy ở nơi khác không
+        job = ImportJobModel.claim(job_id)
+        if not job:
+            return False
+
+        thread = threading.Thread(target=ImportJobRepository._run_claimed_job, args=(job,))
+        thread.daemon = True
+        thread.start()
+        return True
+
+    @staticmethod
+    def run_import_job(job_id):
+        """
+        Worker entry point: parse the stored file incrementally and insert the
+        cards in ordered chunks, committing progress after each chunk so a
+        failed job can resume from `next_index`.
+        """
+        job = ImportJobModel.claim(job_id)
+        if not job:
+            logging.getLogger(__name__).info("Import job %s is not claimable, skipping", job_id)
+            return
+        ImportJobRepository._run_claimed_job(job)
+
+    @staticmethod
+    def _run_claimed_job(job):
+        """
+        Process a job claimed by this run. Every progress write is conditional on
+        the job's claim_token: if the job was reclaimed as stale, the write matches
+        nothing and this run stops without touching the file. The chunk it was
+        writing is redone by the new owner; cards already inserted are skipped as
+        duplicates (unique folder_id + content_key). The uploaded file is deleted
+        when the job completes or fails for a reason a resume cannot fix.
+        """
+        logger = logging.getLogger(__name__)
+        job_id = job["_id"]
+        claim_token = job["claim_token"]
+        folder_id = job["folder_id"]
+        user_id = job["user_id"]
+        index = job["next_index"]
+
+        try:
+            # Đọc lại folder lúc chạy: có thể đã đổi public/private từ lúc tạo job
+            folder = FolderModel.find_by_id(folder_id)
+            if not folder:
+                raise ApiError(404, "Folder not found")
+            is_public = folder.get("is_public", False)
+
+            stream = ImportJobModel.open_file(job["file_id"])
+            cards = islice(iter_flashcards(stream, job["format"]), index, None)
+
+            for chunk in iter_chunks(cards, IMPORT_CHUNK_SIZE):
+                valid_flashcards = []
+                image_uploads = []
+                valid_indexes = []
+                errors = []
+                for offset, card in enumerate(chunk):
+                    try:
+                        flashcard, image_upload = FlashcardRepository.prepare_flashcard(card, folder_id, user_id, is_public)
+                        valid_flashcards.append(flashcard)
+                        image_uploads.append(image_upload)
+                        valid_indexes.append(index + offset)
+                    except Exception as e:
+                        errors.append({"index": index + offset, "error": str(e)})
+
+                imported_count = 0
+                skipped_count = 0
+                if valid_flashcards:
+                    result = FlashcardModel.bulk_insert(valid_flashcards)
+                    imported_count = result["inserted_count"]
+                    # Resume sau crash ghi lại chunk dở dang: card đã có bị bỏ qua, không nhân đôi
+                    skipped_count = len(result["duplicate_indexes"])
+                    errors.extend(
+                        {"index": valid_indexes[error["index"]], "error": error["error"]}
+                        for error in result["errors"]
+                    )
+                    if imported_count:
+                        FolderModel.increment_flashcard_count(folder_id, increment=imported_count)
+                    # Upload sau khi insert: card bị bỏ qua khi chạy lại chunk không upload lại ảnh
+                    FlashcardRepository.upload_inserted_images(
+                        valid_flashcards, image_uploads, result["inserted_ids"], user_id
+                    )
+
+                index += len(chunk)
+                recorded = ImportJobModel.record_chunk(
+                    job_id,
+                    claim_token,
+                    next_index=index,
+                    processed=len(chunk),
+                    imported=imported_count,
+                    skipped=skipped_count,
+                    failed=len(errors),
+                    errors=sorted(errors, key=lambda error: error["index"]),
+                )
+                if not recorded:
+                    logger.warning("Import job %s was reclaimed by another run, stopping at card %s", job_id, index)
+                    return
+
+            if not ImportJobModel.mark_finished(job_id, claim_token, "completed"):
+                logger.warning("Import job %s was reclaimed by another run before completing", job_id)
+                return
+            ImportJobModel.discard_file(job_id, job["file_id"], "completed")
+            logger.info("Import job %s completed (%s cards read)", job_id, index)
+        except Exception as e:
+            message = e.message if isinstance(e, ApiError) else str(e)
+            logger.error("Import job %s failed at card %s: %s", job_id, index, message)
+            if not ImportJobModel.mark_finished(job_id, claim_token, "failed", error=message):
+                return
+            # File hỏng (parser báo ValueError) hoặc folder đã bị xóa: chạy lại cũng lỗi
+            # như vậy, xóa file ngay. Lỗi tạm thời giữ file để resume, quá hạn thì worker xóa
+            if isinstance(e, ValueError) or (isinstance(e, ApiError) and e.status_code == 404):
+                ImportJobModel.discard_file(job_id, job["file_id"], "failed")
+
+    @staticmethod
+    def discard_expired_files():
+        """Delete the files of failed jobs nobody resumed within FAILED_JOB_FILE_RETENTION"""
+        discarded = 0
+        for job_id, file_id in ImportJobModel.find_expired_failed_files():
+            if ImportJobModel.discard_file(job_id, file_id, "failed"):
+                discarded += 1
+        if discarded:
+            logging.getLogger(__name__).info("Deleted the files of %s expired failed import jobs", discarded)
+        return discarded
@@ -0,0 +1,194 @@
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from pydantic import ValidationError
+from src.models.folder import FolderModel
+from src.models.review_state import ReviewStateModel
+from src.utils.api_error import ApiError
+from src.utils.error_handlers import repo_error_handler
+from src.utils.srs import schedule
+from src.validation.review import ReviewItemValidation
+
+# Chênh lệch đồng hồ tối đa chấp nhận cho reviewed_at do client gửi
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+
+def _to_utc_naive(value):
+    # Datetime trong DB là UTC không có tzinfo
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class ReviewRepository:
+    @staticmethod
+    @repo_error_handler
+    def enroll_folder(folder_id, user_id):
+        """Add the folder's cards to the user's review queue (own or public folders)"""
+        folder = FolderModel.find_by_id(folder_id)
+        if not folder:
+            raise ApiError(404, "Folder not found")
+
+        if folder["user_id"] != user_id and not folder.get("is_public", False):
+            raise ApiError(403, "You don't have permission to study this folder")
+
+        enrolled_count = ReviewStateModel.enroll_folder(user_id, folder_id)
+        return {"folder_id": folder_id, "enrolled_count": enrolled_count}
+
+    @staticmethod
+    @repo_error_handler
+    def get_due_cards(user_id, limit, folder_id=None):
+        return ReviewStateModel.find_due(user_id, limit, folder_id=folder_id)
+
+    @staticmethod
+    @repo_error_handler
+    def get_due_counts(user_id):
+        folders, total = ReviewStateModel.get_due_counts(user_id)
+        return {"total": total, "folders": folders}
+
+    @staticmethod
+    @repo_error_handler
+    def review_card(user_id, flashcard_id, grade):
+        """Apply one review result and return the card's new schedule"""
+        state = ReviewStateModel.find_state(user_id, flashcard_id)
+        if not state:
+            raise ApiError(404, "Flashcard is not in your review queue")
+
+        reviewed_at = datetime.utcnow()
+        fields = schedule(state, grade, reviewed_at)
+        # Review đơn lẻ không có review_id từ client: log với id do server sinh
+        ReviewStateModel.insert_logs(user_id, [{
+            "review_id": str(ObjectId()),
+            "flashcard_id": state["flashcard_id"],
+            "folder_id": state["folder_id"],
+            "grade": grade,
+            "reviewed_at": reviewed_at,
+        }])
+        return ReviewStateModel.update_schedule(user_id, state, fields)
+
+    @staticmethod
+    def _validate_reviews(reviews, now, errors, duplicate_ids):
+        """Validate every item in one pass; returns {flashcard_id: [(review_id, grade, reviewed_at), ...]}"""
+        by_card = {}
+        seen = set()
+        for index, raw in enumerate(reviews):
+            review_id = raw.get("review_id") if isinstance(raw, dict) else None
+            try:
+                if not isinstance(raw, dict):
+                    raise ValueError("Review must be an object")
+                item = ReviewItemValidation(**raw)
+                if not ObjectId.is_valid(item.flashcard_id):
+                    raise ValueError("Invalid flashcard ID format")
+                reviewed_at = _to_utc_naive(item.reviewed_at) or now
+                if reviewed_at > now + MAX_CLOCK_SKEW:
+                    raise ValueError("reviewed_at is in the future")
+            except (ValidationError, ValueError) as e:
+                message = e.errors()[0]["msg"] if isinstance(e, ValidationError) else str(e)
+                errors.append({"index": index, "review_id": review_id, "error": message})
+                continue
+
+            if item.review_id in seen:
+                duplicate_ids.append(item.review_id)
+                continue
+            seen.add(item.review_id)
+            by_card.setdefault(str(ObjectId(item.flashcard_id)), []).append((item.review_id, item.grade, reviewed_at))
+        return by_card
+
+    @staticmethod
+    @repo_error_handler
+    def submit_reviews(user_id, reviews):
+        """
+        Apply a batch of review results: one query for the card states, one
+        unordered insert into review_logs, SM-2 in memory, then one unordered
+        bulk_write for the new schedules. A review id already in review_logs is
+        reported as a duplicate and never applied twice, however old it is.
+        Reviews older than the card's last review are rejected: applying them
+        would move the schedule backwards.
+        """
+        now = datetime.utcnow()
+        errors = []
+        duplicate_ids = []
+        by_card = ReviewRepository._validate_reviews(reviews, now, errors, duplicate_ids)
+
+        states = ReviewStateModel.find_states(user_id, [ObjectId(flashcard_id) for flashcard_id in by_card])
+
+        log_entries = []
+        for flashcard_id, items in list(by_card.items()):
+            state = states.get(flashcard_id)
+            if state is None:
+                errors.extend(
+                    {"review_id": review_id, "flashcard_id": flashcard_id, "error": "Flashcard is not in your review queue"}
+                    for review_id, _, _ in items
+                )
+                del by_card[flashcard_id]
+                continue
+            log_entries.extend(
+                {
+                    "review_id": review_id,
+                    "flashcard_id": state["flashcard_id"],
+                    "folder_id": state["folder_id"],
+                    "grade": grade,
+                    "reviewed_at": reviewed_at,
+                }
+                for review_id, grade, reviewed_at in items
+            )
+
+        # Ghi log trước: review_id đã có (batch retry) bị unique _id chặn lại
+        inserted_ids = ReviewStateModel.insert_logs(user_id, log_entries)
+        duplicate_ids.extend(entry["review_id"] for entry in log_entries if entry["review_id"] not in inserted_ids)
+
+        updates = []
+        pending_ids = {}
+        rejected_ids = []
+        for flashcard_id, items in by_card.items():
+            state = states[flashcard_id]
+            last_reviewed_at = state.get("last_reviewed_at")
+            items = sorted((item for item in items if item[0] in inserted_ids), key=lambda item: item[2])
+            if last_reviewed_at is not None:
+                # Review cũ hơn lượt ôn đã áp dụng sẽ kéo lịch lùi lại: từ chối
+                stale = [item for item in items if item[2] < last_reviewed_at]
+                rejected_ids.extend(review_id for review_id, _, _ in stale)
+                errors.extend(
+                    {"review_id": review_id, "flashcard_id": flashcard_id, "error": "Review is older than the card's last review"}
+                    for review_id, _, _ in stale
+                )
+                items = items[len(stale):]
+            if not items:
+                continue
+
+            # Áp dụng lần lượt theo thời điểm ôn; chỉ ghi trạng thái cuối cùng
+            current = state
+            fields = {}
+            for _, grade, reviewed_at in items:
+                fields = schedule(current, grade, reviewed_at)
+                current = {**current, **fields}
+
+            updates.append((state, fields))
+            pending_ids[flashcard_id] = [review_id for review_id, _, _ in items]
+
+        for flashcard_id in ReviewStateModel.apply_reviews(user_id, updates):
+            # Card vừa được ghi bởi request khác với review khác: log của batch này bị gỡ để retry được
+            review_ids = pending_ids.pop(flashcard_id)
+            rejected_ids.extend(review_ids)
+            errors.extend(
+                {"review_id": review_id, "flashcard_id": flashcard_id, "error": "Card was updated concurrently, retry"}
+                for review_id in review_ids
+            )
+        ReviewStateModel.delete_logs(user_id, rejected_ids)
+
+        cards = []
+        for state, fields in updates:
+            flashcard_id = str(state["flashcard_id"])
+            if flashcard_id in pending_ids:
+                cards.append({
+                    "flashcard_id": flashcard_id,
+                    "due_at": fields["due_at"],
+                    "interval_days": fields["interval_days"],
+                    "ease": fields["ease"],
+                    "repetitions": fields["repetitions"],
+                })
+        return {
+            "applied_count": sum(len(review_ids) for review_ids in pending_ids.values()),
+            "duplicate_review_ids": duplicate_ids,
+            "errors": errors,
+            "cards": cards,
+        }
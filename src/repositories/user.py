@@ -1,5 +1,5 @@
 from src.models.user import UserModel
-from src.utils.formatters import pick_user
+from src.utils.formatters import pick_user, USER_PUBLIC_PROJECTION
 from src.utils.mongo_helper import serialize_mongo_data
 from src.utils.api_error import ApiError
 from src.validation.user import UserSchema
@@ -9,15 +9,19 @@ from src.utils.error_handlers import repo_error_handler
 from src.utils.email_helper import send_email_async
 import bcrypt
 import uuid
+import logging
 from src.config.cloudinary import CloudinaryService
 from src.config.mongodb import MongoDB
+from src.utils.pagination import find_page, encode_cursor
+from src.utils.search import prefix_query, SEARCH_COUNT_CAP
 
 class UserRepository:
     @staticmethod
     @repo_error_handler
     def create_new(reqData):
         """Creates a new user after processing input data."""
-        print("🚀 ~ request data:", reqData)  # In ra dữ liệu yêu cầu
+        # Không log reqData: có mật khẩu dạng plain text
+        logging.getLogger(__name__).debug("Registering user %s", reqData.get("email"))
 
         # Kiểm tra nếu email đã tồn tại
         if UserModel.find_one_by_email(reqData.get("email")):
@@ -211,7 +215,7 @@ class UserRepository:
     def get_all_users():
         try:
             # Fetch all users from the database
-            users_cursor = UserModel.USER_COLLECTION_NAME.find({})
+            users_cursor = UserModel.USER_COLLECTION_NAME.find({}, USER_PUBLIC_PROJECTION)
             users = list(users_cursor)
             return users
         except Exception as e:
@@ -219,14 +223,12 @@ class UserRepository:
 
     @staticmethod
     @repo_error_handler
-    def get_users_paginated(limit, offset):
-        try:
-            # Lấy danh sách người dùng với phân trang
-            users_cursor = UserModel.USER_COLLECTION_NAME.find({}).skip(offset).limit(limit)
-            users = list(users_cursor)
-            return users
-        except Exception as e:
-            raise ApiError(500, "An error occurred while fetching users.")
+    def get_users_paginated(limit, cursor=None):
+        """Lấy một trang người dùng theo keyset (createdAt, _id); trả về (users, next_cursor)"""
+        return find_page(
+            UserModel.USER_COLLECTION_NAME, {}, cursor=cursor, limit=limit, sort_field="createdAt",
+            projection=USER_PUBLIC_PROJECTION,
+        )
 
     @staticmethod
     @repo_error_handler
@@ -272,6 +274,7 @@ class UserRepository:
         from bson import ObjectId
         from src.models.folder import FolderModel
         from src.models.flashcard import FlashcardModel
+        from src.models.review_state import ReviewStateModel
         from src.config.cloudinary import CloudinaryService
 
         # Kiểm tra người dùng có tồn tại không
@@ -294,7 +297,7 @@ class UserRepository:
             user_id_obj = user_id
 
         # Lấy client từ MongoDB
-        client = MongoDB.client
+        client = MongoDB.get_client()
 
         # Lưu trữ public_ids của hình ảnh cần xóa từ Cloudinary
         images_to_delete = []
@@ -342,6 +345,16 @@ class UserRepository:
                     session=session
                 )
 
+                # Lịch ôn tập và số card đến hạn của người dùng
+                ReviewStateModel.REVIEW_STATE_COLLECTION_NAME.delete_many(
+                    {"user_id": str(user_id_obj)},
+                    session=session
+                )
+                ReviewStateModel.DUE_COUNTS_COLLECTION_NAME.delete_one(
+                    {"_id": str(user_id_obj)},
+                    session=session
+                )
+
                 # 4. Xóa người dùng
                 result = UserModel.USER_COLLECTION_NAME.delete_one(
                     {"_id": user_id_obj},
@@ -369,34 +382,60 @@ class UserRepository:
                 CloudinaryService.delete_image(image_id)
             except Exception as e:
                 # Log lỗi nhưng không làm gián đoạn quá trình
-                print(f"Warning: Failed to delete image {image_id} from Cloudinary: {e}")
+                logging.getLogger(__name__).warning("Failed to delete image %s from Cloudinary: %s", image_id, e)
 
         return True
 
     @staticmethod
     @repo_error_handler
-    def search_users(search_query, limit=10, offset=0):
+    def search_users(search_query, limit=10, offset=0, cursor=None, mode="prefix"):
         """
-        Tìm kiếm người dùng theo username, email hoặc fullName
+        Tìm kiếm người dùng theo username, email hoặc fullName.
+        - mode "prefix": khớp tiền tố trên trường search_keys (có index)
+        - mode "text": dùng text index user_text_search, xếp theo độ liên quan
+        Có cursor thì phân trang keyset (createdAt, _id), không thì dùng offset (chỉ để tương thích).
+        Tổng số là ước lượng (không có từ khóa) hoặc đếm chính xác tối đa SEARCH_COUNT_CAP.
+        Trả về (users, total_count, next_cursor, total_is_exact)
         """
-        query = {}
+        collection = UserModel.USER_COLLECTION_NAME
+        search_query = (search_query or "").strip()
+
+        if search_query and mode == "text":
+            query = {"$text": {"$search": search_query}}
+            total_count = collection.count_documents(query, limit=SEARCH_COUNT_CAP)
+            users = list(
+                collection.find(query, {**USER_PUBLIC_PROJECTION, "score": {"$meta": "textScore"}})
+                .sort([("score", {"$meta": "textScore"})])
+                .skip(offset)
+                .limit(limit)
+            )
+            return users, total_count, None, total_count < SEARCH_COUNT_CAP
 
-        # Thêm điều kiện tìm kiếm nếu có
         if search_query:
-            query["$or"] = [
-                {"username": {"$regex": search_query, "$options": "i"}},
-                {"email": {"$regex": search_query, "$options": "i"}},
-                {"fullName": {"$regex": search_query, "$options": "i"}}
-            ]
-
-        # Đếm tổng số kết quả
-        total_count = UserModel.USER_COLLECTION_NAME.count_documents(query)
+            query = prefix_query("search_keys", search_query)
+            # Đếm có giới hạn để không phải quét hết khi kết quả quá nhiều
+            total_count = collection.count_documents(query, limit=SEARCH_COUNT_CAP)
+            total_is_exact = total_count < SEARCH_COUNT_CAP
+        else:
+            query = {}
+            # Đọc từ metadata của collection, không quét document nào
+            total_count = collection.estimated_document_count()
+            total_is_exact = False
 
         # Lấy danh sách người dùng với phân trang
-        users = list(UserModel.USER_COLLECTION_NAME.find(query).sort("createdAt", -1).skip(offset).limit(limit))
-
-        return users, total_count
-
-
-
-
+        if cursor or not offset:
+            users, next_cursor = find_page(
+                collection, query, cursor=cursor, limit=limit, sort_field="createdAt",
+                projection=USER_PUBLIC_PROJECTION,
+            )
+        else:
+            users = list(
+                collection.find(query, USER_PUBLIC_PROJECTION)
+                .sort([("createdAt", -1), ("_id", -1)])
+                .skip(offset)
+                .limit(limit + 1)
+            )
+            next_cursor = encode_cursor(users[limit - 1], "createdAt") if len(users) > limit else None
+            users = users[:limit]
+
+        return users, total_count, next_cursor, total_is_exact
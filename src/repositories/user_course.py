@@ -1,7 +1,6 @@
 from src.models.user_course import UserCourseModel
-from src.models.course import CourseModel
-from src.utils.api_error import ApiError
 from src.utils.mongo_helper import serialize_mongo_data
+from src.utils.pagination import DEFAULT_PAGE_SIZE
 
 class UserCourseRepository:
     @staticmethod
@@ -19,16 +18,6 @@ class UserCourseRepository:
         return None
 
     @staticmethod
-    def get_courses_by_user(user_id):
-        """Lấy danh sách khóa học đã đăng ký của người dùng"""
-        user_courses = UserCourseModel.find_by_user(user_id)
-        course_ids = [uc["course_id"] for uc in user_courses]
-
-        # Lấy thông tin chi tiết của các khóa học
-        courses = []
-        for course_id in course_ids:
-            course = CourseModel.find_by_id(course_id)
-            if course:  # Chỉ thêm khóa học còn tồn tại
-                courses.append(serialize_mongo_data(course))
-
-        return courses
+    def get_courses_by_user(user_id, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """Lấy một trang khóa học public đã đăng ký của người dùng; trả về (courses, next_cursor)"""
+        return UserCourseModel.find_public_courses_by_user(user_id, cursor, limit)
@@ -1,8 +1,8 @@
 # src/resources/chatbot.py
 from flask import request, jsonify
-import google.generativeai as genai
 import os
 import logging
+from src.utils.metrics import track_outbound
 
 class ChatbotResource:
     @staticmethod
@@ -22,6 +22,8 @@ class ChatbotResource:
                 logging.error("GOOGLE_API_KEY không được thiết lập")
                 return jsonify({"error": "Cấu hình server không đúng"}), 500
 
+            # Import SDK Gemini khi có request chat đầu tiên thay vì lúc khởi động
+            import google.generativeai as genai
             genai.configure(api_key=api_key)
 
             # Sử dụng mô hình đúng
@@ -37,7 +39,8 @@ class ChatbotResource:
             Câu hỏi của người dùng: {user_message}
             """
 
-            response = model.generate_content(prompt)
+            with track_outbound("gemini", "generate_content"):
+                response = model.generate_content(prompt)
 
             if response and hasattr(response, 'text'):
                 return jsonify({"reply": response.text})
@@ -45,5 +48,5 @@ class ChatbotResource:
                 return jsonify({"reply": "Xin lỗi, tôi không thể tạo phản hồi lúc này."})
 
         except Exception as e:
-            logging.exception(f"Lỗi khi gọi Gemini API: {str(e)}")
+            logging.exception("Lỗi khi gọi Gemini API: %s", e)
             return jsonify({"error": f"Lỗi server: {str(e)}"}), 500
@@ -7,6 +7,8 @@ from src.utils.error_handlers import api_error_handler
 from src.config.cloudinary import CloudinaryService
 from src.utils.file_validator import FileValidator
 from src.validation.course import validate_course_creation, validate_course_update
+from src.utils.pagination import parse_page_size
+from src.middleware.http_cache import make_etag, not_modified, set_validators
 import logging
 
 class CourseResource:
@@ -44,11 +46,11 @@ class CourseResource:
         FileValidator.validate_image(thumbnail_file)
         
         # Upload video lên Cloudinary
-        logger.info(f"Uploading video for course: {course_title}")
+        logger.info("Uploading video for course: %s", course_title)
         video_data = CourseRepository.upload_course_video(video_file)
         
         # Upload thumbnail lên Cloudinary
-        logger.info(f"Uploading thumbnail for course: {course_title}")
+        logger.info("Uploading thumbnail for course: %s", course_title)
         thumbnail_data = CourseRepository.upload_course_thumbnail(thumbnail_file)
         
         # Khởi tạo dữ liệu khóa học
@@ -108,7 +110,7 @@ class CourseResource:
             FileValidator.validate_video(video_file)
             
             # Upload video mới lên Cloudinary
-            logger.info(f"Uploading new video for course: {course_id}")
+            logger.info("Uploading new video for course: %s", course_id)
             video_data = CourseRepository.upload_course_video(video_file)
             
             # Cập nhật thông tin video
@@ -120,16 +122,16 @@ class CourseResource:
             # Xóa video cũ trên Cloudinary nếu có
             if current_course.get("video_public_id"):
                 try:
-                    logger.info(f"Deleting old video: {current_course['video_public_id']}")
+                    logger.info("Deleting old video: %s", current_course['video_public_id'])
                     CloudinaryService.delete_video(current_course["video_public_id"])
                 except Exception as e:
-                    logger.error(f"Error deleting old video: {str(e)}")
+                    logger.error("Error deleting old video: %s", e)
 
             # Nếu khóa học chuyển sang chế độ riêng tư → xóa các đăng ký liên quan
             if "is_public" in update_data and update_data["is_public"] is False:
-                logger.info(f"Removing user registrations for private course: {course_id}")
+                logger.info("Removing user registrations for private course: %s", course_id)
                 deleted_count = UserCourseModel.delete_all_by_course_id(course_id)
-                logger.info(f"Deleted {deleted_count} user_course registrations")
+                logger.info("Deleted %s user_course registrations", deleted_count)
         
         # Kiểm tra xem có file thumbnail mới không
         if "thumbnail" in request.files and request.files["thumbnail"].filename:
@@ -139,7 +141,7 @@ class CourseResource:
             FileValidator.validate_image(thumbnail_file)
             
             # Upload thumbnail mới lên Cloudinary
-            logger.info(f"Uploading new thumbnail for course: {course_id}")
+            logger.info("Uploading new thumbnail for course: %s", course_id)
             thumbnail_data = CourseRepository.upload_course_thumbnail(thumbnail_file)
             
             # Cập nhật thông tin thumbnail
@@ -149,10 +151,10 @@ class CourseResource:
             # Xóa thumbnail cũ trên Cloudinary nếu có
             if current_course.get("thumbnail_publica_id"):
                 try:
-                    logger.info(f"Deleting old thumbnail: {current_course['thumbnail_public_id']}")
+                    logger.info("Deleting old thumbnail: %s", current_course['thumbnail_public_id'])
                     CloudinaryService.delete_image(current_course["thumbnail_public_id"])
                 except Exception as e:
-                    logger.error(f"Error deleting old thumbnail: {str(e)}")
+                    logger.error("Error deleting old thumbnail: %s", e)
         
         # Cập nhật course trong database
         result = CourseRepository.update_course(course_id, update_data)
@@ -167,8 +169,16 @@ class CourseResource:
     @staticmethod
     @api_error_handler
     def get_public_courses():
+        # Kiểm tra ETag trước khi query và serialize danh sách
+        version, last_modified = CourseRepository.get_public_catalog_state()
+        # Không đọc được version thì trả body đầy đủ, không gửi ETag
+        etag = make_etag("public-courses", version) if version is not None else None
+        cached = not_modified(etag, last_modified)
+        if cached is not None:
+            return cached
+
         courses = CourseRepository.get_public_courses()
-        return jsonify({"courses": courses}), 200
+        return set_validators(jsonify({"courses": courses}), etag, last_modified), 200
 
     @staticmethod
     @api_error_handler
@@ -197,14 +207,16 @@ class CourseResource:
     @staticmethod
     @api_error_handler
     def get_user_courses():
+        """Lấy danh sách khóa học (public) đã đăng ký của người dùng"""
         user_id = g.user["_id"]
-        """Lấy danh sách khóa học đã đăng ký của người dùng"""
-        user_courses = UserCourseRepository.get_courses_by_user(user_id)
+        cursor = request.args.get("cursor")
+        limit = parse_page_size(request.args.get("limit"))
 
-        # Lọc chỉ lấy các khóa học công khai
-        public_courses = [course for course in user_courses if course.get("is_public")]
+        # Lọc is_public được thực hiện phía MongoDB
+        public_courses, next_cursor = UserCourseRepository.get_courses_by_user(user_id, cursor, limit)
 
         return jsonify({
             "success": True,
-            "courses": public_courses
+            "courses": public_courses,
+            "next_cursor": next_cursor
         }), 200
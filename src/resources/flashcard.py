@@ -1,19 +1,95 @@
-from flask import request, jsonify, g
+from flask import request, jsonify, g, Response, stream_with_context
+import logging
 from src.repositories.flashcard import FlashcardRepository
+from src.repositories.import_job import ImportJobRepository
 from src.utils.api_error import ApiError
 from src.utils.error_handlers import api_error_handler
 from src.validation.flashcard import SaveFlashcardsValidation
-import logging
-import json
+from src.utils.flashcard_parser import detect_import_format
+from src.utils.flashcard_export import iter_export, EXPORT_MIMETYPES, EXPORT_EXTENSIONS
+from src.utils.pagination import parse_page_size
 
 class FlashcardResource:
     @staticmethod
     @api_error_handler
     def get_flashcards_by_folder(folder_id):
-        """Get all flashcards in a folder"""
+        """Get a page of flashcards in a folder; the next page token is sent in X-Next-Cursor"""
+        user_id = g.user["_id"]
+        cursor = request.args.get("cursor")
+        limit = parse_page_size(request.args.get("limit"))
+        
+        flashcards, next_cursor = FlashcardRepository.get_flashcards_by_folder(
+            folder_id, user_id, cursor=cursor, limit=limit
+        )
+        
+        response = jsonify(flashcards)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return response
+
+    @staticmethod
+    @api_error_handler
+    def export_folder(folder_id):
+        """Download one folder (own or public) as ?format=json|ndjson|csv|anki"""
+        return FlashcardResource._export(folder_id)
+
+    @staticmethod
+    @api_error_handler
+    def export_all_folders():
+        """Download every folder of the current user as ?format=json|ndjson|csv|anki"""
+        return FlashcardResource._export(None)
+
+    @staticmethod
+    def _export(folder_id):
+        export_format = request.args.get("format", "json").lower()
+        if export_format not in EXPORT_MIMETYPES:
+            raise ApiError(400, f"Unsupported export format. Use one of: {', '.join(EXPORT_MIMETYPES)}")
+
+        # Kiểm tra quyền trước khi gửi header: lỗi sau đó không đổi được status code nữa
+        folder_titles, flashcards = FlashcardRepository.get_export_source(g.user["_id"], folder_id)
+
+        def generate():
+            try:
+                yield from iter_export(flashcards, export_format, folder_titles)
+            except Exception as e:
+                logging.getLogger(__name__).error("Flashcard export aborted: %s", e)
+                raise
+            finally:
+                flashcards.close()
+
+        if folder_id:
+            filename = f"flashcards-{folder_id}.{EXPORT_EXTENSIONS[export_format]}"
+        else:
+            filename = f"flashcards.{EXPORT_EXTENSIONS[export_format]}"
+        return Response(
+            stream_with_context(generate()),
+            mimetype=EXPORT_MIMETYPES[export_format],
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+    @staticmethod
+    @api_error_handler
+    def search_flashcards():
+        """Search own and public flashcards (?q=&mode=prefix|text&page=&limit=)"""
         user_id = g.user["_id"]
-        flashcards = FlashcardRepository.get_flashcards_by_folder(folder_id, user_id)
-        return jsonify(flashcards)
+        search_query = request.args.get("q", "")
+        mode = request.args.get("mode", "prefix")
+        page = max(request.args.get("page", 1, type=int), 1)
+        limit = parse_page_size(request.args.get("limit"), default=20, maximum=100)
+
+        flashcards, total, total_exact = FlashcardRepository.search_flashcards(
+            user_id, search_query, mode=mode, limit=limit, offset=(page - 1) * limit
+        )
+
+        return jsonify({
+            "flashcards": flashcards,
+            "pagination": {
+                "total": total,
+                "totalExact": total_exact,
+                "page": page,
+                "limit": limit,
+            }
+        }), 200
 
     @staticmethod
     @api_error_handler
@@ -59,10 +135,7 @@ class FlashcardResource:
     @staticmethod
     @api_error_handler
     def import_flashcards():
-        """Import flashcards from JSON file"""
-        logger = logging.getLogger(__name__)
-        logger.info("=== Importing Flashcards ===")
-        
+        """Upload a flashcard file and start a background import job"""
         # Validate request data
         if "file" not in request.files:
             raise ApiError(400, "No file uploaded")
@@ -71,35 +144,50 @@ class FlashcardResource:
         if file.filename == "":
             raise ApiError(400, "No file selected")
         
-        if not file.filename.endswith(".json"):
-            raise ApiError(400, "Only JSON files are allowed")
-        
-        # Read and parse JSON file
-        try:
-            flashcards_data = json.load(file)
-            logger.info(f"Successfully parsed JSON file with {len(flashcards_data)} flashcards")
-        except json.JSONDecodeError as e:
-            logger.error(f"Error parsing JSON file: {str(e)}")
-            raise ApiError(400, "Invalid JSON file")
+        import_format = detect_import_format(file.filename)
+        if not import_format:
+            raise ApiError(400, "Only JSON, NDJSON, CSV and TSV (Anki/Quizlet export) files are allowed")
         
         # Get folder info from request
         create_new_folder = request.form.get("create_new_folder", "false").lower() == "true"
         folder_id = request.form.get("folder_id")
         folder_title = request.form.get("folder_title", "Imported Flashcards")
         
+        if not create_new_folder and not folder_id:
+            raise ApiError(400, "Folder ID is required when using existing folder")
+        
         # Get user ID from authenticated user
         user_id = g.user["_id"]
         
-        # Save flashcards to folder
-        result = FlashcardRepository.save_flashcards_to_folder(
+        job = ImportJobRepository.create_import_job(
+            file,
+            import_format,
             create_new_folder,
             folder_id,
             folder_title,
-            flashcards_data,
             user_id
         )
         
         return jsonify({
-            "message": "Flashcards imported successfully",
-            "result": result
-        }), 201
\ No newline at end of file
+            "message": "Flashcard import started",
+            "job": job
+        }), 202
+
+    @staticmethod
+    @api_error_handler
+    def get_import_job(job_id):
+        """Get progress of an import job"""
+        user_id = g.user["_id"]
+        job = ImportJobRepository.get_import_job(job_id, user_id)
+        return jsonify({"job": job}), 200
+
+    @staticmethod
+    @api_error_handler
+    def resume_import_job(job_id):
+        """Resume a failed import job from its last committed chunk"""
+        user_id = g.user["_id"]
+        job = ImportJobRepository.resume_import_job(job_id, user_id)
+        return jsonify({
+            "message": "Flashcard import resumed",
+            "job": job
+        }), 202
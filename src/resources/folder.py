@@ -2,9 +2,10 @@ from flask import request, jsonify, g
 from src.repositories.folder import FolderRepository
 from src.utils.api_error import ApiError
 from src.utils.error_handlers import api_error_handler
-from src.validation.folder import CreateFolderValidation, UpdateFolderValidation
+from src.validation.folder import CreateFolderValidation, UpdateFolderValidation, CloneFolderValidation
+from src.utils.pagination import parse_page_size
+from src.middleware.http_cache import make_etag, not_modified, set_validators
 import logging
-import asyncio
 
 class FolderResource:
     @staticmethod
@@ -31,24 +32,19 @@ class FolderResource:
     def get_user_folders():
         """Get all folders for current user"""
         logger = logging.getLogger(__name__)
-        logger.info("=== Getting User Folders ===")
         
         # Get user ID from authenticated user
         user_id = g.user.get("_id")
-        logger.info(f"User ID from token: {user_id}")
         
         if not user_id:
-            logger.error("No user_id found in g.user")
+            logger.warning("No user_id found in g.user")
             raise ApiError(401, "Invalid authentication token")
         
         # Get folders
-        logger.info(f"Calling FolderRepository.get_folders_by_user with user_id: {user_id}")
         result = FolderRepository.get_folders_by_user(user_id)
-        logger.info(f"Found {len(result)} folders for user")
+        logger.debug("Found %s folders for user %s", len(result), user_id)
         
-        response_data = {"folders": result}
-        logger.info(f"Returning response: {response_data}")
-        return jsonify(response_data), 200
+        return jsonify({"folders": result}), 200
 
     @staticmethod
     @api_error_handler
@@ -81,6 +77,19 @@ class FolderResource:
             "folder": result
         }), 200
 
+    @staticmethod
+    @api_error_handler
+    def clone_folder(folder_id):
+        """Copy a public folder into the current user's library"""
+        validated_data = CloneFolderValidation(**(request.get_json(silent=True) or {}))
+
+        result = FolderRepository.clone_folder(folder_id, g.user["_id"], title=validated_data.title)
+
+        return jsonify({
+            "message": "Folder cloned successfully",
+            "folder": result
+        }), 201
+
     @staticmethod
     @api_error_handler
     def delete_folder(folder_id):
@@ -100,19 +109,26 @@ class FolderResource:
     @api_error_handler
     def get_public_folders():
         """Get all public folders"""
-        logger = logging.getLogger(__name__)
-        logger.info("=== Getting Public Folders ===")
-        
         # Get query parameters
-        skip = int(request.args.get("skip", 0))
-        limit = int(request.args.get("limit", 100))
+        cursor = request.args.get("cursor")
+        limit = parse_page_size(request.args.get("limit"))
+
+        # Kiểm tra ETag trước khi query và serialize trang
+        version, last_modified = FolderRepository.get_public_catalog_state()
+        # Không đọc được version thì trả body đầy đủ, không gửi ETag
+        etag = make_etag("public-folders", version, cursor, limit) if version is not None else None
+        cached = not_modified(etag, last_modified)
+        if cached is not None:
+            return cached
         
         # Get folders
-        result = FolderRepository.get_public_folders(skip, limit)
+        result, next_cursor = FolderRepository.get_public_folders(cursor, limit)
         
-        return jsonify({
-            "folders": result
-        }), 200
+        response = jsonify({
+            "folders": result,
+            "next_cursor": next_cursor
+        })
+        return set_validators(response, etag, last_modified), 200
 
     @staticmethod
     @api_error_handler
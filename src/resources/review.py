@@ -0,0 +1,53 @@
+from flask import request, jsonify, g
+from src.repositories.review import ReviewRepository
+from src.utils.error_handlers import api_error_handler
+from src.utils.pagination import parse_page_size
+from src.validation.review import ReviewCardValidation, ReviewBatchValidation
+
+
+class ReviewResource:
+    @staticmethod
+    @api_error_handler
+    def enroll_folder(folder_id):
+        """Add a folder's flashcards to the current user's review queue"""
+        user_id = g.user["_id"]
+        result = ReviewRepository.enroll_folder(folder_id, user_id)
+        return jsonify(result), 200
+
+    @staticmethod
+    @api_error_handler
+    def get_due_cards():
+        """Next due cards across all folders (or one folder with ?folder_id=)"""
+        user_id = g.user["_id"]
+        limit = parse_page_size(request.args.get("limit"), default=20, maximum=100)
+        folder_id = request.args.get("folder_id")
+
+        cards = ReviewRepository.get_due_cards(user_id, limit, folder_id)
+        return jsonify({"cards": cards}), 200
+
+    @staticmethod
+    @api_error_handler
+    def get_due_counts():
+        """Number of due cards per folder, for the dashboard badge"""
+        user_id = g.user["_id"]
+        return jsonify(ReviewRepository.get_due_counts(user_id)), 200
+
+    @staticmethod
+    @api_error_handler
+    def review_card(flashcard_id):
+        """Submit one review result"""
+        user_id = g.user["_id"]
+        validated_data = ReviewCardValidation(**(request.json or {}))
+
+        state = ReviewRepository.review_card(user_id, flashcard_id, validated_data.grade)
+        return jsonify({"state": state}), 200
+
+    @staticmethod
+    @api_error_handler
+    def submit_reviews():
+        """Submit a study session's review results in one request"""
+        user_id = g.user["_id"]
+        validated_data = ReviewBatchValidation(**(request.json or {}))
+
+        result = ReviewRepository.submit_reviews(user_id, validated_data.reviews)
+        return jsonify(result), 200
@@ -2,15 +2,12 @@ import io
 import logging
 import os
 import gc
-import torch
+import sys
+import threading
 from flask import jsonify, request
-from PIL import Image, UnidentifiedImageError
-from ultralytics import YOLO
 from src.utils.translate import translate_word
 from functools import lru_cache
 
-# Cấu hình logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Cache kết quả dịch
@@ -19,33 +16,51 @@ def cached_translate(word):
     try:
         return translate_word(word)
     except Exception as e:
-        logger.error(f"Translation error for '{word}': {str(e)}")
+        logger.error("Translation error for '%s': %s", word, e)
         return "Không thể dịch"
 
 # Lazy loading model - chỉ tải khi cần
 model = None
+_model_lock = threading.Lock()
 
 def get_model():
     """Tải mô hình YOLOv8n (nhẹ nhất) với lazy loading"""
     global model
     
     if model is None:
-        logger.info("Loading YOLOv8n model...")
-        try:
-            # Sử dụng YOLOv8n thay vì YOLOv10n
-            model = YOLO("yolov8n.pt")
-            
-            # Tối ưu hóa mô hình cho inference
-            model.to('cpu')
-            logger.info("Model loaded successfully")
-        except Exception as e:
-            logger.error(f"Error loading model: {str(e)}")
-            raise RuntimeError(f"Failed to load model: {str(e)}")
+        with _model_lock:
+            if model is not None:
+                return model
+
+            logger.info("Loading YOLOv8n model...")
+            try:
+                # Import torch/ultralytics ở lần dùng đầu tiên, process không chạy snaplang không phải trả chi phí này
+                from ultralytics import YOLO
+
+                # Sử dụng YOLOv8n thay vì YOLOv10n
+                loaded_model = YOLO("yolov8n.pt")
+
+                # Tối ưu hóa mô hình cho inference
+                loaded_model.to('cpu')
+                model = loaded_model
+                logger.info("Model loaded successfully")
+            except Exception as e:
+                logger.error("Error loading model: %s", e)
+                raise RuntimeError(f"Failed to load model: {str(e)}")
     
     return model
 
+def release_memory():
+    """Giải phóng bộ nhớ cache của PyTorch (chỉ khi torch đã được import)"""
+    gc.collect()
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
 def preprocess_image(image_file):
     """Tiền xử lý ảnh đầu vào"""
+    from PIL import Image, UnidentifiedImageError
+
     try:
         # Đọc và xử lý ảnh
         image_bytes = image_file.read()
@@ -54,7 +69,7 @@ def preprocess_image(image_file):
         # Giảm kích thước ảnh nhiều hơn để tiết kiệm bộ nhớ
         max_size = 320  # Giảm xuống 320 thay vì 640
         if max(image.size) > max_size:
-            logger.info(f"Resizing image from {image.size} to max dimension {max_size}")
+            logger.debug("Resizing image from %s to max dimension %s", image.size, max_size)
             ratio = max_size / max(image.size)
             new_size = (int(image.size[0] * ratio), int(image.size[1] * ratio))
             image = image.resize(new_size, Image.LANCZOS)
@@ -64,7 +79,7 @@ def preprocess_image(image_file):
         logger.error("Invalid image format")
         raise ValueError("Invalid image format")
     except Exception as e:
-        logger.error(f"Error processing image: {str(e)}")
+        logger.error("Error processing image: %s", e)
         raise ValueError(f"Error processing image: {str(e)}")
 
 def run_inference(model, image):
@@ -81,12 +96,11 @@ def run_inference(model, image):
         )
         return results
     except Exception as e:
-        logger.error(f"Error during model inference: {str(e)}")
+        logger.error("Error during model inference: %s", e)
         raise RuntimeError(f"Error running model: {str(e)}")
     finally:
         # Giải phóng bộ nhớ cache của PyTorch
-        torch.cuda.empty_cache() if torch.cuda.is_available() else None
-        gc.collect()
+        release_memory()
 
 def detect_objects():
     """Hàm chính để phát hiện đối tượng trong ảnh"""
@@ -125,18 +139,17 @@ def detect_objects():
                     name = result.names[cls_id]  # Lấy tên vật thể
                     detections.append(name)
     except Exception as e:
-        logger.error(f"Error in object detection: {str(e)}")
+        logger.error("Error in object detection: %s", e)
         return jsonify({"error": "Failed to detect objects in image"}), 500
     finally:
         # Giải phóng bộ nhớ
-        gc.collect()
-        torch.cuda.empty_cache() if torch.cuda.is_available() else None
+        release_memory()
     
     if not detections:
         logger.info("No objects detected in the image")
         return jsonify({"message": "No objects detected"}), 200
     
-    logger.info(f"Objects detected: {detections}")
+    logger.info("Objects detected: %s", detections)
     
     # Chuyển list thành set để loại bỏ trùng lặp
     unique_objects = list(set(detections))
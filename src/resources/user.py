@@ -7,7 +7,7 @@ from src.utils.error_handlers import api_error_handler
 from flask import g
 
 from src.utils.formatters import pick_user
-from src.utils.mongo_helper import serialize_mongo_data
+from src.utils.pagination import parse_page_size
 from src.validation.user import (
     RegisterValidation,
     VerifyAccountValidation,
@@ -108,7 +108,7 @@ class UserResource:
 
     @staticmethod
     @api_error_handler
-    async def update(user_avatar_file=None, **kwargs):
+    def update(user_avatar_file=None, **kwargs):
         # Get user_id from authenticated user
         user_id = g.user["_id"]
         
@@ -135,26 +135,33 @@ class UserResource:
     def get_list_user():
         # Lấy tham số từ query string
         page = request.args.get('page', 1, type=int)
-        limit = request.args.get('limit', 10, type=int)
+        limit = parse_page_size(request.args.get('limit'), default=10, maximum=100)
         search = request.args.get('search', '')
+        # "prefix" (mặc định, gõ tới đâu tìm tới đó) hoặc "text" (tìm theo từ, xếp theo độ liên quan)
+        mode = request.args.get('mode', 'prefix')
+        # Cursor (keyset) được ưu tiên; page chỉ giữ lại để nhảy trang trực tiếp
+        cursor = request.args.get('cursor')
 
         # Tính toán offset
-        offset = (page - 1) * limit
+        offset = 0 if cursor else max(page - 1, 0) * limit
 
         # Gọi repository để lấy danh sách người dùng
-        users, total_users = UserRepository.search_users(search, limit, offset)
+        users, total_users, next_cursor, total_exact = UserRepository.search_users(
+            search, limit, offset, cursor, mode
+        )
 
-        # Chuẩn bị response
-        serialized_users = [serialize_mongo_data(user) for user in users]
-        users_response = [pick_user(user) for user in serialized_users]
+        # Repository đã projection đúng các trường public; pick_user chỉ bỏ score của mode "text"
+        users_response = [pick_user(user) for user in users]
 
         return jsonify({
             "users": users_response,
             "pagination": {
                 "total": total_users,
+                "totalExact": total_exact,
                 "page": page,
                 "limit": limit,
-                "totalPages": (total_users + limit - 1) // limit
+                "totalPages": (total_users + limit - 1) // limit,
+                "nextCursor": next_cursor
             }
         }), 200
 
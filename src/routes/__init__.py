@@ -1,15 +1,31 @@
+import importlib
 from flask import Blueprint
-from .user import user_bp
-from .snaplang import snaplang_bp
-from src.routes.folder import folder_bp
-from src.routes.flashcard import flashcard_bp
-from src.routes.course import course_bp
-from src.routes.chatbot import chatbot_bp
-api_bp = Blueprint("api", __name__)
-
-api_bp.register_blueprint(user_bp, url_prefix="/api/users")
-api_bp.register_blueprint(snaplang_bp, url_prefix="/api/snaplang") 
-api_bp.register_blueprint(folder_bp, url_prefix="/api")
-api_bp.register_blueprint(flashcard_bp, url_prefix="/api")
-api_bp.register_blueprint(course_bp, url_prefix="/api")
-api_bp.register_blueprint(chatbot_bp, url_prefix="/api/chatbot")
\ No newline at end of file
+
+# Tên blueprint -> (module, biến blueprint, url_prefix).
+# Module chỉ được import khi blueprint được đăng ký, nên một process không
+# phục vụ snaplang/chatbot sẽ không import code (và thư viện nặng) của chúng.
+BLUEPRINTS = {
+    "user": ("src.routes.user", "user_bp", "/api/users"),
+    "snaplang": ("src.routes.snaplang", "snaplang_bp", "/api/snaplang"),
+    "folder": ("src.routes.folder", "folder_bp", "/api"),
+    "flashcard": ("src.routes.flashcard", "flashcard_bp", "/api"),
+    "course": ("src.routes.course", "course_bp", "/api"),
+    "review": ("src.routes.review", "review_bp", "/api"),
+    "chatbot": ("src.routes.chatbot", "chatbot_bp", "/api/chatbot"),
+}
+
+ALL_BLUEPRINTS = tuple(BLUEPRINTS)
+
+
+def build_api_blueprint(names=ALL_BLUEPRINTS):
+    """Build the "api" blueprint containing only the requested child blueprints"""
+    unknown = [name for name in names if name not in BLUEPRINTS]
+    if unknown:
+        raise ValueError(f"Unknown blueprints: {', '.join(unknown)}")
+
+    api_bp = Blueprint("api", __name__)
+    for name in names:
+        module_name, attribute, url_prefix = BLUEPRINTS[name]
+        blueprint = getattr(importlib.import_module(module_name), attribute)
+        api_bp.register_blueprint(blueprint, url_prefix=url_prefix)
+    return api_bp
@@ -3,6 +3,7 @@ from src.resources.course import CourseResource
 from src.middleware.auth_middleware import is_authorized
 from src.middleware.role_middleware import admin_required
 from src.middleware.access_middleware import has_course_access
+from src.middleware.http_cache import cache_policy, PUBLIC_CATALOG
 import logging
 
 course_bp = Blueprint("course_bp", __name__)
@@ -32,6 +33,7 @@ course_bp.route("/courses/<course_id>", methods=["GET"])(is_authorized(admin_req
 course_bp.route("/courses", methods=["GET"])(is_authorized(admin_required(CourseResource.get_all_courses)))
 
 @course_bp.route("/public-courses", methods=["GET"])
+@cache_policy(PUBLIC_CATALOG)
 def get_public_courses():
     return CourseResource.get_public_courses()
 
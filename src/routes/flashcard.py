@@ -5,7 +5,13 @@ from src.middleware.auth_middleware import is_authorized
 flashcard_bp = Blueprint("flashcard", __name__)
 
 flashcard_bp.route("/flashcards/save-to-folder", methods=["POST"])(is_authorized(FlashcardResource.save_flashcards_to_folder))
+flashcard_bp.route("/flashcards/import", methods=["POST"])(is_authorized(FlashcardResource.import_flashcards))
+flashcard_bp.route("/flashcards/import-jobs/<job_id>", methods=["GET"])(is_authorized(FlashcardResource.get_import_job))
+flashcard_bp.route("/flashcards/import-jobs/<job_id>/resume", methods=["POST"])(is_authorized(FlashcardResource.resume_import_job))
 
 flashcard_bp.route("/folders/<folder_id>/flashcards", methods=["GET"])(is_authorized(FlashcardResource.get_flashcards_by_folder))
+flashcard_bp.route("/folders/<folder_id>/export", methods=["GET"])(is_authorized(FlashcardResource.export_folder))
+flashcard_bp.route("/flashcards/export", methods=["GET"])(is_authorized(FlashcardResource.export_all_folders))
+flashcard_bp.route("/flashcards/search", methods=["GET"])(is_authorized(FlashcardResource.search_flashcards))
 flashcard_bp.route("/flashcards/<flashcard_id>", methods=["GET"])(is_authorized(FlashcardResource.get_flashcard_by_id))
 flashcard_bp.route("/flashcards/<flashcard_id>", methods=["DELETE"])(is_authorized(FlashcardResource.delete_flashcard))
@@ -0,0 +1,12 @@
+from flask import Blueprint
+from src.resources.review import ReviewResource
+from src.middleware.auth_middleware import is_authorized
+
+review_bp = Blueprint("review", __name__)
+
+# Ôn tập ngắt quãng (SM-2)
+review_bp.route("/folders/<folder_id>/study", methods=["POST"])(is_authorized(ReviewResource.enroll_folder))
+review_bp.route("/reviews/due", methods=["GET"])(is_authorized(ReviewResource.get_due_cards))
+review_bp.route("/reviews/due-counts", methods=["GET"])(is_authorized(ReviewResource.get_due_counts))
+review_bp.route("/flashcards/<flashcard_id>/review", methods=["POST"])(is_authorized(ReviewResource.review_card))
+review_bp.route("/reviews/batch", methods=["POST"])(is_authorized(ReviewResource.submit_reviews))
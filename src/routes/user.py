@@ -3,7 +3,6 @@ from src.resources.user import UserResource
 from src.middleware.auth_middleware import is_authorized
 from src.middleware.role_middleware import admin_required
 from src.middleware.image_upload import image_upload_middleware
-from asgiref.sync import async_to_sync
 
 user_bp = Blueprint("user", __name__)
 
@@ -23,13 +22,10 @@ def update_route():
         # 1. Lấy hàm upload từ middleware (image_upload_middleware["upload"])
         # 2. Cấu hình để chỉ chấp nhận 1 file với tên field là "avatar" (.single("avatar"))
         # 3. Truyền hàm UserResource.update vào middleware để xử lý sau khi validate file
-        # 4. Chuyển đổi hàm async thành sync vì Flask không hỗ trợ async trực tiếp
-        return async_to_sync(image_upload_middleware["upload"].single("avatar")(UserResource.update))()
+        return image_upload_middleware["upload"].single("avatar")(UserResource.update)()
     else:
-        # Nếu không có file avatar:
-        # 1. Gọi trực tiếp hàm update để xử lý cập nhật thông tin thông thường
-        # 2. Chuyển đổi hàm async thành sync
-        return async_to_sync(UserResource.update)()
+        # Nếu không có file avatar: gọi trực tiếp hàm update để xử lý cập nhật thông tin thông thường
+        return UserResource.update()
 
 user_bp.route("/admin/users", methods=["GET"])(is_authorized(admin_required(UserResource.get_list_user)))
 @user_bp.route("/admin/users/<user_id>/role", methods=["PUT"])
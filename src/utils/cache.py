@@ -0,0 +1,150 @@
+"""
+Read-through cache for the public catalogs (public courses, public folders).
+
+Each catalog has a version number in the `catalog_versions` collection. Writes
+that change a catalog call `invalidate()`, which bumps the version. Every
+process compares its cached entries against that version (re-read at most every
+CATALOG_VERSION_TTL seconds), so an invalidation in one gunicorn worker or role
+reaches all of them. Entries also expire after CATALOG_CACHE_TTL seconds as a
+safety net for writes made outside the app.
+
+A miss is single-flight: concurrent requests for the same key wait for the one
+query in progress instead of all hitting MongoDB.
+
+    CATALOG_CACHE_TTL=300       # 0 disables the cache
+    CATALOG_VERSION_TTL=2
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pymongo import ReturnDocument
+from src.config.mongodb import LazyCollection
+from src.utils.metrics import Counter, REGISTRY
+
+CATALOG_VERSIONS = LazyCollection("catalog_versions")
+
+CACHE_REQUESTS = Counter(
+    "catalog_cache_requests_total",
+    "Catalog cache lookups by cache and result (hit, miss)",
+    ("cache", "result"),
+)
+REGISTRY.append(CACHE_REQUESTS)
+
+
+class CatalogCache:
+    def __init__(self, name, ttl=None, version_ttl=None, max_entries=256):
+        self.name = name
+        self.ttl = float(os.getenv("CATALOG_CACHE_TTL", 300) if ttl is None else ttl)
+        self.version_ttl = float(os.getenv("CATALOG_VERSION_TTL", 2) if version_ttl is None else version_ttl)
+        self.max_entries = max_entries
+
+        # key -> (version, expires_at, value)
+        self._entries = {}
+        # key -> Lock của lần nạp đang chạy
+        self._loading = {}
+        self._lock = threading.Lock()
+        # (version, updated_at) đọc gần nhất và thời điểm đọc
+        self._state = None
+        self._state_read_at = 0.0
+
+    @property
+    def enabled(self):
+        return self.ttl > 0
+
+    def state(self):
+        """(version, updated_at) of the catalog; updated_at is None until the first invalidation"""
+        now = time.monotonic()
+        with self._lock:
+            if self._state is not None and now - self._state_read_at < self.version_ttl:
+                return self._state
+
+        try:
+            document = CATALOG_VERSIONS.find_one({"_id": self.name})
+        except Exception as e:
+            # Không đọc được version thì coi như cache đã cũ
+            logging.getLogger(__name__).warning("Failed to read %s catalog version: %s", self.name, e)
+            return None, None
+
+        state = (document["version"], document.get("updated_at")) if document else (0, None)
+        with self._lock:
+            self._state = state
+            self._state_read_at = now
+        return state
+
+    def get(self, key, loader):
+        """Return the cached value for key, calling loader() once on a miss"""
+        if not self.enabled:
+            return loader()
+
+        version, _ = self.state()
+        value = self._lookup(key, version)
+        if value is not None:
+            CACHE_REQUESTS.inc(self.name, "hit")
+            return value
+
+        with self._lock:
+            lock = self._loading.setdefault(key, threading.Lock())
+
+        with lock:
+            # Request khác có thể vừa nạp xong trong lúc chờ
+            value = self._lookup(key, version)
+            if value is not None:
+                CACHE_REQUESTS.inc(self.name, "hit")
+                return value
+
+            CACHE_REQUESTS.inc(self.name, "miss")
+            try:
+                value = loader()
+                if version is not None:
+                    self._store(key, version, value)
+                return value
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+
+    def invalidate(self):
+        """Bump the catalog version so every process drops its entries"""
+        now = datetime.utcnow()
+        try:
+            document = CATALOG_VERSIONS.find_one_and_update(
+                {"_id": self.name},
+                {"$inc": {"version": 1}, "$set": {"updated_at": now}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            state = (document["version"], document["updated_at"])
+        except Exception as e:
+            logging.getLogger(__name__).error("Failed to bump %s catalog version: %s", self.name, e)
+            state = None
+
+        with self._lock:
+            self._entries.clear()
+            self._state = state
+            self._state_read_at = time.monotonic() if state is not None else 0.0
+        logging.getLogger(__name__).debug("Invalidated %s catalog cache", self.name)
+
+    def _lookup(self, key, version):
+        if version is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        entry_version, expires_at, value = entry
+        if entry_version != version or time.monotonic() >= expires_at:
+            return None
+        return value
+
+    def _store(self, key, version, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            while len(self._entries) >= self.max_entries:
+                # Bỏ entry cũ nhất (dict giữ thứ tự chèn)
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (version, time.monotonic() + self.ttl, value)
+
+
+PUBLIC_COURSES_CACHE = CatalogCache("public_courses")
+PUBLIC_FOLDERS_CACHE = CatalogCache("public_folders")
@@ -4,60 +4,70 @@ from src.utils.api_error import ApiError
 import logging
 from bson.errors import InvalidId
 
-def api_error_handler(func):
+logger = logging.getLogger(__name__)
+
+# Lỗi 4xx là lỗi của client: chỉ ghi ở mức DEBUG. Lỗi 5xx ghi kèm stack trace.
+# Mỗi lớp (model/repository/resource) bọc lại lỗi của lớp dưới, nên ApiError
+# đã tạo chỉ được ghi lại ở mức DEBUG để tránh một lỗi bị log nhiều lần.
+
+def _log_api_error(layer, error):
+    if error.status_code >= 500:
+        logger.warning("API error in %s (%s): %s", layer, error.status_code, error.message)
+    else:
+        logger.debug("API error in %s (%s): %s", layer, error.status_code, error.message)
+
+def _wrap(func, handle):
+    """Apply an error translator to a function"""
     @wraps(func)
     def wrapper(*args, **kwargs):
         try:
             return func(*args, **kwargs)
-        except ValidationError as e:
-            print(f"Validation error: {str(e)}")
+        except Exception as e:
+            handle(e, args)
+    return wrapper
+
+def api_error_handler(func):
+    def handle(e, args):
+        if isinstance(e, ValidationError):
+            logger.debug("Validation error: %s", e)
             raise ApiError(400, str(e))
-        except ValueError as e:
-            print(f"Value error: {str(e)}")
+        if isinstance(e, ValueError):
+            logger.debug("Value error: %s", e)
             raise ApiError(400, str(e))
-        except ApiError as e:
-            print(f"API error: {e.message}")
+        if isinstance(e, ApiError):
+            _log_api_error("resource", e)
             raise e
-        except Exception as e:
-            print(f"Unexpected error: {str(e)}")
-            raise ApiError(500, "Something went wrong!")
-    return wrapper
+        logger.exception("Unexpected error in %s: %s", func.__qualname__, e)
+        raise ApiError(500, "Something went wrong!")
+    return _wrap(func, handle)
 
 def repo_error_handler(func):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        try:
-            return func(*args, **kwargs)
-        except ValueError as e:
-            print(f"Value error in repository: {str(e)}")
+    def handle(e, args):
+        if isinstance(e, ValueError):
+            logger.debug("Value error in repository: %s", e)
             raise ApiError(400, str(e))
-        except ApiError as e:
-            print(f"API error in repository: {e.message}")
+        if isinstance(e, ApiError):
+            _log_api_error("repository", e)
             raise e
-        except Exception as e:
-            print(f"Unexpected error in repository: {str(e)}")
-            error_message = f"An error occurred while {func.__name__.replace('_', ' ')}"
-            raise ApiError(500, error_message)
-    return wrapper
+        logger.exception("Unexpected error in repository %s: %s", func.__qualname__, e)
+        error_message = f"An error occurred while {func.__name__.replace('_', ' ')}"
+        raise ApiError(500, error_message)
+    return _wrap(func, handle)
 
 def model_error_handler(func):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        try:
-            return func(*args, **kwargs)
-        except ValidationError as e:
-            print(f"Validation error in model: {str(e)}")
+    def handle(e, args):
+        if isinstance(e, ValidationError):
+            logger.debug("Validation error in model: %s", e)
             raise ApiError(400, str(e))
-        except InvalidId as e:
-            print(f"Invalid MongoDB ID: {str(e)}")
+        if isinstance(e, InvalidId):
+            logger.debug("Invalid MongoDB ID: %s", e)
             raise ApiError(400, "Invalid ID format")
-        except ApiError as e:
+        if isinstance(e, ApiError):
             # Truyền tiếp ApiError đã được tạo
-            print(f"API error in model: {e.message}")
+            _log_api_error("model", e)
             raise e
-        except Exception as e:
-            operation = func.__name__.replace('_', ' ')
-            collection = args[0].__name__ if args and hasattr(args[0], '__name__') else "data"
-            print(f"Unexpected error in model ({operation}): {str(e)}")
-            raise ApiError(500, f"Database error while {operation} {collection}")
-    return wrapper
\ No newline at end of file
+        operation = func.__name__.replace('_', ' ')
+        collection = args[0].__name__ if args and hasattr(args[0], '__name__') else "data"
+        logger.exception("Unexpected error in model (%s): %s", operation, e)
+        raise ApiError(500, f"Database error while {operation} {collection}")
+    return _wrap(func, handle)
@@ -0,0 +1,103 @@
+import csv
+import io
+import re
+from src.utils.json_provider import dumps_bytes
+
+# Gom output thành từng khối khoảng bấy nhiêu ký tự trước khi gửi đi
+WRITE_CHUNK_SIZE = 64 * 1024
+
+EXPORT_MIMETYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    # Anki "Notes in Plain Text": File > Import, nhận diện qua các dòng #directive
+    "anki": "text/tab-separated-values; charset=utf-8",
+}
+
+EXPORT_EXTENSIONS = {"json": "json", "ndjson": "ndjson", "csv": "csv", "anki": "txt"}
+
+# Cùng tên cột với import (flashcard_parser.COLUMN_ALIASES): file export import lại được
+EXPORT_FIELDS = ("english", "vietnamese", "object", "image_url")
+
+
+def _export_row(flashcard, folder_titles):
+    row = {field: flashcard.get(field) for field in EXPORT_FIELDS}
+    row["folder"] = folder_titles.get(flashcard.get("folder_id"))
+    return row
+
+
+def _anki_tag(title):
+    # Tag của Anki không chứa khoảng trắng
+    return re.sub(r"\s+", "_", title.strip()) if title else ""
+
+
+def _iter_json(flashcards, folder_titles):
+    yield "["
+    separator = ""
+    for flashcard in flashcards:
+        yield separator + dumps_bytes(_export_row(flashcard, folder_titles)).decode("utf-8")
+        separator = ","
+    yield "]"
+
+
+def _iter_ndjson(flashcards, folder_titles):
+    for flashcard in flashcards:
+        yield dumps_bytes(_export_row(flashcard, folder_titles)).decode("utf-8") + "\n"
+
+
+def _iter_csv(flashcards, folder_titles):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS + ("folder",))
+    for flashcard in flashcards:
+        row = _export_row(flashcard, folder_titles)
+        writer.writerow([row[field] or "" for field in EXPORT_FIELDS + ("folder",)])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _iter_anki(flashcards, folder_titles):
+    # Cột 3 là object như import positional; tag nằm ở cột 4, parser đọc #columns/#tags column
+    yield "#separator:tab\n#html:false\n#columns:Front\tBack\tObject\tTags\n#tags column:4\n"
+    buffer = io.StringIO()
+    # csv quote các ô có tab/xuống dòng, Anki đọc được dạng quote này
+    writer = csv.writer(buffer, delimiter="\t", lineterminator="\n")
+    for flashcard in flashcards:
+        writer.writerow([
+            flashcard.get("english") or "",
+            flashcard.get("vietnamese") or "",
+            flashcard.get("object") or "",
+            _anki_tag(folder_titles.get(flashcard.get("folder_id"))),
+        ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+EXPORT_WRITERS = {
+    "json": _iter_json,
+    "ndjson": _iter_ndjson,
+    "csv": _iter_csv,
+    "anki": _iter_anki,
+}
+
+
+def iter_export(flashcards, export_format, folder_titles):
+    """
+    Encode an iterable of flashcard documents as text chunks of about
+    WRITE_CHUNK_SIZE characters. Nothing is materialized: memory only depends
+    on the chunk size and the cursor batch. folder_titles maps folder_id to title.
+    """
+    pending = []
+    pending_size = 0
+    for piece in EXPORT_WRITERS[export_format](flashcards, folder_titles):
+        pending.append(piece)
+        pending_size += len(piece)
+        if pending_size >= WRITE_CHUNK_SIZE:
+            yield "".join(pending)
+            pending = []
+            pending_size = 0
+    if pending:
+        yield "".join(pending)
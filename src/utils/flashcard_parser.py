@@ -0,0 +1,268 @@
+import codecs
+import csv
+import json
+import re
+from itertools import chain, islice
+
+# Kích thước mỗi lần đọc file (bytes)
+READ_CHUNK_SIZE = 64 * 1024
+
+SUPPORTED_IMPORT_FORMATS = {
+    "json": "json",
+    "ndjson": "ndjson",
+    "jsonl": "ndjson",
+    "csv": "csv",
+    # Anki ("Notes in Plain Text") và Quizlet export dạng tab-separated
+    "tsv": "tsv",
+    "txt": "tsv",
+}
+
+# Tên cột được chấp nhận trong header CSV/TSV
+COLUMN_ALIASES = {
+    "english": "english",
+    "term": "english",
+    "front": "english",
+    "word": "english",
+    "vietnamese": "vietnamese",
+    "definition": "vietnamese",
+    "back": "vietnamese",
+    "meaning": "vietnamese",
+    "object": "object",
+    "image_url": "image_url",
+    "imageurl": "image_url",
+    "image": "image_url",
+}
+
+# Dòng header của Anki "Notes in Plain Text": #separator:tab, #html:false, #tags column:3...
+ANKI_DIRECTIVE = re.compile(r"#([a-z ]+):")
+
+# Thứ tự cột khi file không có header (Anki/Quizlet: term, definition)
+POSITIONAL_COLUMNS = ("english", "vietnamese", "object", "image_url")
+
+
+def detect_import_format(filename):
+    """Map a file name to one of the supported import formats"""
+    if not filename or "." not in filename:
+        return None
+    extension = filename.rsplit(".", 1)[1].lower()
+    return SUPPORTED_IMPORT_FORMATS.get(extension)
+
+
+def _iter_text(stream, chunk_size=READ_CHUNK_SIZE):
+    """Read a binary stream as decoded UTF-8 text chunks"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+            return
+        if isinstance(data, str):
+            yield data
+        else:
+            yield decoder.decode(data)
+
+
+def iter_json_array(stream, chunk_size=READ_CHUNK_SIZE):
+    """
+    Parse a top-level JSON array item by item without loading the whole file.
+    Only the item currently being decoded is kept in memory.
+    """
+    decoder = json.JSONDecoder()
+    chunks = _iter_text(stream, chunk_size)
+    buffer = ""
+    pos = 0
+    eof = False
+    # "[" -> mở mảng, "item_or_end" -> ngay sau "[", "item" -> sau dấu phẩy,
+    # "separator" -> sau một phần tử, cần đúng một "," hoặc "]"
+    expect = "["
+
+    def read_more():
+        nonlocal buffer, pos, eof
+        try:
+            buffer = buffer[pos:] + next(chunks)
+            pos = 0
+        except StopIteration:
+            eof = True
+
+    while True:
+        while pos < len(buffer) and buffer[pos].isspace():
+            pos += 1
+        if pos >= len(buffer):
+            if eof:
+                raise ValueError("Unexpected end of JSON file")
+            read_more()
+            continue
+
+        char = buffer[pos]
+        if expect == "[":
+            if char != "[":
+                raise ValueError("JSON file must contain an array of flashcards")
+            expect = "item_or_end"
+            pos += 1
+            continue
+
+        if expect == "separator":
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError("Invalid JSON file: expected ',' or ']' between flashcards")
+            expect = "item"
+            pos += 1
+            continue
+
+        if char == "]" and expect == "item_or_end":
+            return
+        if char in ",]":
+            after = "[" if expect == "item_or_end" else ","
+            raise ValueError(f"Invalid JSON file: expected a flashcard after '{after}'")
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            if eof:
+                raise ValueError(f"Invalid JSON file: {e.msg}")
+            read_more()
+            continue
+
+        # Một số/literal nằm sát cuối buffer có thể chưa đọc hết
+        if end >= len(buffer) and not eof:
+            read_more()
+            continue
+
+        pos = end
+        expect = "separator"
+        yield item
+
+
+def iter_ndjson(stream, chunk_size=READ_CHUNK_SIZE):
+    """Parse newline-delimited JSON, one flashcard object per line"""
+    buffer = ""
+    line_number = 0
+    for chunk in _iter_text(stream, chunk_size):
+        buffer += chunk
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            line_number += 1
+            yield _parse_ndjson_line(line, line_number)
+    if buffer:
+        yield _parse_ndjson_line(buffer, line_number + 1)
+
+
+def _parse_ndjson_line(line, line_number):
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON on line {line_number}: {e.msg}")
+
+
+def _iter_lines(stream, chunk_size=READ_CHUNK_SIZE):
+    """Split decoded text chunks into lines, keeping line endings for the csv module"""
+    buffer = ""
+    for chunk in _iter_text(stream, chunk_size):
+        buffer += chunk
+        lines = buffer.splitlines(keepends=True)
+        # Dòng cuối có thể chưa đọc hết
+        buffer = lines.pop() if lines and not lines[-1].endswith(("\n", "\r")) else ""
+        yield from lines
+    if buffer:
+        yield buffer
+
+
+def _split_anki_directives(lines):
+    """
+    Consume the Anki directive lines at the top of a file. Return the
+    directives as {name: value} and an iterator over the remaining lines.
+    """
+    directives = {}
+    for line in lines:
+        match = ANKI_DIRECTIVE.match(line)
+        if not match:
+            return directives, chain([line], lines)
+        directives[match.group(1).strip()] = line[match.end():].strip()
+    return directives, iter(())
+
+
+def _anki_columns(directives, delimiter):
+    """
+    Column layout declared by "#columns:" and "#<name> column:N" directives.
+    Tags, deck, notetype and guid columns are not flashcard fields and map to
+    None. Return None when the file declares no layout.
+    """
+    names = directives.get("columns")
+    index_columns = {
+        key: int(value) for key, value in directives.items()
+        if key.endswith(" column") and value.isdigit() and int(value) > 0
+    }
+    if not names and not index_columns:
+        return None
+
+    if names:
+        columns = [COLUMN_ALIASES.get(name.strip().lower()) for name in names.split(delimiter)]
+    else:
+        columns = list(POSITIONAL_COLUMNS)
+    for index in index_columns.values():
+        if index > len(columns):
+            columns.extend([None] * (index - len(columns)))
+        columns[index - 1] = None
+    return columns
+
+
+def iter_delimited(stream, delimiter=",", chunk_size=READ_CHUNK_SIZE):
+    """
+    Parse CSV/TSV rows into flashcard dicts. A first row made of known column
+    names is used as header, otherwise columns are read positionally.
+    Anki directive lines ("#separator:tab", ...) at the top of the file are
+    consumed and "#columns:" / "#tags column:N" define the layout; later lines
+    starting with "#" are data ("#1", quoted multi-line cells).
+    """
+    directives, lines = _split_anki_directives(_iter_lines(stream, chunk_size))
+    reader = csv.reader(lines, delimiter=delimiter)
+
+    columns = _anki_columns(directives, delimiter)
+    for row in reader:
+        if not row or not any(cell.strip() for cell in row):
+            continue
+
+        if columns is None:
+            header = [COLUMN_ALIASES.get(cell.strip().lower()) for cell in row]
+            if "english" in header and "vietnamese" in header:
+                columns = header
+                continue
+            columns = POSITIONAL_COLUMNS
+
+        yield {
+            column: cell
+            for column, cell in zip(columns, row)
+            if column and cell != ""
+        }
+
+
+def iter_chunks(iterable, size):
+    """Group an iterable into lists of at most `size` items"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_flashcards(stream, import_format):
+    """Yield raw flashcard dicts from an uploaded file in the given format"""
+    if import_format == "json":
+        yield from iter_json_array(stream)
+    elif import_format == "ndjson":
+        for item in iter_ndjson(stream):
+            if item is not None:
+                yield item
+    elif import_format == "csv":
+        yield from iter_delimited(stream, delimiter=",")
+    elif import_format == "tsv":
+        yield from iter_delimited(stream, delimiter="\t")
+    else:
+        raise ValueError(f"Unsupported import format: {import_format}")
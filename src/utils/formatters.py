@@ -1,6 +1,12 @@
 
 from typing import Dict
 
+# Các trường của user được phép trả về cho client
+USER_PUBLIC_FIELDS = ["_id", "email", "username", "displayName", "avatar", "role", "isActive", "createdAt", "updatedAt"]
+
+# Projection tương ứng để không đọc password, verifyToken... từ MongoDB
+USER_PUBLIC_PROJECTION = {key: 1 for key in USER_PUBLIC_FIELDS}
+
 
 def pick_user(user: Dict) -> Dict:
     """
@@ -8,6 +14,5 @@ def pick_user(user: Dict) -> Dict:
     """
     if not user:
         return {}
-    
-    keys = ["_id", "email", "username", "displayName", "avatar", "role", "isActive", "createdAt", "updatedAt"]
-    return {key: user[key] for key in keys if key in user}
+
+    return {key: user[key] for key in USER_PUBLIC_FIELDS if key in user}
@@ -0,0 +1,80 @@
+"""
+Flask JSON provider that encodes MongoDB documents directly.
+
+ObjectId becomes its hex string and datetimes are ISO 8601. Datetimes stored
+by the app are naive UTC (`datetime.utcnow()`), so they get a "+00:00" offset.
+Nested documents and lists are handled at any depth, so repositories can
+return documents as read from MongoDB without a `serialize_mongo_data` pass.
+orjson is used when installed, with a stdlib json fallback.
+"""
+import json
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson là dependency tùy chọn
+    orjson = None
+
+
+def _default(value):
+    """Types that neither encoder handles natively"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Decimal128):
+        return str(value.to_decimal())
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return str(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _stdlib_default(value):
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return _default(value)
+
+
+def dumps_bytes(obj, indent=False):
+    """Encode obj to UTF-8 JSON bytes"""
+    if orjson is not None:
+        option = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+    return json.dumps(
+        obj,
+        default=_stdlib_default,
+        ensure_ascii=False,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONProvider(JSONProvider):
+    mimetype = "application/json"
+
+    def dumps(self, obj, **kwargs):
+        return dumps_bytes(obj, indent=bool(kwargs.get("indent"))).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if orjson is not None:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Bỏ bước bytes -> str -> bytes của provider mặc định
+        body = dumps_bytes(obj, indent=self._app.debug) + b"\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
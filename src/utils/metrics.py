@@ -0,0 +1,243 @@
+"""
+In-process metrics in Prometheus text format (no client library needed).
+
+Each process (gunicorn worker) keeps its own registry; `/metrics` reports the
+process that serves the scrape.
+"""
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pymongo import monitoring
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+PROCESS_STARTED_AT = time.time()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames, labels, extra=None):
+    pairs = list(zip(labelnames, labels))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [số đếm theo bucket..., sum, count]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0] * (len(self.buckets) + 2)
+            for position, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[position] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, list(state)) for labels, state in self._values.items())
+        for labels, state in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, state):
+                cumulative += bucket_count
+                le = _format_labels(self.labelnames, labels, ("le", _format_value(float(bound))))
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = _format_labels(self.labelnames, labels, ("le", "+Inf"))
+            lines.append(f"{self.name}_bucket{le} {state[-1]}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(float(state[-2]))}")
+            lines.append(f"{self.name}_count{label_text} {state[-1]}")
+        return lines
+
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status code",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_MONGODB_COMMANDS = Histogram(
+    "http_request_mongodb_commands",
+    "MongoDB commands issued while serving one request",
+    ("route",),
+    buckets=COUNT_BUCKETS,
+)
+HTTP_REQUEST_MONGODB_SECONDS = Counter(
+    "http_request_mongodb_seconds_total",
+    "Time spent in MongoDB commands, attributed to the route that issued them",
+    ("route",),
+)
+HTTP_REQUEST_OUTBOUND_SECONDS = Counter(
+    "http_request_outbound_seconds_total",
+    "Time spent in outbound calls, attributed to the route that issued them",
+    ("route", "service"),
+)
+MONGODB_COMMAND_DURATION = Histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command latency by command name",
+    ("command", "outcome"),
+)
+OUTBOUND_REQUEST_DURATION = Histogram(
+    "outbound_request_duration_seconds",
+    "Latency of calls to external services (Cloudinary, translate, Gemini)",
+    ("service", "operation", "outcome"),
+)
+
+REGISTRY = [
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUEST_MONGODB_COMMANDS,
+    HTTP_REQUEST_MONGODB_SECONDS,
+    HTTP_REQUEST_OUTBOUND_SECONDS,
+    MONGODB_COMMAND_DURATION,
+    OUTBOUND_REQUEST_DURATION,
+]
+
+
+class RequestStats:
+    """Per-request accumulator for MongoDB and outbound call timings"""
+
+    def __init__(self, route):
+        self.route = route
+        self.started = time.perf_counter()
+        self.mongodb_commands = 0
+        self.mongodb_seconds = 0.0
+        # service -> [số lần gọi, tổng thời gian]
+        self.outbound = {}
+        self._lock = threading.Lock()
+
+    def add_mongodb(self, seconds):
+        with self._lock:
+            self.mongodb_commands += 1
+            self.mongodb_seconds += seconds
+
+    def add_outbound(self, service, seconds):
+        with self._lock:
+            calls = self.outbound.setdefault(service, [0, 0.0])
+            calls[0] += 1
+            calls[1] += seconds
+
+
+# Stats của request đang được xử lý trong context (thread) hiện tại
+_current_request = contextvars.ContextVar("request_stats", default=None)
+
+
+def start_request(route):
+    stats = RequestStats(route)
+    return stats, _current_request.set(stats)
+
+
+def end_request(token):
+    _current_request.reset(token)
+
+
+def current_request():
+    return _current_request.get()
+
+
+def record_request(stats, method, status):
+    """Record a finished request; returns its duration in seconds"""
+    duration = time.perf_counter() - stats.started
+    HTTP_REQUEST_DURATION.observe(duration, method, stats.route, str(status))
+    HTTP_REQUEST_MONGODB_COMMANDS.observe(stats.mongodb_commands, stats.route)
+    if stats.mongodb_seconds:
+        HTTP_REQUEST_MONGODB_SECONDS.inc(stats.route, amount=stats.mongodb_seconds)
+    for service, (_, seconds) in stats.outbound.items():
+        HTTP_REQUEST_OUTBOUND_SECONDS.inc(stats.route, service, amount=seconds)
+    return duration
+
+
+@contextmanager
+def track_outbound(service, operation):
+    """Time a call to an external service and attribute it to the current request"""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        duration = time.perf_counter() - started
+        OUTBOUND_REQUEST_DURATION.observe(duration, service, operation, outcome)
+        stats = current_request()
+        if stats is not None:
+            stats.add_outbound(service, duration)
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """
+    pymongo listener: command latency histogram plus per-request attribution.
+    Callbacks run on the thread that issued the command, so the request
+    context is available.
+    """
+
+    def started(self, event):
+        pass
+
+    def _record(self, event, outcome):
+        seconds = event.duration_micros / 1_000_000
+        MONGODB_COMMAND_DURATION.observe(seconds, event.command_name, outcome)
+        stats = current_request()
+        if stats is not None:
+            stats.add_mongodb(seconds)
+
+    def succeeded(self, event):
+        self._record(event, "success")
+
+    def failed(self, event):
+        self._record(event, "error")
+
+
+def render_metrics():
+    lines = [
+        "# HELP process_start_time_seconds Start time of the process since unix epoch",
+        "# TYPE process_start_time_seconds gauge",
+        f'process_start_time_seconds{{pid="{os.getpid()}"}} {PROCESS_STARTED_AT}',
+    ]
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,80 @@
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId
+from src.utils.api_error import ApiError
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def parse_page_size(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Parse the `limit` query parameter and clamp it to a sane range"""
+    if value in (None, ""):
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, "limit must be an integer")
+    return max(1, min(limit, maximum))
+
+
+def encode_cursor(document, sort_field="created_at"):
+    """Build an opaque continuation token from the last document of a page"""
+    sort_value = document.get(sort_field)
+    payload = {
+        "t": sort_value.isoformat() if isinstance(sort_value, datetime) else None,
+        "id": str(document["_id"]),
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    """Decode a continuation token into (sort value, _id)"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        sort_value = datetime.fromisoformat(payload["t"]) if payload["t"] else None
+        return sort_value, ObjectId(payload["id"])
+    except Exception:
+        raise ApiError(400, "Invalid pagination cursor")
+
+
+def keyset_filter(token, sort_field="created_at"):
+    """
+    Filter matching documents strictly after the cursor in
+    (sort_field desc, _id desc) order. Documents without sort_field sort last.
+    """
+    sort_value, last_id = decode_cursor(token)
+    if sort_value is None:
+        return {sort_field: None, "_id": {"$lt": last_id}}
+    return {
+        "$or": [
+            {sort_field: {"$lt": sort_value}},
+            {sort_field: sort_value, "_id": {"$lt": last_id}},
+            {sort_field: None},
+        ]
+    }
+
+
+def find_page(collection, query, cursor=None, limit=DEFAULT_PAGE_SIZE, sort_field="created_at", projection=None):
+    """
+    Run one keyset page over (sort_field desc, _id desc).
+    Returns (documents, next_cursor); next_cursor is None on the last page.
+    The cost per page is constant as long as a matching compound index exists.
+    """
+    if cursor:
+        query = {"$and": [query, keyset_filter(cursor, sort_field)]}
+
+    documents = list(
+        collection.find(query, projection)
+        .sort([(sort_field, -1), ("_id", -1)])
+        .limit(limit + 1)
+    )
+
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = encode_cursor(documents[-1], sort_field)
+    return documents, next_cursor
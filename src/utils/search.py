@@ -0,0 +1,100 @@
+import re
+import unicodedata
+
+# Ký tự tách từ trong username/email/họ tên
+TOKEN_SEPARATORS = re.compile(r"[\s._\-+@]+")
+
+# Đếm chính xác tối đa bấy nhiêu kết quả, quá thì trả về giá trị chặn trên
+SEARCH_COUNT_CAP = 1000
+
+# Các trường của flashcard được tìm kiếm
+FLASHCARD_SEARCH_FIELDS = ("english", "vietnamese", "object")
+
+
+def tokenize(value):
+    """Split a string into lowercase search tokens"""
+    if not isinstance(value, str):
+        return []
+    return [token for token in TOKEN_SEPARATORS.split(value.lower()) if token]
+
+
+def build_user_search_keys(user):
+    """
+    Lowercase keys matched by prefix in user search: the full username,
+    email and fullName plus their individual words (email domain excluded).
+    """
+    keys = set()
+    for field in ("username", "email", "fullName"):
+        value = user.get(field)
+        if not isinstance(value, str) or not value.strip():
+            continue
+        value = value.strip().lower()
+        keys.add(value)
+        if field == "email":
+            value = value.split("@", 1)[0]
+            keys.add(value)
+        keys.update(tokenize(value))
+    return sorted(keys)
+
+
+def prefix_query(field, search_query):
+    """
+    Anchored, case-sensitive regexes on a lowercase multikey field: every word
+    of the query must be the prefix of one key. Anchored regexes use index bounds.
+    """
+    words = tokenize(search_query)
+    if not words:
+        return {}
+    patterns = [re.compile("^" + re.escape(word)) for word in words]
+    whole = search_query.strip().lower()
+    if len(words) == 1 and words[0] == whole:
+        return {field: patterns[0]}
+
+    # "john.doe@gmail.com" khớp nguyên chuỗi, "john doe" khớp từng từ
+    word_query = patterns[0] if len(patterns) == 1 else {"$all": patterns}
+    return {
+        "$or": [
+            {field: re.compile("^" + re.escape(whole))},
+            {field: word_query},
+        ]
+    }
+
+
+def fold_accents(value):
+    """Lowercase and strip diacritics: "Đồng hồ" -> "dong ho" """
+    if not isinstance(value, str):
+        return ""
+    # đ/Đ không tách được thành d + dấu bằng NFD
+    value = value.replace("đ", "d").replace("Đ", "D")
+    decomposed = unicodedata.normalize("NFD", value)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def build_flashcard_search_fields(flashcard):
+    """
+    Accent-folded search fields of a flashcard:
+    - search_text: english, vietnamese and object, for the text index
+    - search_terms: each folded field and its words, matched by prefix (type-ahead)
+    """
+    values = [fold_accents(flashcard.get(field)).strip() for field in FLASHCARD_SEARCH_FIELDS]
+    values = [value for value in values if value]
+
+    terms = set()
+    for value in values:
+        terms.add(value)
+        terms.update(tokenize(value))
+    return {"search_text": " ".join(values), "search_terms": sorted(terms)}
+
+
+def build_content_key(flashcard):
+    """
+    Normalized english + vietnamese of a flashcard, used to detect duplicates
+    in a folder: casefolded, whitespace collapsed. Diacritics are kept
+    ("ban" and "bàn" are different cards).
+    """
+    parts = []
+    for field in ("english", "vietnamese"):
+        value = flashcard.get(field)
+        parts.append(" ".join(value.split()).casefold() if isinstance(value, str) else "")
+    # \x1f: ký tự không xuất hiện trong nội dung, tránh "a b"+"c" trùng "a"+"b c"
+    return "\x1f".join(parts)
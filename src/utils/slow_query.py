@@ -0,0 +1,226 @@
+"""
+Slow-query detector: a pymongo CommandListener that flags commands slower than
+SLOW_QUERY_MS and, sampled and rate-limited, captures their explain() plan
+into the capped `diagnostics` collection together with the originating route.
+
+    SLOW_QUERY_MS=200                 # threshold, 0 disables the detector
+    SLOW_QUERY_SAMPLE_RATE=1.0        # fraction of slow commands that get explained
+    SLOW_QUERY_MAX_PER_MINUTE=10      # explain budget per process
+"""
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime
+from pymongo import monitoring
+from src.utils.metrics import Counter, REGISTRY, current_request
+
+DIAGNOSTICS_COLLECTION_NAME = "diagnostics"
+DIAGNOSTICS_COLLECTION_SIZE = 16 * 1024 * 1024
+
+# Chỉ các command đọc này mới explain được một cách an toàn (không thực thi ghi)
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct"}
+
+# Field do driver thêm vào command, không được gửi lại trong explain
+DRIVER_FIELDS = {"lsid", "$clusterTime", "$db", "$readPreference", "txnNumber", "apiVersion", "apiStrict", "apiDeprecationErrors"}
+
+# Cùng một query shape chỉ explain lại sau khoảng thời gian này
+SHAPE_COOLDOWN_SECONDS = 300
+
+MAX_STORED_COMMAND_CHARS = 4000
+
+SLOW_COMMANDS = Counter(
+    "mongodb_slow_commands_total",
+    "MongoDB commands slower than SLOW_QUERY_MS, by command and route",
+    ("command", "route"),
+)
+REGISTRY.append(SLOW_COMMANDS)
+
+
+def _plan_stages(plan, stages=None, indexes=None):
+    """Collect stage names and index names from an explain plan tree"""
+    if stages is None:
+        stages, indexes = [], []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        if "indexName" in plan:
+            indexes.append(plan["indexName"])
+        for value in plan.values():
+            if isinstance(value, (dict, list)):
+                _plan_stages(value, stages, indexes)
+    elif isinstance(plan, list):
+        for item in plan:
+            _plan_stages(item, stages, indexes)
+    return stages, indexes
+
+
+def summarize_explain(explain):
+    """Reduce an explain() result to the facts that point at a missing index"""
+    stages, indexes = _plan_stages(explain.get("queryPlanner", explain))
+    return {
+        "stages": stages,
+        "indexes": sorted(set(indexes)),
+        "collection_scan": "COLLSCAN" in stages,
+        "in_memory_sort": "SORT" in stages,
+    }
+
+
+def _query_shape(command_name, command):
+    """Command name, collection and filter keys; values are ignored"""
+    collection = command.get(command_name)
+    if command_name == "aggregate":
+        keys = tuple(
+            next(iter(stage), "") for stage in command.get("pipeline", []) if isinstance(stage, dict)
+        )
+    else:
+        keys = tuple(sorted((command.get("filter") or command.get("query") or {}).keys()))
+    sort_keys = tuple((command.get("sort") or {}).keys())
+    return command_name, collection, keys, sort_keys
+
+
+class SlowQueryListener(monitoring.CommandListener):
+    def __init__(self, threshold_ms=None, sample_rate=None, max_per_minute=None):
+        self.threshold_ms = float(os.getenv("SLOW_QUERY_MS", 200) if threshold_ms is None else threshold_ms)
+        self.sample_rate = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", 1.0) if sample_rate is None else sample_rate)
+        self.max_per_minute = int(os.getenv("SLOW_QUERY_MAX_PER_MINUTE", 10) if max_per_minute is None else max_per_minute)
+
+        # (connection_id, request_id) -> (command, database, route) của command đang chạy
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._window_started = time.monotonic()
+        self._window_count = 0
+        self._recent_shapes = {}
+        self._queue = queue.Queue(maxsize=100)
+        self._thread = None
+
+    @property
+    def enabled(self):
+        return self.threshold_ms > 0
+
+    def started(self, event):
+        if not self.enabled or event.command_name not in EXPLAINABLE_COMMANDS:
+            return
+        if event.command.get(event.command_name) == DIAGNOSTICS_COLLECTION_NAME:
+            return
+        stats = current_request()
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                event.command,
+                event.database_name,
+                stats.route if stats is not None else None,
+            )
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+
+    def _finish(self, event):
+        if not self.enabled:
+            return
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+
+        duration_ms = event.duration_micros / 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        command, database_name, route = pending
+        SLOW_COMMANDS.inc(event.command_name, route or "<background>")
+        logging.getLogger(__name__).warning(
+            "Slow MongoDB %s on %s: %.1fms (route %s)",
+            event.command_name, command.get(event.command_name), duration_ms, route,
+        )
+
+        if random.random() >= self.sample_rate or not self._allow(_query_shape(event.command_name, command)):
+            return
+
+        try:
+            self._queue.put_nowait({
+                "command_name": event.command_name,
+                "command": command,
+                "database": database_name,
+                "route": route,
+                "duration_ms": duration_ms,
+            })
+            self._ensure_thread()
+        except queue.Full:
+            pass
+
+    def _allow(self, shape):
+        """Per-process budget of explains per minute, and one explain per shape per cooldown"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._window_started >= 60:
+                self._window_started = now
+                self._window_count = 0
+                self._recent_shapes = {
+                    key: seen for key, seen in self._recent_shapes.items()
+                    if now - seen < SHAPE_COOLDOWN_SECONDS
+                }
+            if self._window_count >= self.max_per_minute:
+                return False
+            last_seen = self._recent_shapes.get(shape)
+            if last_seen is not None and now - last_seen < SHAPE_COOLDOWN_SECONDS:
+                return False
+            self._window_count += 1
+            self._recent_shapes[shape] = now
+            return True
+
+    def _ensure_thread(self):
+        # Thread được tạo trong chính process hiện tại (không kế thừa qua fork)
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="slow-query-explain", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        logger = logging.getLogger(__name__)
+        collection_ready = False
+        while True:
+            item = self._queue.get()
+            try:
+                from src.config.mongodb import MongoDB
+
+                db = MongoDB.get_client()[item["database"]]
+                if not collection_ready:
+                    ensure_diagnostics_collection(db)
+                    collection_ready = True
+
+                command = {key: value for key, value in item["command"].items() if key not in DRIVER_FIELDS}
+                explain = db.command({"explain": command, "verbosity": "queryPlanner"})
+
+                db[DIAGNOSTICS_COLLECTION_NAME].insert_one({
+                    "type": "slow_query",
+                    "created_at": datetime.utcnow(),
+                    "route": item["route"],
+                    "command_name": item["command_name"],
+                    "collection": command.get(item["command_name"]),
+                    "duration_ms": item["duration_ms"],
+                    "command": str(command)[:MAX_STORED_COMMAND_CHARS],
+                    "plan": summarize_explain(explain),
+                    "pid": os.getpid(),
+                })
+            except Exception as e:
+                logger.error("Failed to capture explain plan: %s", e)
+            finally:
+                self._queue.task_done()
+
+
+def ensure_diagnostics_collection(db):
+    """Create the capped diagnostics collection once; an uncapped one would grow forever"""
+    if DIAGNOSTICS_COLLECTION_NAME in db.list_collection_names(filter={"name": DIAGNOSTICS_COLLECTION_NAME}):
+        return
+    try:
+        db.create_collection(DIAGNOSTICS_COLLECTION_NAME, capped=True, size=DIAGNOSTICS_COLLECTION_SIZE)
+    except Exception:
+        # Process khác vừa tạo xong
+        pass
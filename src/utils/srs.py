@@ -0,0 +1,62 @@
+"""
+SM-2 spaced-repetition scheduling.
+
+A review grade is SM-2's quality score from 0 to 5:
+0-2 forgotten (the card starts over), 3 hard, 4 good, 5 easy.
+"""
+from datetime import timedelta
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+# Card quên (grade < 3) được học lại sau khoảng này thay vì chờ tới ngày mai
+RELEARN_INTERVAL = timedelta(minutes=10)
+
+
+def initial_state():
+    """Scheduling fields of a card that has never been reviewed"""
+    return {
+        "ease": DEFAULT_EASE,
+        "interval_days": 0,
+        "repetitions": 0,
+        "lapses": 0,
+    }
+
+
+def schedule(state, grade, reviewed_at):
+    """
+    Apply one review to a card's scheduling state and return the updated
+    fields (ease, interval_days, repetitions, lapses, due_at, last_reviewed_at).
+    """
+    if not 0 <= grade <= 5:
+        raise ValueError("grade must be between 0 and 5")
+
+    ease = state.get("ease", DEFAULT_EASE)
+    interval_days = state.get("interval_days", 0)
+    repetitions = state.get("repetitions", 0)
+    lapses = state.get("lapses", 0)
+
+    if grade < 3:
+        repetitions = 0
+        interval_days = 0
+        lapses += 1
+        due_at = reviewed_at + RELEARN_INTERVAL
+    else:
+        if repetitions == 0:
+            interval_days = 1
+        elif repetitions == 1:
+            interval_days = 6
+        else:
+            interval_days = max(interval_days + 1, round(interval_days * ease))
+        repetitions += 1
+        due_at = reviewed_at + timedelta(days=interval_days)
+
+    ease = max(MIN_EASE, ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+
+    return {
+        "ease": round(ease, 4),
+        "interval_days": interval_days,
+        "repetitions": repetitions,
+        "lapses": lapses,
+        "due_at": due_at,
+        "last_reviewed_at": reviewed_at,
+    }
@@ -1,4 +1,6 @@
+import logging
 import requests
+from src.utils.metrics import track_outbound
 
 def translate_word(word):
     """
@@ -14,13 +16,14 @@ def translate_word(word):
     }
 
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()  # Kiểm tra lỗi HTTP
+        with track_outbound("translate", "translate_word"):
+            response = requests.get(url, params=params)
+            response.raise_for_status()  # Kiểm tra lỗi HTTP
 
         # Parse kết quả
         translated_text = response.json()[0][0][0]
         return translated_text
 
     except requests.exceptions.RequestException as e:
-        print(f"Error calling Google Translate API: {e}")
+        logging.getLogger(__name__).warning("Error calling Google Translate API: %s", e)
         return "Không tìm thấy"
@@ -50,4 +50,42 @@ class SaveFlashcardsValidation(BaseModel):
     
     class Config:
         # Allow extra attributes
-        extra = "ignore" 
\ No newline at end of file
+        extra = "ignore" 
+
+FLASHCARD_TEXT_MAX_LENGTH = 200
+IMAGE_FIELDS = ("image_url", "imageUrl", "image_data", "imageData", "image")
+
+
+def fast_validate_flashcard(card):
+    """
+    Lightweight equivalent of FlashcardSchema for bulk imports: same rules,
+    no pydantic model per card. Returns the normalized fields or raises ValueError.
+    """
+    if not isinstance(card, dict):
+        raise ValueError("Flashcard must be an object")
+
+    english = card.get("english")
+    vietnamese = card.get("vietnamese")
+    english = english.strip() if isinstance(english, str) else ""
+    vietnamese = vietnamese.strip() if isinstance(vietnamese, str) else ""
+    if not english or not vietnamese:
+        raise ValueError("English and Vietnamese fields are required")
+    if len(english) > FLASHCARD_TEXT_MAX_LENGTH or len(vietnamese) > FLASHCARD_TEXT_MAX_LENGTH:
+        raise ValueError(f"English and Vietnamese must be at most {FLASHCARD_TEXT_MAX_LENGTH} characters")
+
+    object_name = card.get("object")
+    object_name = object_name.strip() if isinstance(object_name, str) and object_name.strip() else None
+
+    image_source = None
+    for field in IMAGE_FIELDS:
+        value = card.get(field)
+        if value:
+            image_source = value
+            break
+
+    return {
+        "english": english,
+        "vietnamese": vietnamese,
+        "object": object_name,
+        "image_source": image_source if isinstance(image_source, str) else None,
+    }
@@ -26,4 +26,14 @@ class UpdateFolderValidation(BaseModel):
         return v
     
     class Config:
-        populate_by_name = True 
\ No newline at end of file
+        populate_by_name = True
+
+class CloneFolderValidation(BaseModel):
+    # Mặc định dùng lại tên của folder gốc
+    title: str | None = Field(None, min_length=1, max_length=100)
+
+    @validator('title')
+    def title_not_empty(cls, v):
+        if v is not None and not v.strip():
+            raise ValueError('Title cannot be empty')
+        return v
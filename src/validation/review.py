@@ -0,0 +1,32 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List
+
+
+class ReviewCardValidation(BaseModel):
+    # Điểm SM-2: 0-2 quên, 3 khó, 4 nhớ, 5 dễ
+    grade: int = Field(..., ge=0, le=5)
+
+    class Config:
+        extra = "ignore"
+
+
+# Số lượt ôn tối đa trong một lần gửi
+MAX_REVIEW_BATCH_SIZE = 500
+
+
+class ReviewItemValidation(BaseModel):
+    # Id do client sinh (uuid), gửi lại khi retry để không bị áp dụng hai lần
+    review_id: str = Field(..., min_length=1, max_length=64)
+    flashcard_id: str = Field(..., min_length=24, max_length=24)
+    grade: int = Field(..., ge=0, le=5)
+    # Thời điểm ôn trên thiết bị (học offline); mặc định là lúc server nhận
+    reviewed_at: datetime | None = None
+
+    class Config:
+        extra = "ignore"
+
+
+class ReviewBatchValidation(BaseModel):
+    # Từng item được validate riêng để một item lỗi không làm hỏng cả batch
+    reviews: List[dict] = Field(..., min_length=1, max_length=MAX_REVIEW_BATCH_SIZE)
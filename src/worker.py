@@ -0,0 +1,120 @@
+"""
+Background worker: claims queued (or stalled) import jobs and runs them,
+periodically reconciles folder flashcard_count with the real number of cards,
+and deletes the uploaded files of failed jobs that were never resumed.
+
+    python -m src.worker
+    python -m src.worker --once
+    python -m src.worker --reconcile-counts     # fix flashcard_count drift and exit
+
+The API enqueues jobs instead of running them in-process when
+RUN_IMPORT_JOBS_INLINE=false. A job interrupted by a restart stays "running"
+until STALE_JOB_TIMEOUT, then any worker reclaims it and resumes from next_index.
+"""
+import argparse
+import logging
+import os
+import signal
+import threading
+import time
+from src.models.import_job import ImportJobModel
+from src.models.folder import FolderModel
+from src.repositories.import_job import ImportJobRepository
+from src.config.logging_config import configure_logging
+
+# Giây chờ giữa hai lần poll khi hàng đợi rỗng
+DEFAULT_POLL_INTERVAL = 5
+# Số job lấy mỗi lần poll
+DEFAULT_BATCH_SIZE = 10
+# Giây giữa hai lần đối soát flashcard_count, 0 để tắt
+DEFAULT_RECONCILE_INTERVAL = int(os.getenv("RECONCILE_COUNTS_INTERVAL", 3600))
+# Giây giữa hai lần dọn file của job lỗi quá hạn giữ (FAILED_JOB_FILE_RETENTION)
+FILE_CLEANUP_INTERVAL = 3600
+
+
+def process_pending_jobs(stop_event=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Run every claimable import job once; returns the number of jobs seen"""
+    job_ids = ImportJobModel.find_claimable_ids(limit=batch_size)
+    for job_id in job_ids:
+        if stop_event is not None and stop_event.is_set():
+            break
+        # run_import_job tự claim nguyên tử, worker khác đã lấy job thì bỏ qua
+        ImportJobRepository.run_import_job(job_id)
+    return len(job_ids)
+
+
+def reconcile_counts():
+    """Run the flashcard_count reconciler; errors are logged, never raised"""
+    try:
+        return FolderModel.reconcile_flashcard_counts()
+    except Exception as e:
+        logging.getLogger(__name__).error("flashcard_count reconciliation failed: %s", e)
+        return 0
+
+
+def discard_expired_files():
+    """Delete the files of expired failed jobs; errors are logged, never raised"""
+    try:
+        return ImportJobRepository.discard_expired_files()
+    except Exception as e:
+        logging.getLogger(__name__).error("Import file cleanup failed: %s", e)
+        return 0
+
+
+def run_worker(poll_interval=DEFAULT_POLL_INTERVAL, batch_size=DEFAULT_BATCH_SIZE, once=False,
+               reconcile_interval=DEFAULT_RECONCILE_INTERVAL):
+    logger = logging.getLogger(__name__)
+    stop_event = threading.Event()
+    # Lần đối soát đầu tiên chạy sau một chu kỳ, không chạy ngay lúc khởi động
+    next_reconcile = time.monotonic() + reconcile_interval
+    next_file_cleanup = time.monotonic()
+
+    def request_stop(signum, frame):
+        logger.info("Received signal %s, stopping after the current job", signum)
+        stop_event.set()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    logger.info("Import worker started")
+    while not stop_event.is_set():
+        try:
+            processed = process_pending_jobs(stop_event, batch_size)
+        except Exception as e:
+            # Lỗi tạm thời (mất kết nối DB...) không được làm chết worker
+            logger.error("Worker poll failed: %s", e)
+            processed = 0
+
+        if once:
+            break
+        if reconcile_interval > 0 and time.monotonic() >= next_reconcile:
+            reconcile_counts()
+            next_reconcile = time.monotonic() + reconcile_interval
+        if time.monotonic() >= next_file_cleanup:
+            discard_expired_files()
+            next_file_cleanup = time.monotonic() + FILE_CLEANUP_INTERVAL
+        if processed < batch_size:
+            stop_event.wait(poll_interval)
+
+    logger.info("Import worker stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m src.worker", description="Background import job worker")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--once", action="store_true", help="process the current queue and exit")
+    parser.add_argument("--reconcile-interval", type=int, default=DEFAULT_RECONCILE_INTERVAL,
+                        help="seconds between flashcard_count reconciliations (0 disables)")
+    parser.add_argument("--reconcile-counts", action="store_true", help="reconcile flashcard_count once and exit")
+    args = parser.parse_args()
+
+    configure_logging()
+    if args.reconcile_counts:
+        reconcile_counts()
+        return
+    run_worker(args.poll_interval, args.batch_size, args.once, args.reconcile_interval)
+
+
+if __name__ == "__main__":
+    main()